@@ -1,3 +1,11 @@
 from django.contrib import admin
+from .models import PooledProblem, ProblemPoolStats
 
-# Register your models here.
+@admin.register(PooledProblem)
+class PooledProblemAdmin(admin.ModelAdmin):
+    list_display = ('id', 'problem_type', 'created_at')
+    list_filter = ('problem_type',)
+
+@admin.register(ProblemPoolStats)
+class ProblemPoolStatsAdmin(admin.ModelAdmin):
+    list_display = ('problem_type', 'hits', 'misses', 'generated', 'failed')
@@ -1,6 +1,25 @@
+import os
+import sys
+
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class AiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ai'
+
+    def ready(self):
+        if settings.MODEL_PREWARM and _is_serving_process():
+            from .utils.model_registry import prewarm
+            prewarm(delay=1.0)
+
+
+def _is_serving_process():
+    """migrate, collectstatic, shell 등 관리 명령에서는 모델을 미리 로드하지 않는다."""
+    if os.path.basename(sys.argv[0]) != 'manage.py':
+        return True  # gunicorn / uvicorn 등 WSGI·ASGI 서버
+    if len(sys.argv) < 2 or sys.argv[1] != 'runserver':
+        return False
+    # runserver 자동 재시작(reloader)의 부모 프로세스는 요청을 처리하지 않음
+    return os.environ.get('RUN_MAIN') == 'true'
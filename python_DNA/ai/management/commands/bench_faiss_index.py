@@ -0,0 +1,123 @@
+import time
+
+import faiss
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from ai.utils.faiss_search import (
+    INDEX_TYPES, PQ_RERANK_FACTOR, new_index, train_index, configure_search, index_factory_string,
+    load_index_embeddings, rerank_exact
+)
+
+NPROBE_SWEEP = [1, 4, 16, 64]
+EF_SEARCH_SWEEP = [16, 32, 64, 128, 256]
+LATENCY_QUERIES = 200
+
+
+class Command(BaseCommand):
+    help = ("근사 인덱스(hnsw/ivf/ivfpq)의 recall@k 와 질의 지연을 전수 검색(flat) 결과를 정답으로 비교합니다. "
+            "nprobe(ivf/ivfpq), efSearch(hnsw) 값을 바꿔 가며 측정하고, 구축(학습) 시간과 인덱스 크기도 출력합니다. "
+            "ivfpq 는 PQ 거리 그대로의 결과와 원본 벡터로 재정렬한 결과(실제 검색 경로)를 함께 출력합니다. "
+            "벡터는 합성(저차원 잠재 공간의 군집을 투영한 단위 벡터) 또는 현재 FAISS 인덱스의 임베딩 파일을 사용합니다. 디스크 인덱스는 건드리지 않습니다.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', choices=['synthetic', 'index'], default='synthetic',
+                            help="synthetic: 합성 벡터, index: FAISS_INDEX_DIR 의 임베딩 파일")
+        parser.add_argument('--vectors', type=int, default=200000, help="합성 벡터 수")
+        parser.add_argument('--dim', type=int, default=384, help="합성 벡터 차원 (MiniLM 과 같은 384)")
+        parser.add_argument('--clusters', type=int, default=2000, help="합성 벡터 군집 수")
+        parser.add_argument('--intrinsic-dim', type=int, default=64,
+                            help="합성 벡터 잠재 차원 (문장 임베딩은 실제 차원보다 훨씬 낮은 차원에 몰려 있다)")
+        parser.add_argument('--queries', type=int, default=1000)
+        parser.add_argument('--top-k', type=int, default=10)
+        parser.add_argument('--types', nargs='+', default=['hnsw', 'ivf', 'ivfpq'],
+                            choices=[t for t in INDEX_TYPES if t not in ('auto', 'flat')])
+        parser.add_argument('--nprobe', type=int, nargs='+', default=NPROBE_SWEEP)
+        parser.add_argument('--ef-search', type=int, nargs='+', default=EF_SEARCH_SWEEP)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.rng = np.random.default_rng(options['seed'])
+        if options['source'] == 'synthetic':
+            base, queries = self.synthetic(options['vectors'], options['dim'], options['intrinsic_dim'],
+                                           options['clusters'], options['queries'])
+        else:
+            base, queries = self.from_index(options['queries'])
+        top_k = options['top_k']
+        self.stdout.write(f"벡터 {len(base):,}개 x {base.shape[1]}차원, 질의 {len(queries)}개, top-{top_k}, "
+                          f"faiss 스레드 {faiss.omp_get_max_threads()}")
+
+        flat = faiss.IndexFlatIP(base.shape[1])
+        flat.add(base)
+        _, truth = flat.search(queries, top_k)
+        self.stdout.write(f"\n{'인덱스':<28} {'파라미터':<14} {'recall@' + str(top_k):>10} "
+                          f"{'질의 p50/p99 (ms)':>20} {'배치 질의/s':>12}")
+        self.report_row('flat (정답)', '', lambda q: flat.search(q, top_k)[1], queries, truth, top_k)
+
+        for kind in options['types']:
+            started = time.perf_counter()
+            kind, index = new_index(kind, len(base), base.shape[1])
+            train_index(index, base, seed=options['seed'])
+            trained = time.perf_counter() - started
+            for start in range(0, len(base), 10000):
+                index.add(base[start:start + 10000])
+            built = time.perf_counter() - started
+            size = faiss.serialize_index(index).nbytes / 2**20
+            name = index_factory_string(kind, len(base), base.shape[1])
+            self.stdout.write(f"{name:<28} 구축 {built:.1f}s (학습 {trained:.1f}s), {size:.1f}MB")
+            if kind == 'hnsw':
+                sweep = [(f"efSearch={ef}", {'ef_search': ef}) for ef in options['ef_search']]
+            elif kind == 'flat':
+                sweep = [('', {})]
+            else:
+                sweep = [(f"nprobe={n}", {'nprobe': n}) for n in options['nprobe']]
+            for label, params in sweep:
+                configure_search(index, **params)
+                self.report_row('', label, lambda q: index.search(q, top_k)[1], queries, truth, top_k)
+                if kind == 'ivfpq':
+                    self.report_row('', f"{label} 재정렬", lambda q: rerank_exact(
+                        q, index.search(q, top_k * PQ_RERANK_FACTOR)[1], base, top_k)[1], queries, truth, top_k)
+
+    def synthetic(self, count, dim, intrinsic_dim, clusters, query_count):
+        """
+        잠재 공간의 군집(중심 주변 정규분포)을 무작위 선형 사상으로 dim 차원에 투영한 단위 벡터.
+        기본값에서 최근접 이웃 코사인 유사도가 0.7~0.8 정도로 실제 문장 임베딩과 비슷하다.
+        질의는 같은 분포에서 따로 뽑는다.
+        """
+        projection = self.rng.standard_normal((intrinsic_dim, dim), dtype='float32')
+        centers = self.rng.standard_normal((clusters, intrinsic_dim), dtype='float32')
+
+        def sample(n):
+            out = np.empty((n, dim), dtype='float32')
+            for start in range(0, n, 50000):
+                stop = min(n, start + 50000)
+                latent = centers[self.rng.integers(0, clusters, stop - start)]
+                latent += 0.7 * self.rng.standard_normal((stop - start, intrinsic_dim), dtype='float32')
+                out[start:stop] = latent @ projection
+            faiss.normalize_L2(out)
+            return out
+
+        return sample(count), sample(query_count)
+
+    def from_index(self, query_count):
+        base = load_index_embeddings()
+        if base is None or len(base) == 0:
+            raise CommandError("FAISS 인덱스가 없습니다. 먼저 `python manage.py rebuild_faiss_index` 를 실행하세요.")
+        # 질의: 저장된 문제 임베딩에 작은 잡음을 더한 벡터 (같은 문제를 조금 다르게 쓴 질의)
+        queries = base[self.rng.choice(len(base), min(query_count, len(base)), replace=False)].copy()
+        queries += self.rng.standard_normal(queries.shape, dtype='float32') * (0.1 / np.sqrt(base.shape[1]))
+        faiss.normalize_L2(queries)
+        return base, queries
+
+    def report_row(self, name, label, search, queries, truth, top_k):
+        latencies = []
+        for q in queries[:LATENCY_QUERIES]:
+            started = time.perf_counter()
+            search(q[None, :])
+            latencies.append((time.perf_counter() - started) * 1000)
+        started = time.perf_counter()
+        found = search(queries)
+        qps = len(queries) / (time.perf_counter() - started)
+        recall = np.mean([len(set(f) & set(t)) / top_k for f, t in zip(found, truth)])
+        self.stdout.write(f"{name:<28} {label:<14} {recall:10.4f} "
+                          f"{np.percentile(latencies, 50):9.3f} / {np.percentile(latencies, 99):8.3f} {qps:12.1f}")
@@ -0,0 +1,87 @@
+import random
+import time
+
+import faiss
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from ai.utils.faiss_search import iter_problems, problem_text
+from ai.utils.model_registry import SBERT_BACKENDS, load_sbert
+
+
+class Command(BaseCommand):
+    help = ("SBERT 추론 백엔드(torch fp32 / onnx / onnx-int8)를 DB 문제 은행으로 비교합니다. "
+            "정확도: 기준 백엔드(--reference)의 top-k 유사 문제와 얼마나 겹치는지(recall@k), 같은 문장 임베딩의 코사인 유사도. "
+            "처리량: 문제 은행 배치 인코딩(문장/s)과 질의 1건 인코딩 지연. 임베딩 저장소/인덱스는 건드리지 않습니다.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backends', nargs='+', default=list(SBERT_BACKENDS), choices=SBERT_BACKENDS)
+        parser.add_argument('--reference', default='torch', choices=SBERT_BACKENDS, help="정확도 비교 기준 백엔드")
+        parser.add_argument('--top-k', type=int, default=10)
+        parser.add_argument('--queries', type=int, default=200, help="정확도/지연 측정에 쓸 질의(문제) 수")
+        parser.add_argument('--limit', type=int, default=0, help="사용할 문제 수 상한 (0이면 전체)")
+        parser.add_argument('--batch-size', type=int, default=64)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        texts = [problem_text(p) for p in iter_problems()]
+        if options['limit']:
+            texts = texts[:options['limit']]
+        top_k = options['top_k']
+        if len(texts) <= top_k:
+            raise CommandError(f"문제 은행이 너무 작습니다 ({len(texts)}개, top-k {top_k}).")
+        query_ids = random.Random(options['seed']).sample(range(len(texts)), min(options['queries'], len(texts)))
+        backends = [options['reference']] + [b for b in options['backends'] if b != options['reference']]
+        self.stdout.write(f"문제 {len(texts):,}개, 질의 {len(query_ids)}개, top-{top_k}, 배치 {options['batch_size']}")
+
+        results = {}
+        for backend in backends:
+            try:
+                model = load_sbert(backend)
+            except Exception as e:
+                self.stdout.write(self.style.WARNING(f"[{backend}] 건너뜀: {e}"))
+                continue
+            results[backend] = self.run_backend(model, texts, query_ids, top_k, options['batch_size'])
+        if options['reference'] not in results:
+            raise CommandError(f"기준 백엔드({options['reference']})를 로드하지 못했습니다.")
+        self.report(results, options['reference'], top_k)
+
+    def run_backend(self, model, texts, query_ids, top_k, batch_size):
+        model.encode(texts[:batch_size], batch_size=batch_size, convert_to_numpy=True)  # 워밍업
+        started = time.perf_counter()
+        embs = np.asarray(model.encode(texts, batch_size=batch_size, convert_to_numpy=True), dtype='float32')
+        throughput = len(texts) / (time.perf_counter() - started)
+
+        latencies = []
+        for i in query_ids:
+            started = time.perf_counter()
+            model.encode([texts[i]], convert_to_numpy=True)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        faiss.normalize_L2(embs)
+        index = faiss.IndexFlatIP(embs.shape[1])
+        index.add(embs)
+        _, neighbors = index.search(embs[query_ids], top_k + 1)
+        # 질의 자신은 이웃에서 뺀다
+        neighbors = [[j for j in row if j != i][:top_k] for i, row in zip(query_ids, neighbors)]
+        return {
+            "embs": embs,
+            "neighbors": neighbors,
+            "throughput": throughput,
+            "p50": float(np.percentile(latencies, 50)),
+            "p99": float(np.percentile(latencies, 99)),
+        }
+
+    def report(self, results, reference, top_k):
+        ref = results[reference]
+        self.stdout.write(f"\n{'백엔드':<12} {'배치 문장/s':>12} {'질의 p50/p99 (ms)':>20} {'배속':>6} "
+                          f"{f'recall@{top_k}':>10} {'top-1 일치':>10} {'코사인 평균/최소':>18}")
+        for backend, r in results.items():
+            recall = np.mean([len(set(a) & set(b)) / top_k for a, b in zip(r['neighbors'], ref['neighbors'])])
+            top1 = np.mean([a[0] == b[0] for a, b in zip(r['neighbors'], ref['neighbors'])])
+            cosine = (r['embs'] * ref['embs']).sum(axis=1)
+            self.stdout.write(
+                f"{backend:<12} {r['throughput']:12.1f} {r['p50']:9.2f} / {r['p99']:8.2f} "
+                f"{r['throughput'] / ref['throughput']:5.2f}x {recall:10.4f} {top1:10.4f} "
+                f"{cosine.mean():9.4f} / {cosine.min():6.4f}"
+            )
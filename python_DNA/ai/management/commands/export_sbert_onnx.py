@@ -0,0 +1,80 @@
+import inspect
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ai.utils.onnx_encoder import FP32_FILENAME, INT8_FILENAME, CONFIG_FILENAME
+
+TOKEN_INPUTS = ('input_ids', 'attention_mask', 'token_type_ids')
+
+
+class Command(BaseCommand):
+    help = ("SBERT 인코더(SBERT_MODEL_NAME)를 ONNX(fp32)와 int8 동적 양자화 ONNX로 내보냅니다. "
+            "SBERT_BACKEND=onnx 또는 onnx-int8 로 사용합니다. torch, sentence-transformers, onnx, onnxruntime 필요.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=settings.SBERT_ONNX_DIR, help="내보낼 디렉터리 (기본: SBERT_ONNX_DIR)")
+        parser.add_argument('--opset', type=int, default=14)
+
+    def handle(self, *args, **options):
+        try:
+            import torch
+            from sentence_transformers import SentenceTransformer
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+        except ImportError as e:
+            raise CommandError(f"ONNX 내보내기에 필요한 패키지가 없습니다: {e}")
+
+        output = options['output']
+        os.makedirs(output, exist_ok=True)
+        model = SentenceTransformer(settings.SBERT_MODEL_NAME, device='cpu')
+        modules = list(model)
+        pooling = modules[1].get_config_dict() if len(modules) == 2 else {}
+        # OnnxSentenceEncoder 는 트랜스포머 + mean pooling 구성만 재현한다
+        if not (pooling.get('pooling_mode_mean_tokens') or pooling.get('pooling_mode') == 'mean'):
+            raise CommandError(f"지원하지 않는 SBERT 구성입니다 (트랜스포머 + mean pooling 만 지원): {modules}")
+        transformer = modules[0].auto_model.eval()
+        tokenizer = model.tokenizer
+
+        sample = tokenizer(["x^2 - 5x + 6 = 0 의 두 근의 합을 구하시오.", "수열"], padding=True, return_tensors='pt')
+        input_names = [name for name in TOKEN_INPUTS if name in sample]
+
+        class TokenEmbeddings(torch.nn.Module):
+            def __init__(self, auto_model):
+                super().__init__()
+                self.auto_model = auto_model
+
+            def forward(self, *inputs):
+                return self.auto_model(**dict(zip(input_names, inputs))).last_hidden_state
+
+        fp32_path = os.path.join(output, FP32_FILENAME)
+        dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names + ['token_embeddings']}
+        # 새 torch 는 기본이 dynamo 내보내기(onnxscript 필요)이므로 TorchScript 내보내기를 명시한다
+        legacy = {'dynamo': False} if 'dynamo' in inspect.signature(torch.onnx.export).parameters else {}
+        with torch.no_grad():
+            torch.onnx.export(
+                TokenEmbeddings(transformer), tuple(sample[name] for name in input_names), fp32_path,
+                input_names=input_names, output_names=['token_embeddings'], dynamic_axes=dynamic_axes,
+                opset_version=options['opset'], do_constant_folding=True, **legacy,
+            )
+        self.stdout.write(f"fp32 ONNX: {fp32_path} ({os.path.getsize(fp32_path) / 2**20:.1f}MB)")
+
+        # 가중치만 int8로 양자화하고 활성값은 실행 시 동적으로 양자화한다 (보정 데이터 불필요)
+        int8_path = os.path.join(output, INT8_FILENAME)
+        quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+        self.stdout.write(f"int8 ONNX: {int8_path} ({os.path.getsize(int8_path) / 2**20:.1f}MB)")
+
+        tokenizer.save_pretrained(output)
+        with open(os.path.join(output, CONFIG_FILENAME), 'w', encoding='utf-8') as f:
+            json.dump({
+                "model_name": settings.SBERT_MODEL_NAME,
+                "dim": model.get_sentence_embedding_dimension(),
+                "max_seq_length": model.max_seq_length,
+                "inputs": input_names,
+            }, f, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(
+            f"내보내기 완료: {output}\n"
+            f"정확도/처리량 비교: python manage.py bench_sbert_backends\n"
+            f"사용: SBERT_BACKEND=onnx-int8 (임베딩 저장소와 FAISS 인덱스는 처음 사용할 때 다시 만들어진다)"
+        ))
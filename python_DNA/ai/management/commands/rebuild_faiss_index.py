@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ai.utils.faiss_search import rebuild_index, sync_index, index_info
+
+
+class Command(BaseCommand):
+    help = ("DB 문제 은행으로 FAISS 인덱스를 디스크에 재구축합니다. 인덱스 종류는 FAISS_INDEX_TYPE "
+            "(auto면 코퍼스 크기로 선택)을 따르며, ivf/ivfpq 는 이때 학습합니다. "
+            "수정/삭제로 검색에서 제외 표시된 벡터(removed)도 이때 정리됩니다. "
+            "예: FAISS_INDEX_TYPE=hnsw python manage.py rebuild_faiss_index")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sync', action='store_true',
+                            help="전체 재구축 대신 DB와 대조해서 새 문제만 추가 (변경이 있거나 인덱스 종류가 바뀌어야 하면 재구축)")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        sync_index() if options['sync'] else rebuild_index()
+        info = index_info()
+        params = ", ".join(f"{k}={v}" for k, v in info.items() if k not in ('count', 'index_type'))
+        self.stdout.write(self.style.SUCCESS(
+            f"FAISS 인덱스 재구축 완료: {info['count']}개 문제, {info['index_type']} ({params}), "
+            f"{time.perf_counter() - started:.1f}s"
+        ))
@@ -0,0 +1,29 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "유형별 AI 문제 풀을 워터마크까지 채워 두는 백그라운드 워커를 실행합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--watermark', type=int, default=None, help="유형별 유지할 문제 수 (기본: AI_POOL_WATERMARK)")
+        parser.add_argument('--poll-interval', type=float, default=5.0, help="풀 확인 주기(초)")
+        parser.add_argument('--once', action='store_true', help="한 번만 채우고 종료")
+
+    def handle(self, *args, **options):
+        from ai.utils.pool import refill_once, refill_loop, pool_depths
+
+        if options['once']:
+            count = refill_once(options['watermark'])
+            self.stdout.write(self.style.SUCCESS(f"문제 {count}개 생성, 현재 풀: {pool_depths()}"))
+            return
+
+        stop_event = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+        self.stdout.write(self.style.SUCCESS("AI 문제 풀 채우기 워커 실행 중 (Ctrl+C로 종료)"))
+        try:
+            refill_loop(options['watermark'], options['poll_interval'], stop_event)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.1 on 2026-10-18 20:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PooledProblem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('problem_type', models.CharField(db_index=True, max_length=20, verbose_name='생성 유형')),
+                ('payload', models.JSONField(verbose_name='생성 결과')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='생성일')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ProblemPoolStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('problem_type', models.CharField(max_length=20, unique=True, verbose_name='생성 유형')),
+                ('hits', models.PositiveIntegerField(default=0, verbose_name='풀 적중')),
+                ('misses', models.PositiveIntegerField(default=0, verbose_name='풀 비어 있음')),
+                ('generated', models.PositiveIntegerField(default=0, verbose_name='채운 문제 수')),
+                ('failed', models.PositiveIntegerField(default=0, verbose_name='생성 실패')),
+            ],
+        ),
+    ]
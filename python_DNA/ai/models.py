@@ -1,3 +1,23 @@
 from django.db import models
 
-# Create your models here.
+
+class PooledProblem(models.Model):
+    """미리 생성해 둔 AI 문제 (유형별 대기열). 요청 시 하나씩 꺼내 문제 은행에 저장한다."""
+    problem_type = models.CharField("생성 유형", max_length=20, db_index=True)
+    payload = models.JSONField("생성 결과")
+    created_at = models.DateTimeField("생성일", auto_now_add=True)
+
+    def __str__(self):
+        return f"[{self.problem_type}] {self.payload.get('question', '')[:40]}"
+
+
+class ProblemPoolStats(models.Model):
+    """유형별 문제 풀 사용 통계 (풀에서 꺼냄 / 비어서 즉시 생성 / 채움 / 생성 실패)"""
+    problem_type = models.CharField("생성 유형", max_length=20, unique=True)
+    hits = models.PositiveIntegerField("풀 적중", default=0)
+    misses = models.PositiveIntegerField("풀 비어 있음", default=0)
+    generated = models.PositiveIntegerField("채운 문제 수", default=0)
+    failed = models.PositiveIntegerField("생성 실패", default=0)
+
+    def __str__(self):
+        return self.problem_type
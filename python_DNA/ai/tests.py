@@ -1,3 +1,255 @@
-from django.test import TestCase
+import asyncio
+import tempfile
+import threading
+import time
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+
+from problems.models import Problem
+
+from .utils import embedding_service, embedding_store, faiss_search, llm_client
+from .utils.embedding_store import EmbeddingStore
+
+DIM = 8
+MODEL = "test-model"
+
+
+class EmbeddingStoreTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.rng = np.random.default_rng(0)
+
+    def _store(self, dim=DIM, model=MODEL):
+        return EmbeddingStore(self.tmp.name, dim, model)
+
+    def _vectors(self, *keys):
+        return {key: self.rng.standard_normal(DIM).astype('float32') for key in keys}
+
+    def _assert_vectors(self, store, expected):
+        found = store.get_many(list(expected))
+        self.assertEqual(set(found), set(expected))
+        for key, vector in expected.items():
+            np.testing.assert_array_equal(found[key], vector)
+
+    def _log_lines(self, store):
+        with open(store.log_path, encoding='utf-8') as f:
+            return f.read().splitlines()
+
+    def test_put_and_get(self):
+        store = self._store()
+        items = self._vectors("a", "b", "c")
+        store.put_many(items)
+
+        self.assertEqual(len(store), 3)
+        self._assert_vectors(store, items)
+        self.assertEqual(store.get_many(["a", "missing"]).keys(), {"a"})
+
+    def test_put_skips_existing_keys(self):
+        store = self._store()
+        items = self._vectors("a")
+        store.put_many(items)
+        store.put_many(self._vectors("a"))
+
+        self._assert_vectors(store, items)
+        self.assertEqual(len(self._log_lines(store)), 1)
+
+    def test_evict_frees_row_for_reuse(self):
+        store = self._store()
+        store.put_many(self._vectors("a", "b", "c"))
+        row_b = store.rows["b"]
+
+        self.assertEqual(store.evict(["b", "missing"]), 1)
+        self.assertEqual(store.get_many(["b"]), {})
+        store.put_many(self._vectors("d"))
+        self.assertEqual(store.rows["d"], row_b)
+        self.assertEqual(store.size, 3)
+
+    def test_reopen_replays_log(self):
+        store = self._store()
+        items = self._vectors("a", "b", "c")
+        store.put_many(items)
+        store.evict(["b"])
+        del items["b"]
+
+        reopened = self._store()
+        self._assert_vectors(reopened, items)
+        self.assertEqual(reopened.get_many(["b"]), {})
+        self.assertEqual(reopened.free_rows, store.free_rows)
+
+    def test_other_instance_sees_appended_rows(self):
+        # 다른 프로세스처럼 같은 디렉터리를 연 두 인스턴스: 로그 꼬리만 재생해서 서로의 추가/삭제를 본다
+        first, second = self._store(), self._store()
+        first.put_many(self._vectors("a"))
+        items = self._vectors("b")
+        second.put_many(items)
+
+        self._assert_vectors(first, items)
+        self.assertEqual(first.rows["b"], second.rows["b"])
+        second.evict(["a"])
+        # first 는 삭제를 재생한 뒤 비워진 행을 다시 쓴다
+        items = self._vectors("c")
+        first.put_many(items)
+        self.assertNotIn("a", first.rows)
+        self._assert_vectors(second, items)
+        self.assertEqual(second.rows["c"], 0)
+
+    def test_compaction_rewrites_log(self):
+        with mock.patch.object(embedding_store, 'MIN_CAPACITY', 2):
+            store, other = self._store(), self._store()
+            items = self._vectors("a", "b", "c")
+            store.put_many(items)
+            store.evict(["b"])
+            self.assertEqual(len(self._log_lines(store)), 4)
+            store.evict(["c"])
+            del items["b"], items["c"]
+
+            # 로그가 살아 있는 행 수의 두 배를 넘으면 현재 맵 스냅샷으로 다시 쓴다
+            self.assertEqual(self._log_lines(store), [f"+ a {store.rows['a']}"])
+            self._assert_vectors(store, items)
+            # 교체된 로그 파일은 다른 인스턴스와 새로 연 저장소에서 처음부터 다시 재생된다
+            other.put_many(self._vectors("d"))
+            self.assertEqual(set(other.rows), {"a", "d"})
+            self.assertIn(other.rows["d"], (1, 2))
+            self._assert_vectors(self._store(), items)
+
+    def test_model_change_discards_vectors(self):
+        self._store().put_many(self._vectors("a"))
+
+        self.assertEqual(self._store(model="other-model").get_many(["a"]), {})
+        self.assertEqual(self._store(dim=DIM * 2).get_many(["a"]), {})
+
+
+class _StalledStream:
+    """SSE 줄을 내보낸 뒤 응답이 멈춘 스트리밍 응답."""
+    status = 200
+    headers = {}
+
+    def __init__(self, deltas):
+        self.lines = [f'data: {{"choices": [{{"delta": {{"content": "{d}"}}}}]}}\n'.encode() for d in deltas]
+        self.content = self
+        self.released = False
+
+    async def readline(self):
+        if self.lines:
+            return self.lines.pop(0)
+        await asyncio.sleep(60)
+
+    def release(self):
+        self.released = True
+
+
+class ChatCompletionStreamTests(SimpleTestCase):
+    def _stream(self, consume, deltas=("a", "b")):
+        response = _StalledStream(deltas)
+
+        async def post(*args, **kwargs):
+            return response
+
+        async def run():
+            session = mock.Mock(post=lambda *a, **kw: post())
+            with mock.patch.object(llm_client, '_get_async_state', return_value=(session, asyncio.Semaphore(1))):
+                received = []
+                with self.assertRaises(llm_client.LLMError):
+                    async for delta in llm_client.achat_completion_stream([], timeout=0.2):
+                        received.append(delta)
+                        await consume()
+                return received
+
+        return asyncio.run(run()), response
+
+    def test_stalled_stream_raises_llm_error(self):
+        async def consume():
+            pass
+
+        received, response = self._stream(consume)
+        self.assertEqual(received, ["a", "b"])
+        self.assertTrue(response.released)
+
+    def test_deadline_does_not_cancel_consumer_between_chunks(self):
+        # 조각을 받은 쪽이 제한 시간을 넘겨 기다려도 그 await 는 취소되지 않고, 다음 읽기에서 LLMError
+        finished = []
+
+        async def consume():
+            await asyncio.sleep(0.3)
+            finished.append(True)
+
+        received, _ = self._stream(consume)
+        self.assertEqual(received, ["a"])
+        self.assertEqual(finished, [True])
+
+
+class RebuildCatchUpTests(TestCase):
+    def test_changes_since_build_are_found_by_id(self):
+        kept, edited, deleted = (Problem.objects.create(question=f"q{i}") for i in range(3))
+        deleted_id = deleted.pk
+        rows = list(faiss_search.iter_problems())
+        ids = np.array([p['id'] for p in rows], dtype='int64')
+        digests = np.frombuffer(b''.join(faiss_search._text_digest(p) for p in rows), dtype='uint8').reshape(-1, 32)
+
+        # 재구축이 임베딩하는 사이에 수정/삭제/추가된 문제
+        Problem.objects.filter(pk=edited.pk).update(question="수정됨")
+        deleted.delete()
+        added = Problem.objects.create(question="새 문제")
+        changed, removed_rows = faiss_search._changes_since(ids, digests)
+
+        self.assertEqual([p['id'] for p in changed], [edited.pk, added.pk])
+        self.assertEqual(sorted(int(ids[row]) for row in removed_rows), [edited.pk, deleted_id])
+        self.assertNotIn(kept.pk, [p['id'] for p in changed])
+
+
+class _FakeEncoder:
+    def __init__(self, bulk_seconds=0.0):
+        self.bulk_seconds = bulk_seconds
+        self.calls = []
+
+    def encode(self, texts, batch_size=None, convert_to_numpy=True):
+        self.calls.append(list(texts))
+        if len(texts) >= 8:
+            time.sleep(self.bulk_seconds)
+        return np.ones((len(texts), DIM), dtype='float32')
+
+    def get_sentence_embedding_dimension(self):
+        return DIM
+
+
+class EmbeddingBatcherTests(SimpleTestCase):
+    def setUp(self):
+        self.model = _FakeEncoder(bulk_seconds=0.5)
+        patcher = mock.patch.object(embedding_service, 'get_sbert', return_value=self.model)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _item(self, *texts):
+        return list(texts), time.perf_counter(), None
+
+    def test_bulk_request_does_not_block_queries(self):
+        batcher = embedding_service.EmbeddingBatcher(max_batch=8, max_wait_ms=5)
+        bulk = threading.Thread(target=batcher.encode, args=([f"t{i}" for i in range(100)],))
+        bulk.start()
+        time.sleep(0.05)
+        started = time.perf_counter()
+        self.assertEqual(batcher.encode(["query"]).shape, (1, DIM))
+        elapsed = time.perf_counter() - started
+        bulk.join()
+
+        self.assertLess(elapsed, 0.3)
+        self.assertEqual(batcher.metrics()["direct_requests"], 1)
+        self.assertIn(["query"], self.model.calls)
+
+    def test_single_request_is_not_delayed(self):
+        batcher = embedding_service.EmbeddingBatcher(max_batch=8, max_wait_ms=1000)
+        batcher._queue.put(self._item("a"))
+        started = time.perf_counter()
+        self.assertEqual(len(batcher._collect()), 1)
+        self.assertLess(time.perf_counter() - started, 0.1)
+
+    def test_queued_second_request_opens_window(self):
+        # 유휴 상태 뒤 첫 묶음: 두 번째 요청이 이미 와 있으면 시간 창 동안 뒤따르는 요청까지 모은다
+        batcher = embedding_service.EmbeddingBatcher(max_batch=8, max_wait_ms=500)
+        batcher._queue.put(self._item("a"))
+        batcher._queue.put(self._item("b"))
+        threading.Timer(0.05, lambda: batcher._queue.put(self._item("c"))).start()
+        self.assertEqual([texts for texts, _, _ in batcher._collect()], [["a"], ["b"], ["c"]])
@@ -1,6 +1,10 @@
 from django.urls import path
-from .views import GenerateAiProblemAPIView
+from .views import GenerateAiProblemAPIView, GenerateAiProblemBatchAPIView, ProblemPoolStatusAPIView, EmbeddingMetricsAPIView, generate_ai_problem_stream
 
 urlpatterns = [
     path('generate/', GenerateAiProblemAPIView.as_view(), name='ai-generate'),
+    path('generate/batch/', GenerateAiProblemBatchAPIView.as_view(), name='ai-generate-batch'),
+    path('generate/stream/', generate_ai_problem_stream, name='ai-generate-stream'),
+    path('pool/', ProblemPoolStatusAPIView.as_view(), name='ai-pool-status'),
+    path('embedding/metrics/', EmbeddingMetricsAPIView.as_view(), name='ai-embedding-metrics'),
 ]
\ No newline at end of file
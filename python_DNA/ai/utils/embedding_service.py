@@ -0,0 +1,172 @@
+import os
+import queue
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import Future
+
+import numpy as np
+from django.conf import settings
+
+from .model_registry import get_sbert
+
+# SBERT 인코딩 마이크로 배칭.
+# 검색 요청마다 model.encode([query]) 를 배치 1로 호출하면 행렬 곱 효율을 거의 못 쓰므로,
+# 여러 스레드(뷰, 업로드 파이프라인)의 질의 크기 인코딩 요청을 큐에 모아
+# 첫 요청 후 EMBED_BATCH_WAIT_MS 동안(또는 EMBED_BATCH_MAX 개가 찰 때까지) 기다렸다가
+# 한 번의 model.encode 로 처리하고 결과를 요청별로 나눠 돌려준다.
+# EMBED_BATCH_MAX 이상인 요청(인덱스 재구축 등 대량 인코딩)은 큐를 거치지 않고 호출한 스레드에서 바로
+# 인코딩한다. 큐에 넣으면 그 요청 하나가 배치를 다 차지해서 뒤의 질의들이 대량 인코딩이 끝날 때까지 기다린다.
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+WAIT_MS_BUCKETS = (0.5, 1, 2, 5, 10, 20, 50, 100, 250)
+
+
+class Histogram:
+    """고정 구간 히스토그램. snapshot 의 buckets 는 Prometheus 처럼 누적(le) 개수."""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self):
+        buckets, total = {}, 0
+        for bound, n in zip(self.bounds + ('+Inf',), self.counts):
+            total += n
+            buckets[str(bound)] = total
+        return {
+            "buckets": buckets,
+            "count": self.count,
+            "sum": round(self.sum, 3),
+            "mean": round(self.sum / self.count, 3) if self.count else 0.0,
+        }
+
+
+class EmbeddingBatcher:
+    def __init__(self, max_batch, max_wait_ms):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.wait_ms = Histogram(WAIT_MS_BUCKETS)
+        self.requests = 0
+        self.direct_requests = 0
+
+    def encode(self, texts):
+        """texts 의 임베딩 행렬(float32, 정규화 전). 다른 스레드의 요청과 한 배치로 묶여 인코딩된다."""
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, get_sbert().get_sentence_embedding_dimension()), dtype='float32')
+        if len(texts) >= self.max_batch:
+            with self._metrics_lock:
+                self.direct_requests += 1
+            return np.asarray(get_sbert().encode(texts, batch_size=self.max_batch, convert_to_numpy=True),
+                              dtype='float32')
+        self._ensure_started()
+        future = Future()
+        self._queue.put((texts, time.perf_counter(), future))
+        return future.result()
+
+    def metrics(self):
+        with self._metrics_lock:
+            return {
+                "max_batch": self.max_batch,
+                "max_wait_ms": self.max_wait * 1000,
+                "requests": self.requests,
+                "direct_requests": self.direct_requests,
+                "batches": self.batch_sizes.count,
+                "batch_size": self.batch_sizes.snapshot(),
+                "wait_ms": self.wait_ms.snapshot(),
+            }
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                thread = threading.Thread(target=self._run, name="sbert-batcher", daemon=True)
+                thread.start()
+                self._thread = thread
+
+    def _collect(self):
+        """
+        첫 요청이 올 때까지 기다린 뒤, 큐에 이미 쌓인 요청을 모두 모은다. 두 번째 요청이 이미 와 있으면
+        (동시 요청이 있으면) 대기 시간 창이 끝나거나 배치가 찰 때까지 더 기다리고, 단독 요청이면 바로 인코딩한다.
+        시간 창은 첫 요청이 큐에 들어온 시각부터 재므로 이전 배치를 인코딩하는 동안 쌓인 요청은 더 기다리지 않는다.
+        """
+        batch = [self._queue.get()]
+        size = len(batch[0][0])
+        deadline = batch[0][1] + self.max_wait
+        while size < self.max_batch:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.perf_counter()
+                if len(batch) < 2 or remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            # 같은 텍스트는 배치 안에서 한 번만 인코딩한다
+            unique = list(dict.fromkeys(t for texts, _, _ in batch for t in texts))
+            with self._metrics_lock:
+                self.requests += len(batch)
+                self.batch_sizes.observe(len(unique))
+                for _, enqueued, _ in batch:
+                    self.wait_ms.observe((started - enqueued) * 1000)
+            try:
+                embs = get_sbert().encode(unique, batch_size=self.max_batch, convert_to_numpy=True)
+                embs = np.asarray(embs, dtype='float32')
+            except Exception as e:
+                print(f"[Embedding] Error: 배치 인코딩 실패 ({len(unique)}개): {e}")
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+            row = {t: i for i, t in enumerate(unique)}
+            for texts, _, future in batch:
+                future.set_result(embs[[row[t] for t in texts]])
+
+
+_service = None
+_service_lock = threading.Lock()
+
+def _reset_after_fork():
+    # 배칭 스레드는 fork 후 자식 프로세스에 없으므로 자식에서 처음 쓸 때 새로 만든다
+    global _service, _service_lock
+    _service = None
+    _service_lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+def get_embedding_service():
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = EmbeddingBatcher(settings.EMBED_BATCH_MAX, settings.EMBED_BATCH_WAIT_MS)
+    return _service
+
+def encode(texts):
+    return get_embedding_service().encode(texts)
+
+def embedding_metrics():
+    return get_embedding_service().metrics()
@@ -0,0 +1,209 @@
+import os
+import json
+import hashlib
+import threading
+
+import numpy as np
+from django.conf import settings
+
+from .locks import file_lock
+from .model_registry import sbert_model_tag
+
+# 디스크 구조
+#   vectors.f32 : (capacity, dim) float32 행렬, np.memmap으로 매핑
+#   rows.log    : "+ <key> <row>" / "- <key>" 추가 전용 로그 (hash → row 맵)
+#   store.json  : {"dim": ..., "model": 임베딩을 만든 인코더 (model_registry.sbert_model_tag)}
+# 모든 프로세스가 같은 로그를 잠금 하에 재생하므로 행 할당/해제가 일관되게 유지된다.
+
+MIN_CAPACITY = 1024
+
+
+def text_key(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingStore:
+    def __init__(self, directory, dim, model):
+        self.directory = directory
+        self.dim = dim
+        self.model = model
+        self.rows = {}
+        self.free_rows = []
+        self.size = 0
+        self._log_offset = 0
+        self._log_lines = 0
+        self._log_inode = None
+        self._vectors = None
+        self._lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+        self._check_dim()
+
+    # -------------------- 경로 --------------------
+    @property
+    def vectors_path(self):
+        return os.path.join(self.directory, 'vectors.f32')
+
+    @property
+    def log_path(self):
+        return os.path.join(self.directory, 'rows.log')
+
+    def _file_lock(self):
+        return file_lock(os.path.join(self.directory, '.lock'))
+
+    def _check_dim(self):
+        meta_path = os.path.join(self.directory, 'store.json')
+        with self._file_lock():
+            if os.path.exists(meta_path):
+                with open(meta_path, encoding='utf-8') as f:
+                    if _stored_meta(json.load(f)) == (self.dim, self.model):
+                        return
+                # 모델(차원)이나 추론 백엔드가 바뀌면 저장된 임베딩은 쓸 수 없다
+                for path in (self.vectors_path, self.log_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump({"dim": self.dim, "model": self.model}, f)
+
+    # -------------------- 로그 재생 / 매핑 --------------------
+    def _replay(self):
+        """다른 프로세스가 추가한 로그 꼬리만 읽어서 메모리 맵을 갱신한다."""
+        try:
+            inode = os.stat(self.log_path).st_ino
+        except OSError:
+            return
+        full_replay = inode != self._log_inode
+        if full_replay:
+            # 다른 프로세스가 압축(compaction)해서 로그 파일이 교체됨
+            self.rows, self.free_rows, self.size = {}, [], 0
+            self._log_offset, self._log_lines, self._log_inode = 0, 0, inode
+        with open(self.log_path, encoding='utf-8') as f:
+            f.seek(self._log_offset)
+            for line in f:
+                if not line.endswith('\n'):
+                    break
+                self._log_offset += len(line.encode('utf-8'))
+                self._log_lines += 1
+                parts = line.split()
+                if parts[0] == '+':
+                    row = int(parts[2])
+                    self.rows[parts[1]] = row
+                    if row in self.free_rows:
+                        self.free_rows.remove(row)
+                    self.size = max(self.size, row + 1)
+                elif parts[1] in self.rows:
+                    self.free_rows.append(self.rows.pop(parts[1]))
+        if full_replay:
+            self.free_rows = sorted(set(range(self.size)) - set(self.rows.values()))
+
+    def _capacity(self):
+        try:
+            return os.path.getsize(self.vectors_path) // (self.dim * 4)
+        except OSError:
+            return 0
+
+    def _ensure_capacity(self, needed):
+        capacity = self._capacity()
+        if needed > capacity:
+            new_capacity = max(MIN_CAPACITY, capacity * 2, needed)
+            with open(self.vectors_path, 'ab') as f:
+                f.truncate(new_capacity * self.dim * 4)
+            self._vectors = None
+
+    def _map(self):
+        capacity = self._capacity()
+        if self._vectors is None or self._vectors.shape[0] != capacity:
+            self._vectors = np.memmap(self.vectors_path, dtype='float32', mode='r+',
+                                      shape=(capacity, self.dim)) if capacity else None
+        return self._vectors
+
+    # -------------------- 공개 API --------------------
+    def get_many(self, keys):
+        """저장된 key만 {key: vector} 로 돌려준다."""
+        with self._lock:
+            if any(k not in self.rows for k in keys):
+                with self._file_lock():
+                    self._replay()
+            found = [k for k in keys if k in self.rows]
+            if not found:
+                return {}
+            vectors = self._map()
+            return {k: np.array(vectors[self.rows[k]]) for k in found}
+
+    def put_many(self, items):
+        """items: {key: vector}. 이미 있는 key는 건너뛴다."""
+        with self._lock, self._file_lock():
+            self._replay()
+            new_items = [(k, v) for k, v in items.items() if k not in self.rows]
+            if not new_items:
+                return
+            rows = []
+            for _ in new_items:
+                if self.free_rows:
+                    rows.append(self.free_rows.pop())
+                else:
+                    rows.append(self.size)
+                    self.size += 1
+            self._ensure_capacity(self.size)
+            vectors = self._map()
+            for (key, vector), row in zip(new_items, rows):
+                vectors[row] = vector
+            vectors.flush()
+            # 벡터를 먼저 쓰고 로그를 남겨야 다른 프로세스가 빈 행을 읽지 않는다
+            self._append_log([f"+ {k} {row}" for (k, _), row in zip(new_items, rows)])
+
+    def evict(self, keys):
+        with self._lock, self._file_lock():
+            self._replay()
+            keys = [k for k in set(keys) if k in self.rows]
+            if keys:
+                self._append_log([f"- {k}" for k in keys])
+            if self._log_lines > 2 * max(len(self.rows), MIN_CAPACITY):
+                self._compact()
+            return len(keys)
+
+    def _append_log(self, lines):
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            f.write(''.join(line + '\n' for line in lines))
+        self._replay()
+
+    def _compact(self):
+        """삭제 기록이 쌓인 로그를 현재 맵 스냅샷으로 다시 쓴다 (파일 잠금 하에서 호출)."""
+        tmp_path = self.log_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(''.join(f"+ {k} {row}\n" for k, row in self.rows.items()))
+        os.replace(tmp_path, self.log_path)
+        self._log_inode = None
+        self._replay()
+
+    def __len__(self):
+        return len(self.rows)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+def _stored_meta(meta):
+    # model 항목이 없는 저장소는 torch 백엔드(모델 이름 그대로)로 만든 것
+    return meta['dim'], meta.get('model', settings.SBERT_MODEL_NAME)
+
+def get_embedding_store(dim=None):
+    """
+    프로세스 공용 저장소를 반환한다. dim을 생략하면 디스크에 기록된 차원을 사용하므로
+    모델을 로드하지 않고도 조회/삭제가 가능하다 (저장소가 없거나 다른 인코더로 만든 것이면 None).
+    """
+    global _store
+    model = sbert_model_tag()
+    with _store_lock:
+        if dim is None:
+            if _store is not None and _store.model == model:
+                return _store
+            try:
+                with open(os.path.join(settings.EMBEDDING_STORE_DIR, 'store.json'), encoding='utf-8') as f:
+                    dim, stored_model = _stored_meta(json.load(f))
+            except (OSError, ValueError, KeyError):
+                return None
+            if stored_model != model:
+                return None
+        if _store is None or _store.dim != dim or _store.model != model:
+            _store = EmbeddingStore(settings.EMBEDDING_STORE_DIR, dim, model)
+        return _store
@@ -1,27 +1,615 @@
+import os
 import json
+import hashlib
+import tempfile
+import threading
+
+import numpy as np
 from django.conf import settings
-from sentence_transformers import SentenceTransformer
 import faiss
 
-model = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2')
+from problems.models import Problem
+from .locks import file_lock
+from .embedding_store import get_embedding_store, text_key
+from .model_registry import get_sbert, sbert_model_tag
+from . import embedding_service
+
+PROBLEM_FIELDS = ('id', 'question', 'latex', 'options', 'answer', 'category', 'image_path', 'extra')
+REBUILD_CHUNK = 1000
+
+# 프로세스당 한 번만 로드되는 인덱스 상태(스냅샷). i번째 행(벡터)은 ids[i] 번 Problem.
+# 수정/삭제된 문제의 행은 인덱스에서 빼지 않고 removed(행 번호)에 표시해 검색에서 제외한다
+# (hnsw 는 벡터 삭제를 지원하지 않고, 다른 종류도 삭제하면 행 번호가 바뀌므로). 수정된 문제는 새 행으로 다시 추가된다.
+# 표시된 행은 rebuild_faiss_index 로 재구축할 때 정리된다.
+#
+# 검색은 잠금 없이 그 시점의 스냅샷을 읽어서 하고, 인덱스를 바꾸는 쪽(추가/삭제, 재구축, 디스크 다시 읽기)만
+# _lock 을 잡고 새 스냅샷을 만들어 _state 를 통째로 바꿔 끼운다. 게시된 스냅샷의 FAISS 인덱스와 배열은
+# 다시 수정하지 않으므로 여러 스레드가 동시에 검색해도 안전하고, 재구축하는 동안에도 검색은 이전 스냅샷으로 계속된다.
+#   index  : 행 [0, index.ntotal) 의 FAISS 인덱스 (재구축/디스크 로드 시점, 또는 delta 병합 시 복사본에 추가)
+#   delta  : 그 뒤에 추가된 행들의 벡터. 게시된 인덱스에 add 하지 않고 정확한 내적으로 전수 검색한다.
+#            DELTA_MAX_ROWS 를 넘으면 인덱스 복사본에 합쳐서 새 스냅샷으로 바꾼다.
+#   vectors: 임베딩 파일 전체 행의 memmap (ivfpq 재정렬, similar_pairs 질의 벡터)
+DELTA_MAX_ROWS = 10000
+
+_state = {"index": None, "ids": np.zeros(0, dtype='int64'), "id_set": frozenset(), "removed": frozenset(),
+          "search_params": None, "delta": None, "delta_live": None, "vectors": None,
+          "fingerprint": 0, "mtime": None, "index_type": None}
+_lock = threading.RLock()
+# 인덱스가 아직 없을 때 한 스레드만 DB와 대조/재구축하게 한다 (검색/갱신 잠금 _lock 과 별개)
+_sync_lock = threading.Lock()
+
+# -------------------- 문제 은행 (DB) --------------------
+
+def iter_problems(chunk_size=2000):
+    """DB의 문제 은행을 id 순서로 스트리밍한다 (행마다 dict)."""
+    return Problem.objects.order_by('id').values(*PROBLEM_FIELDS).iterator(chunk_size=chunk_size)
 
 def load_problems():
-    with open(settings.PROBLEM_JSON_PATH, encoding='utf-8') as f:
-        return json.load(f)
+    return list(iter_problems())
+
+def problem_to_dict(problem):
+    return {field: getattr(problem, field) for field in PROBLEM_FIELDS}
+
+def problem_text(p):
+    return (p.get('question') or '') + ' ' + str(p.get('latex') or '')
+
+def encode_texts(texts):
+    """
+    정규화된 임베딩 행렬을 반환한다. 임베딩 저장소(content hash 키)에 이미 있는 텍스트는
+    다시 인코딩하지 않고, 새 텍스트만 모델로 인코딩해서 저장소에 추가한다.
+    """
+    store = get_embedding_store()
+    if not texts:
+        dim = store.dim if store else get_sbert().get_sentence_embedding_dimension()
+        return np.zeros((0, dim), dtype='float32')
+    keys = [text_key(t) for t in texts]
+    found = store.get_many(keys) if store else {}
+    missing = {k: t for k, t in zip(keys, texts) if k not in found}
+    if missing:
+        # 저장소에 없는 텍스트만, 다른 요청들과 묶어서(embedding_service) 인코딩한다
+        new_embs = embedding_service.encode(list(missing.values()))
+        faiss.normalize_L2(new_embs)
+        new_items = dict(zip(missing.keys(), new_embs))
+        get_embedding_store(new_embs.shape[1]).put_many(new_items)
+        found.update(new_items)
+    return np.stack([found[k] for k in keys]).astype('float32')
 
 def build_embeddings(problems):
-    corpus = [p['question'] + ' ' + str(p.get('latex', '')) for p in problems]
-    embs = model.encode(corpus, convert_to_numpy=True)
-    faiss.normalize_L2(embs)
-    return embs
-
-def get_similar_problem_idxs(query, top_k=3):
-    problems = load_problems()
-    embs = build_embeddings(problems)
-    query_emb = model.encode([query], convert_to_numpy=True)
-    faiss.normalize_L2(query_emb)
-    d = embs.shape[1]
-    index = faiss.IndexFlatIP(d)
-    index.add(embs)
-    D, I = index.search(query_emb, top_k)
-    return [int(i) for i in I[0]]
\ No newline at end of file
+    return encode_texts([problem_text(p) for p in problems])
+
+def evict_embeddings(keys):
+    """더 이상 어떤 문제도 쓰지 않는 임베딩을 저장소에서 제거한다."""
+    store = get_embedding_store()
+    keys = [k for k in keys if k and not Problem.objects.filter(embedding_key=k).exists()]
+    if not keys or store is None:
+        return 0
+    return store.evict(keys)
+
+# -------------------- 인덱스 종류 --------------------
+# flat  : 전수 검색 (IndexFlatIP). 정확하고, 작은 코퍼스에서는 가장 빠르다.
+# hnsw  : 그래프 기반 근사 검색. 학습이 필요 없고 점진 추가에 강하다. efSearch 로 정확도/속도 조절.
+# ivf   : k-means 로 nlist 개 셀로 나누고 질의마다 nprobe 개 셀만 검색 (벡터는 원본 그대로 저장).
+# ivfpq : ivf + product quantization (벡터당 pq_m 바이트). 메모리가 가장 적고 정확도가 가장 낮다.
+# auto  : 재구축 시점의 코퍼스 크기로 고른다 (AUTO_INDEX_TYPES).
+# 학습이 필요한 종류(ivf, ivfpq)는 재구축할 때 학습하고, 이후 추가되는 문제는 학습된 셀에 그대로 넣는다.
+
+INDEX_TYPES = ('auto', 'flat', 'hnsw', 'ivf', 'ivfpq')
+# (코퍼스 크기 상한, 종류): 상한 미만이면 해당 종류, 모두 넘으면 ivfpq
+AUTO_INDEX_TYPES = ((20000, 'flat'), (1000000, 'hnsw'))
+MIN_POINTS_PER_CENTROID = 39  # faiss k-means 가 경고 없이 학습하려면 셀당 필요한 최소 벡터 수
+PQ_CENTROIDS = 256  # PQ 서브 양자화기당 중심 수 (8비트 코드)
+TRAIN_SAMPLE_MAX = 100000
+# ivfpq 는 PQ 코드로 top_k × PQ_RERANK_FACTOR 개 후보를 찾은 뒤 임베딩 파일(memmap)의 원본 벡터로 다시 정렬한다
+PQ_RERANK_FACTOR = 4
+
+def choose_index_type(count, index_type=None):
+    index_type = index_type or settings.FAISS_INDEX_TYPE
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"알 수 없는 FAISS_INDEX_TYPE: {index_type} ({', '.join(INDEX_TYPES)} 중 하나)")
+    kind = index_type
+    if kind == 'auto':
+        kind = next((kind for limit, kind in AUTO_INDEX_TYPES if count < limit), 'ivfpq')
+    if kind == 'ivfpq' and count < PQ_CENTROIDS * MIN_POINTS_PER_CENTROID:
+        # PQ 를 학습하기에 벡터가 부족한 작은 코퍼스는 전수 검색이 더 정확하고 충분히 빠르다
+        return 'flat'
+    return kind
+
+def ivf_nlist(count):
+    nlist = settings.FAISS_IVF_NLIST or int(4 * np.sqrt(count))
+    return max(1, min(nlist, count // MIN_POINTS_PER_CENTROID))
+
+def pq_m(dim):
+    m = settings.FAISS_PQ_M or dim // 8  # 384차원 → 벡터당 48바이트
+    while dim % m:
+        m -= 1
+    return m
+
+def index_factory_string(index_type, count, dim):
+    if index_type == 'flat':
+        return 'Flat'
+    if index_type == 'hnsw':
+        return f'HNSW{settings.FAISS_HNSW_M},Flat'
+    if index_type == 'ivf':
+        return f'IVF{ivf_nlist(count)},Flat'
+    return f'IVF{ivf_nlist(count)},PQ{pq_m(dim)}'
+
+def new_index(index_type, count, dim):
+    """(실제 종류, 학습 전 빈 인덱스)"""
+    kind = choose_index_type(count, index_type)
+    index = faiss.index_factory(dim, index_factory_string(kind, count, dim), faiss.METRIC_INNER_PRODUCT)
+    if kind == 'ivfpq':
+        # polysemous 필터링(polysemous_ht)은 쓰지 않으므로 학습 시간만 10배 이상 늘리는 polysemous 학습을 끈다
+        index.do_polysemous_training = False
+    return kind, index
+
+def train_index(index, embs, seed=0):
+    """ivf/ivfpq 인덱스를 embs 에서 뽑은 표본(최대 TRAIN_SAMPLE_MAX 개)으로 학습한다."""
+    if index.is_trained:
+        return
+    rows = np.arange(len(embs))
+    if len(rows) > TRAIN_SAMPLE_MAX:
+        rows = np.sort(np.random.default_rng(seed).choice(rows, TRAIN_SAMPLE_MAX, replace=False))
+    index.train(np.ascontiguousarray(embs[rows]))
+
+def configure_search(index, nprobe=None, ef_search=None):
+    """검색 파라미터(ivf: nprobe, hnsw: efSearch)를 설정한다. 해당 없는 인덱스 종류에서는 무시된다."""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = min(nprobe or settings.FAISS_NPROBE, ivf.nlist)
+    if hasattr(index, 'hnsw'):
+        index.hnsw.efSearch = ef_search or settings.FAISS_EF_SEARCH
+    return index
+
+def search_params(index, removed):
+    """removed(행 번호)를 제외하고 검색하는 파라미터. 표시된 행이 없으면 None (인덱스 설정 그대로)."""
+    if not removed:
+        return None
+    batch = faiss.IDSelectorBatch(np.fromiter(removed, dtype='int64', count=len(removed)))
+    selector = faiss.IDSelectorNot(batch)
+    # 파라미터를 넘기면 인덱스에 설정된 nprobe/efSearch 대신 파라미터 값을 쓰므로 같은 값을 옮겨 둔다
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        params = faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nprobe)
+    elif hasattr(index, 'hnsw'):
+        params = faiss.SearchParametersHNSW(sel=selector, efSearch=index.hnsw.efSearch)
+    else:
+        params = faiss.SearchParameters(sel=selector)
+    params.referenced_objects = [selector, batch]
+    return params
+
+def rerank_exact(embs, candidates, vectors, top_k):
+    """근사 검색 후보(candidates, 행 번호)를 원본 벡터와의 정확한 내적으로 다시 정렬해 top_k 개만 남긴다."""
+    D = np.full((len(embs), top_k), -np.inf, dtype='float32')
+    I = np.full((len(embs), top_k), -1, dtype='int64')
+    for row, (query, cand) in enumerate(zip(embs, candidates)):
+        cand = cand[cand >= 0]
+        scores = vectors[cand] @ query
+        order = np.argsort(-scores)[:top_k]
+        D[row, :len(order)] = scores[order]
+        I[row, :len(order)] = cand[order]
+    return D, I
+
+# -------------------- 코퍼스 fingerprint --------------------
+# (problem id, 텍스트 hash) 쌍의 hash를 2^256 모듈러로 더한 값. 순서와 무관하고
+# 문제를 추가할 때 더하고 삭제할 때 빼기만 하면 되므로 전체 코퍼스를 다시 읽지 않고 갱신할 수 있다.
+
+FINGERPRINT_MOD = 1 << 256
+
+def key_fingerprint(problem_id, key):
+    return int(hashlib.sha256(f"{problem_id}:{key}".encode('utf-8')).hexdigest(), 16)
+
+def problem_fingerprint(problem_id, text):
+    return key_fingerprint(problem_id, text_key(text))
+
+def corpus_fingerprint(problems):
+    return sum(problem_fingerprint(p['id'], problem_text(p)) for p in problems) % FINGERPRINT_MOD
+
+# -------------------- 디스크 저장 --------------------
+
+def _index_path():
+    return os.path.join(settings.FAISS_INDEX_DIR, 'index.faiss')
+
+def _embeddings_path():
+    return os.path.join(settings.FAISS_INDEX_DIR, 'embeddings.f32')
+
+def _ids_path():
+    return os.path.join(settings.FAISS_INDEX_DIR, 'ids.i64')
+
+def _removed_path():
+    return os.path.join(settings.FAISS_INDEX_DIR, 'removed.i64')
+
+def _meta_path():
+    return os.path.join(settings.FAISS_INDEX_DIR, 'meta.json')
+
+def _file_lock():
+    return file_lock(os.path.join(settings.FAISS_INDEX_DIR, '.lock'))
+
+def _read_meta():
+    try:
+        with open(_meta_path(), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_meta(count, removed, fingerprint, dim, index_type):
+    tmp_path = _meta_path() + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"count": count, "removed": removed, "fingerprint": format(fingerprint, 'x'), "dim": dim,
+                   "model": sbert_model_tag(), "index_type": index_type}, f)
+    os.replace(tmp_path, _meta_path())
+    return os.path.getmtime(_meta_path())
+
+def _read_embeddings(dim, start, stop):
+    embs = np.fromfile(_embeddings_path(), dtype='float32', count=(stop - start) * dim,
+                       offset=start * dim * 4)
+    return embs.reshape(-1, dim)
+
+def _embedding_vectors(dim, count):
+    return np.memmap(_embeddings_path(), dtype='float32', mode='r', shape=(count, dim))
+
+def load_index_embeddings():
+    """디스크 인덱스의 임베딩 행렬 (i번째 행이 ids[i] 번 문제). 인덱스가 없으면 None."""
+    meta = _read_meta()
+    if not meta or not os.path.exists(_embeddings_path()):
+        return None
+    return _read_embeddings(meta['dim'], 0, meta['count'])
+
+def _publish(index, ids, delta, removed, fingerprint, mtime, index_type):
+    """새 스냅샷을 만들어 _state 를 바꿔 끼운다 (_lock 하에서 호출). index 는 검색 설정이 끝난 상태여야 한다."""
+    global _state
+    removed = frozenset(removed)
+    live = np.ones(len(ids), dtype=bool)
+    live[np.fromiter(removed, dtype='int64', count=len(removed))] = False
+    base = index.ntotal
+    _state = {
+        "index": index, "ids": ids, "id_set": frozenset(ids[live].tolist()), "removed": removed,
+        "search_params": search_params(index, [row for row in removed if row < base]),
+        "delta": delta, "delta_live": live[base:],
+        "vectors": _embedding_vectors(index.d, len(ids)) if len(ids) else None,
+        "fingerprint": fingerprint, "mtime": mtime, "index_type": index_type,
+    }
+
+def _load_from_disk():
+    """디스크의 인덱스 + 이후 추가된 임베딩 꼬리를 읽어 메모리 인덱스를 만든다."""
+    meta = _read_meta()
+    if not meta or not os.path.exists(_index_path()):
+        return False
+    if meta.get('model', settings.SBERT_MODEL_NAME) != sbert_model_tag():
+        # 다른 인코더(백엔드)로 만든 인덱스 → 재구축
+        return False
+    count = meta['count']
+    ids = np.fromfile(_ids_path(), dtype='int64', count=count)
+    if len(ids) < count:
+        return False
+    removed = np.fromfile(_removed_path(), dtype='int64', count=meta.get('removed', 0)) \
+        if meta.get('removed') else np.zeros(0, dtype='int64')
+    if len(removed) < meta.get('removed', 0):
+        return False
+    # 아직 게시하지 않은 새 인덱스이므로 꼬리를 바로 추가해도 된다
+    index = configure_search(faiss.read_index(_index_path()))
+    if index.ntotal < count:
+        index.add(_read_embeddings(meta['dim'], index.ntotal, count))
+    _publish(index, ids, np.zeros((0, index.d), dtype='float32'), set(removed.tolist()),
+             int(meta['fingerprint'], 16), os.path.getmtime(_meta_path()), meta.get('index_type', 'flat'))
+    return True
+
+def _refresh_locked():
+    """다른 워커가 디스크 인덱스를 바꿨으면 다시 읽는다 (파일 잠금 하에서 호출)."""
+    try:
+        mtime = os.path.getmtime(_meta_path())
+    except OSError:
+        return
+    if mtime != _state['mtime']:
+        _load_from_disk()
+
+def _text_digest(p):
+    return bytes.fromhex(text_key(problem_text(p)))
+
+def _changes_since(ids, digests):
+    """
+    재구축에 쓴 행(ids 오름차순, 행별 텍스트 hash)과 현재 DB를 id 순서로 맞춰 본다.
+    반환: (새로 생기거나 텍스트가 바뀐 문제들, 삭제 표시할 행 번호들)
+    """
+    ids = ids.tolist()
+    added, removed_rows, row = [], [], 0
+    for p in iter_problems():
+        while row < len(ids) and ids[row] < p['id']:
+            removed_rows.append(row)
+            row += 1
+        if row < len(ids) and ids[row] == p['id']:
+            if digests[row].tobytes() != _text_digest(p):
+                removed_rows.append(row)
+                added.append(p)
+            row += 1
+        else:
+            added.append(p)
+    removed_rows.extend(range(row, len(ids)))
+    return added, removed_rows
+
+def rebuild_index(index_type=None):
+    """
+    DB 전체를 스트리밍하면서 (저장소에 없는 것만) 임베딩해 임베딩 파일에 쓴 뒤, 그 파일로
+    인덱스(index_type, 기본 FAISS_INDEX_TYPE)를 학습/구축하고 저장한다.
+    임베딩/학습/구축은 잠금 없이 이 호출만의 임시 파일에 하므로 그동안 검색과 update_index 는
+    이전 인덱스로 계속된다. 마지막에 잠금을 잡고, 구축하는 사이 DB에서 바뀐 문제만 대조해서
+    (새 행 추가, 삭제 표시) 반영한 뒤 파일을 바꿔 끼운다.
+    """
+    os.makedirs(settings.FAISS_INDEX_DIR, exist_ok=True)
+    targets = {'index': _index_path(), 'embeddings': _embeddings_path(), 'ids': _ids_path(), 'removed': _removed_path()}
+    tmp = {}
+    for name in targets:
+        fd, tmp[name] = tempfile.mkstemp(dir=settings.FAISS_INDEX_DIR, prefix=f'{name}.', suffix='.tmp')
+        os.close(fd)
+    try:
+        ids, digests, fingerprint, dim = [], [], 0, None
+        with open(tmp['embeddings'], 'wb') as emb_file:
+            chunk = []
+
+            def _flush():
+                nonlocal fingerprint, dim
+                embs = build_embeddings(chunk)
+                dim = embs.shape[1]
+                embs.tofile(emb_file)
+                ids.extend(p['id'] for p in chunk)
+                digests.extend(_text_digest(p) for p in chunk)
+                fingerprint += corpus_fingerprint(chunk)
+                chunk.clear()
+
+            for p in iter_problems():
+                chunk.append(p)
+                if len(chunk) >= REBUILD_CHUNK:
+                    _flush()
+            _flush()
+        ids = np.array(ids, dtype='int64')
+        digests = np.frombuffer(b''.join(digests), dtype='uint8').reshape(-1, 32)
+        embs = np.memmap(tmp['embeddings'], dtype='float32', mode='r', shape=(len(ids), dim)) if len(ids) \
+            else np.zeros((0, dim), dtype='float32')
+        kind, index = new_index(index_type, len(ids), dim)
+        train_index(index, embs)
+        for start in range(0, len(ids), REBUILD_CHUNK):
+            index.add(np.ascontiguousarray(embs[start:start + REBUILD_CHUNK]))
+        del embs
+        faiss.write_index(index, tmp['index'])
+        # 구축하는 동안 바뀐 문제를 미리 임베딩해 저장소에 넣어 둔다 (잠금 하에서는 저장소 조회만 하도록)
+        build_embeddings(_changes_since(ids, digests)[0])
+
+        with _lock, _file_lock():
+            added, removed_rows = _changes_since(ids, digests)
+            for row in removed_rows:
+                fingerprint -= key_fingerprint(int(ids[row]), digests[row].tobytes().hex())
+            fingerprint = (fingerprint + corpus_fingerprint(added)) % FINGERPRINT_MOD
+            # 반영분은 인덱스 파일을 다시 쓰지 않고 임베딩/id 파일 꼬리와 delta 로 붙인다 (_load_from_disk 와 같은 구조)
+            delta = build_embeddings(added) if added else np.zeros((0, dim), dtype='float32')
+            with open(tmp['embeddings'], 'ab') as f:
+                delta.tofile(f)
+            ids = np.concatenate([ids, np.array([p['id'] for p in added], dtype='int64')])
+            ids.tofile(tmp['ids'])
+            np.array(removed_rows, dtype='int64').tofile(tmp['removed'])
+            for name, path in targets.items():
+                os.replace(tmp[name], path)
+            mtime = _write_meta(len(ids), len(removed_rows), fingerprint, dim, kind)
+            _publish(configure_search(index), ids, delta, removed_rows, fingerprint, mtime, kind)
+            return index
+    finally:
+        for path in tmp.values():
+            if os.path.exists(path):
+                os.remove(path)
+
+def update_index(problems=(), removed=()):
+    """
+    인덱스를 재구축하지 않고 바뀐 문제만 반영한다.
+      problems: 새로 저장되었거나 텍스트가 수정된 문제들(id 포함 dict) → 임베딩해서 새 행으로 추가
+      removed : 삭제되었거나 수정된 문제의 [(problem id, 이전 embedding_key)] → 해당 행을 삭제 표시
+    기존 코퍼스는 다시 읽지 않는다. 이미 인덱스에 있는(삭제 표시되지 않은) id는 다시 추가하지 않는다.
+    게시된 인덱스는 수정하지 않고, 새 행은 delta 에 붙인 새 스냅샷으로 바꿔 끼운다.
+    디스크에 인덱스가 없으면 재구축한다. 이 함수는 커밋 뒤(transaction.on_commit)에 호출되므로
+    problems/removed 는 재구축이 읽는 DB에 이미 반영되어 있다.
+    """
+    problems = list(problems)
+    # 인코딩은 잠금 밖에서 (임베딩 저장소에 없는 텍스트만 모델로 인코딩)
+    embs = build_embeddings(problems) if problems else None
+    with _lock, _file_lock():
+        if _state['index'] is not None:
+            _refresh_locked()
+            return _update_locked(problems, embs, removed)
+        if _load_from_disk():
+            return _update_locked(problems, embs, removed)
+    with _sync_lock:
+        if _state['index'] is None:
+            return rebuild_index()
+    # 다른 스레드가 먼저 재구축했다. 그 재구축이 이 변경을 커밋 전에 읽었을 수 있으므로 다시 반영한다
+    return update_index(problems, removed)
+
+def _update_locked(problems, embs, removed):
+    state = _state
+    index, ids, delta = state['index'], state['ids'], state['delta']
+    fingerprint = state['fingerprint']
+    dead = set(state['removed'])
+    id_set = set(state['id_set'])
+    removed_rows = []
+    for problem_id, key in removed:
+        if problem_id not in id_set:
+            continue
+        rows = np.flatnonzero(ids == problem_id)
+        removed_rows.extend(int(row) for row in rows if int(row) not in dead)
+        id_set.discard(problem_id)
+        fingerprint -= key_fingerprint(problem_id, key)
+    keep = [i for i, p in enumerate(problems) if p['id'] not in id_set]
+    problems = [problems[i] for i in keep]
+    if not problems and not removed_rows:
+        return index
+    if removed_rows:
+        dead.update(removed_rows)
+        with open(_removed_path(), 'ab') as f:
+            np.array(removed_rows, dtype='int64').tofile(f)
+    if problems:
+        embs = embs[keep]
+        new_ids = np.array([p['id'] for p in problems], dtype='int64')
+        with open(_embeddings_path(), 'ab') as f:
+            embs.tofile(f)
+        with open(_ids_path(), 'ab') as f:
+            new_ids.tofile(f)
+        fingerprint += corpus_fingerprint(problems)
+        ids = np.concatenate([ids, new_ids])
+        delta = np.concatenate([delta, embs])
+    if len(delta) > DELTA_MAX_ROWS:
+        # 검색 중인 인덱스는 건드리지 않고 복사본에 delta 를 합친다
+        index = configure_search(faiss.clone_index(index))
+        index.add(delta)
+        delta = delta[:0]
+    fingerprint %= FINGERPRINT_MOD
+    mtime = _write_meta(len(ids), len(dead), fingerprint, index.d, state['index_type'])
+    _publish(index, ids, delta, dead, fingerprint, mtime, state['index_type'])
+    return index
+
+def add_to_index(problems):
+    """새로 저장된 문제들(id 포함 dict)만 임베딩해서 인덱스에 추가한다."""
+    return update_index(problems=problems)
+
+def remove_from_index(removed):
+    """삭제된 문제들 [(problem id, embedding_key)]을 검색에서 제외한다 (한 번에 표시)."""
+    return update_index(removed=removed)
+
+def sync_index():
+    """
+    DB와 인덱스를 대조한다. 인덱스에 있는 문제가 그대로면 DB에 새로 생긴 문제만 추가하고,
+    삭제/수정된 문제가 있거나 (FAISS_INDEX_TYPE 이나 코퍼스 크기에 따라) 인덱스 종류가 바뀌어야 하면 전체 재구축한다.
+    DB는 잠금 밖에서 읽는다.
+    """
+    with _lock, _file_lock():
+        if _state['index'] is None:
+            _load_from_disk()
+        else:
+            _refresh_locked()
+        state = _state
+    if state['index'] is not None:
+        indexed, missing = [], []
+        for p in iter_problems():
+            (indexed if p['id'] in state['id_set'] else missing).append(p)
+        unchanged = len(indexed) == len(state['id_set']) and corpus_fingerprint(indexed) == state['fingerprint']
+        if unchanged and choose_index_type(len(indexed) + len(missing)) == state['index_type']:
+            return add_to_index(missing) if missing else state['index']
+    return rebuild_index()
+
+def _current_state():
+    """
+    검색에 쓸 현재 스냅샷.
+    프로세스 최초 로드 시에만 DB와 대조하고, 이후에는 다른 워커가 디스크 인덱스를
+    갱신했을 때(meta mtime 변경)만 잠금을 잡고 다시 읽는다. 그 밖에는 잠금을 잡지 않는다.
+    """
+    state = _state
+    if state['index'] is None:
+        with _sync_lock:
+            if _state['index'] is None:
+                sync_index()
+        return _state
+    try:
+        mtime = os.path.getmtime(_meta_path())
+    except OSError:
+        return state
+    if mtime != state['mtime']:
+        with _lock, _file_lock():
+            _refresh_locked()
+        return _state
+    return state
+
+def get_index():
+    """프로세스 캐시 인덱스 반환 (delta 에 있는 최근 추가분은 포함하지 않는다)."""
+    return _current_state()['index']
+
+def index_info():
+    """현재 프로세스에 로드된 인덱스의 종류와 파라미터 (로드 전이면 None)."""
+    state = _state
+    index = state['index']
+    if index is None:
+        return None
+    info = {"index_type": state['index_type'], "count": len(state['id_set']),
+            "removed": len(state['removed']), "delta": len(state['delta']), "dim": index.d}
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        info.update(nlist=ivf.nlist, nprobe=ivf.nprobe)
+    if hasattr(index, 'hnsw'):
+        info.update(efSearch=index.hnsw.efSearch)
+    return info
+
+def _delta_scores(state, embs):
+    """질의와 delta 행들의 내적 (삭제 표시된 행은 -inf)."""
+    scores = embs @ state['delta'].T
+    scores[:, ~state['delta_live']] = -np.inf
+    return scores
+
+def _search_state(state, embs, top_k):
+    """스냅샷에서 각 질의의 상위 top_k (유사도, 행 번호). 인덱스 결과와 delta 전수 검색 결과를 합친다."""
+    index, delta = state['index'], state['delta']
+    D = np.zeros((len(embs), 0), dtype='float32')
+    I = np.zeros((len(embs), 0), dtype='int64')
+    if index.ntotal:
+        if state['index_type'] == 'ivfpq':
+            _, candidates = index.search(embs, min(top_k * PQ_RERANK_FACTOR, index.ntotal),
+                                         params=state['search_params'])
+            D, I = rerank_exact(embs, candidates, state['vectors'], top_k)
+        else:
+            D, I = index.search(embs, min(top_k, index.ntotal), params=state['search_params'])
+    if len(delta):
+        scores = _delta_scores(state, embs)
+        k = min(top_k, len(delta))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        D = np.concatenate([D, np.take_along_axis(scores, top, axis=1)], axis=1)
+        I = np.concatenate([I, top + index.ntotal], axis=1)
+        order = np.argsort(-D, axis=1, kind='stable')[:, :top_k]
+        D, I = np.take_along_axis(D, order, axis=1), np.take_along_axis(I, order, axis=1)
+        I[np.isneginf(D)] = -1
+    return D, I
+
+def search_embeddings(embs, top_k=3):
+    """임베딩 행렬의 각 행과 가장 비슷한 문제들의 [[(problem id, 코사인 유사도)], ...]."""
+    state = _current_state()
+    if not state['id_set'] or len(embs) == 0:
+        return [[] for _ in range(len(embs))]
+    D, I = _search_state(state, embs, top_k)
+    ids = state['ids']
+    return [[(int(ids[i]), float(d)) for d, i in zip(drow, irow) if i >= 0] for drow, irow in zip(D, I)]
+
+def search_similar(query, top_k=3):
+    """query와 가장 비슷한 문제들의 [(problem id, 코사인 유사도)]."""
+    return search_embeddings(encode_texts([query]), top_k)[0]
+
+def get_similar_problem_ids(query, top_k=3):
+    return [problem_id for problem_id, _ in search_similar(query, top_k)]
+
+def similar_pairs(threshold, chunk_size=1024):
+    """
+    인덱스 안에서 코사인 유사도가 threshold 이상인 [(id_a, id_b, 유사도)] 쌍 (id_a < id_b).
+    Python에서 N² 쌍을 비교하지 않고, 인덱스 range_search를 청크 단위로 호출한다 (delta 행은 전수 비교).
+    질의 벡터는 임베딩 파일에서 읽는다 (PQ 인덱스는 원본 벡터를 복원할 수 없음).
+    근사 인덱스(hnsw/ivf/ivfpq)에서는 일부 쌍을 놓칠 수 있다. ivfpq 의 근사 유사도는 원본 벡터로 다시 계산해서
+    threshold 미만인 쌍은 버린다 (중복 삭제에 근사 값을 쓰지 않도록).
+    """
+    pairs = []
+    state = _current_state()
+    index, ids, removed, params = state['index'], state['ids'], state['removed'], state['search_params']
+    vectors, base = state['vectors'], index.ntotal
+    for start in range(0, len(ids), chunk_size):
+        stop = min(start + chunk_size, len(ids))
+        queries = np.ascontiguousarray(vectors[start:stop])
+        lims, D, I = np.zeros(stop - start + 1, dtype='int64'), None, None
+        if base:
+            lims, D, I = index.range_search(queries, threshold, params=params)
+            if state['index_type'] == 'ivfpq':
+                rows = np.repeat(np.arange(stop - start), np.diff(lims).astype('int64'))
+                D = (vectors[I] * queries[rows]).sum(axis=1)
+        delta_scores = _delta_scores(state, queries) if len(state['delta']) else None
+        for row in range(stop - start):
+            if start + row in removed:
+                continue
+            a = int(ids[start + row])
+            for k in range(lims[row], lims[row + 1]):
+                b = int(ids[I[k]])
+                if a < b and D[k] >= threshold:
+                    pairs.append((a, b, float(D[k])))
+            if delta_scores is not None:
+                for j in np.flatnonzero(delta_scores[row] >= threshold):
+                    b = int(ids[base + j])
+                    if a < b:
+                        pairs.append((a, b, float(delta_scores[row, j])))
+    return pairs
@@ -1,40 +1,21 @@
-import os, json, random, re, traceback
-from django.conf import settings
-from .resources import PROBLEM_MAKERS, classify_type_by_text
-from .faiss_search import get_similar_problem_idxs, load_problems
-import openai
-from PIL import Image, ImageDraw, ImageFont
+import json, re, traceback
+from .resources import PROBLEM_MAKERS
+from .llm_client import chat_completion
+from .renderer import schedule_render
+from problems.models import Problem
+from problems.bank import save_problems, sample_problems_by_type
 
 from dotenv import load_dotenv
 load_dotenv()
 
-def save_ai_problem_image(img_object, prefix='ai_problem'):
-    # media/images/에 저장
-    os.makedirs(settings.IMAGES_DIR, exist_ok=True)
-    filename = f"{prefix}_{random.randint(100000,999999)}.png"
-    image_path = settings.IMAGES_DIR / filename
-    img_object.save(image_path)
-    image_url = f"/media/images/{filename}"
-    return image_path, image_url
+GENERATION_MODEL = "gpt-4o"
+GENERATION_MAX_TOKENS = 850
+GENERATION_TEMPERATURE = 0.5
 
-def append_problem_to_json(data):
-    os.makedirs(settings.PROBLEM_JSON_DIR, exist_ok=True)
-    problems_json_path = settings.PROBLEM_JSON_PATH
-    if os.path.exists(problems_json_path):
-        with open(problems_json_path, "r", encoding="utf-8") as f:
-            problems = json.load(f)
-    else:
-        problems = []
-    problems.append(data)
-    with open(problems_json_path, "w", encoding="utf-8") as f:
-        json.dump(problems, f, ensure_ascii=False, indent=2)
-
-def make_problem_with_gpt_service(problem_type, top_k=3):
-    # 1. 문제 예시 추출
-    problems = load_problems()
-    similar_idxs = [i for i, p in enumerate(problems)
-                    if classify_type_by_text(p['question'] + str(p.get('latex', ''))) == problem_type]
-    similar_problems = [problems[idx] for idx in (random.sample(similar_idxs, min(top_k, len(similar_idxs))) if similar_idxs else random.sample(range(len(problems)), min(top_k, len(problems))))]
+def build_generation_prompt(problem_type, top_k=3):
+    """예시 문제와 유형별 랜덤 문제로 GPT 프롬프트를 만든다. 반환: (prompt, latex_conds, explain)"""
+    # 1. 문제 예시 추출 (생성 유형 색인 조회)
+    similar_problems = sample_problems_by_type(problem_type, top_k)
 
     # 2. 유형 랜덤 문제 하나 생성
     problem_base = PROBLEM_MAKERS[problem_type]()
@@ -77,41 +58,64 @@ def make_problem_with_gpt_service(problem_type, top_k=3):
         )
         return prompt
 
-    def safe_json_loads(content):
-        m = re.search(r'\{[\s\S]+\}', content)
-        if not m:
-            raise ValueError("No JSON block found.")
-        return json.loads(m.group())
-
-    # 4. GPT 호출
-    openai.api_key = os.getenv("OPENAI_API_KEY")
     prompt = make_gpt_problem_prompt(problem_type, problem_base['answer'], latex_conds, examples, explain)
-    response = openai.ChatCompletion.create(
-        model="gpt-4o",
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=850,
-        temperature=0.5
-    )
-    content = response.choices[0].message.content
+    return prompt, latex_conds, explain
+
+def safe_json_loads(content):
+    m = re.search(r'\{[\s\S]+\}', content)
+    if not m:
+        raise ValueError("No JSON block found.")
+    return json.loads(m.group())
+
+def parse_generated_problem(content, problem_type, latex_conds, explain):
+    """GPT 응답을 문제 dict로 파싱/검증한다. 문제 본문이 없거나 JSON이 아니면 None."""
     try:
         p = safe_json_loads(content)
-        if not p.get('latex'): p['latex'] = latex_conds
-        if not p.get('question'): p['question'] = f"{problem_type} 유형 고난도 문제"
-        if not p.get('explain'): p['explain'] = explain
+    except Exception as e:
+        print("[ERROR] GPT 문제 파싱 실패!")
+        print("에러 내용:", str(e))
+        return None
+    if not isinstance(p.get('question'), str) or not p['question'].strip():
+        print("[ERROR] GPT 응답에 문제 본문이 없습니다.")
+        return None
+    if not p.get('latex'): p['latex'] = latex_conds
+    if not p.get('explain'): p['explain'] = explain
+    p['problem_type'] = problem_type
+    return p
+
+def generate_problem(problem_type, top_k=3):
+    """GPT로 problem_type 유형 문제 하나를 생성하고 검증한다 (저장하지 않음). 실패하면 None."""
+    prompt, latex_conds, explain = build_generation_prompt(problem_type, top_k)
+    # 4. GPT 호출
+    content = chat_completion(
+        [{"role": "user", "content": prompt}],
+        model=GENERATION_MODEL,
+        max_tokens=GENERATION_MAX_TOKENS,
+        temperature=GENERATION_TEMPERATURE
+    )
+    return parse_generated_problem(content, problem_type, latex_conds, explain)
 
-        # 5. (예시) 문제 텍스트 이미지로 저장
-        img = Image.new('RGB', (700, 160), (255,255,255))
-        draw = ImageDraw.Draw(img)
-        font = ImageFont.load_default()
-        draw.text((20, 30), p['question'], fill=(0,0,0), font=font)
-        image_path, image_url = save_ai_problem_image(img)
+def publish_generated_problems(items, user=None):
+    """
+    생성된 문제들을 문제 은행에 bulk_create 한 번으로 저장한다. 저장된 문제 dict(id 포함) 목록을 반환.
+    이미지는 content hash로 정해진 URL만 먼저 붙이고, 렌더링은 백그라운드에서 진행된다.
+    """
+    # 5. 문제 이미지 렌더링 예약 (tikz_code가 있으면 TikZ 그림, 없으면 문제 텍스트)
+    items = [dict(p, image_path=schedule_render(p)) for p in items]
+    # 6. DB 일괄 저장(+ 커밋 후 FAISS 인덱스 증분 갱신)
+    problems = save_problems(items, user=user, source=Problem.SOURCE_GENERATED)
+    return [dict(p, id=problem.id) for p, problem in zip(items, problems)]
 
-        # 6. 저장 및 응답
-        p['image_path'] = image_url
-        append_problem_to_json(p)
-        return p
+def publish_generated_problem(p, user=None):
+    """생성된 문제를 문제 은행에 저장한다 (이미지는 백그라운드 렌더링). 저장된 문제 dict(id 포함)를 반환."""
+    try:
+        return publish_generated_problems([p], user)[0]
     except Exception as e:
-        print("[ERROR] GPT 문제 파싱 실패!")
+        print("[ERROR] 생성 문제 저장 실패!")
         print("에러 내용:", str(e))
         traceback.print_exc()
-        return None
\ No newline at end of file
+        return None
+
+def make_problem_with_gpt_service(problem_type, top_k=3, user=None):
+    p = generate_problem(problem_type, top_k)
+    return publish_generated_problem(p, user) if p else None
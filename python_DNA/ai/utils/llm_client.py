@@ -0,0 +1,253 @@
+import os
+import json
+import time
+import random
+import asyncio
+import threading
+import weakref
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# GPT 호출 공용 클라이언트
+#   - keep-alive 연결 풀 (동기: requests.Session, 비동기: 이벤트 루프별 aiohttp.ClientSession)
+#   - 프로세스당 동시 요청 수 제한 (LLM_MAX_CONCURRENCY)
+#   - 429/5xx/연결 오류는 지수 백오프(+jitter)로 재시도, Retry-After 헤더가 있으면 따름
+#   - 재시도를 포함한 전체 제한 시간(LLM_TIMEOUT)을 넘기면 LLMError
+
+RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+
+
+class LLMError(Exception):
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+def _url():
+    return settings.OPENAI_API_BASE.rstrip('/') + '/chat/completions'
+
+def _headers():
+    return {
+        "Authorization": f"Bearer {os.getenv('OPENAI_API_KEY', '')}",
+        "Content-Type": "application/json",
+    }
+
+def _payload(messages, model, max_tokens, temperature):
+    return {"model": model, "messages": messages, "max_tokens": max_tokens, "temperature": temperature}
+
+def _content(data):
+    try:
+        return data["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError):
+        raise LLMError(f"응답 형식 오류: {str(data)[:200]}")
+
+def _backoff(attempt, retry_after=None):
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_MAX)
+        except ValueError:
+            pass
+    delay = min(BACKOFF_BASE * (2 ** attempt), BACKOFF_MAX)
+    return delay * (0.5 + random.random() / 2)
+
+def _check_response(status, data, text):
+    if status == 200:
+        return _content(data)
+    raise LLMError(f"HTTP {status}: {text[:200]}", status=status)
+
+# -------------------- 동기 --------------------
+
+_session = None
+_session_lock = threading.Lock()
+_semaphore = None
+
+def _reset_after_fork():
+    # 부모의 keep-alive 소켓을 자식과 공유하면 응답이 섞이고, 부모 스레드가 잡고 있던
+    # 세마포어 자리는 자식에서 영원히 반환되지 않으므로 자식에서 처음 쓸 때 새로 만든다
+    global _session, _session_lock, _semaphore, _async_state
+    _session, _session_lock, _semaphore = None, threading.Lock(), None
+    _async_state = weakref.WeakKeyDictionary()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+def _get_session():
+    global _session, _semaphore
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.LLM_MAX_CONCURRENCY)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _semaphore = threading.BoundedSemaphore(settings.LLM_MAX_CONCURRENCY)
+            _session = session
+        return _session
+
+def chat_completion(messages, model="gpt-4o", max_tokens=1024, temperature=0.0, timeout=None):
+    """GPT 응답 본문(content 문자열)을 반환한다. 실패하면 LLMError."""
+    session = _get_session()
+    deadline = time.monotonic() + (timeout or settings.LLM_TIMEOUT)
+    payload = _payload(messages, model, max_tokens, temperature)
+    attempt = 0
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise LLMError("GPT 요청 제한 시간 초과")
+        retry_after = None
+        if not _semaphore.acquire(timeout=remaining):
+            raise LLMError("GPT 요청 제한 시간 초과 (동시 요청 대기)")
+        try:
+            remaining = deadline - time.monotonic()
+            response = session.post(_url(), json=payload, headers=_headers(),
+                                    timeout=(min(settings.LLM_CONNECT_TIMEOUT, remaining), remaining))
+            if response.status_code not in RETRY_STATUS:
+                try:
+                    data = response.json()
+                except ValueError:
+                    data = None
+                return _check_response(response.status_code, data, response.text)
+            error = LLMError(f"HTTP {response.status_code}: {response.text[:200]}", status=response.status_code)
+            retry_after = response.headers.get("Retry-After")
+        except requests.RequestException as e:
+            error = LLMError(f"연결 오류: {e}")
+        finally:
+            _semaphore.release()
+        if attempt >= settings.LLM_MAX_RETRIES:
+            raise error
+        delay = _backoff(attempt, retry_after)
+        if time.monotonic() + delay >= deadline:
+            raise error
+        print(f"[LLM] 재시도 {attempt + 1}/{settings.LLM_MAX_RETRIES} ({delay:.1f}s 후): {error}")
+        time.sleep(delay)
+        attempt += 1
+
+# -------------------- 비동기 --------------------
+
+# aiohttp 세션/세마포어는 이벤트 루프에 묶이므로 루프마다 하나씩 만든다
+_async_state = weakref.WeakKeyDictionary()
+
+def _get_async_state():
+    import aiohttp
+    loop = asyncio.get_running_loop()
+    state = _async_state.get(loop)
+    if state is None or state[0].closed:
+        connector = aiohttp.TCPConnector(limit=settings.LLM_MAX_CONCURRENCY, keepalive_timeout=30)
+        state = (aiohttp.ClientSession(connector=connector), asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY))
+        _async_state[loop] = state
+    return state
+
+async def achat_completion(messages, model="gpt-4o", max_tokens=1024, temperature=0.0, timeout=None):
+    """chat_completion 의 비동기 버전."""
+    import aiohttp
+    session, semaphore = _get_async_state()
+    deadline = time.monotonic() + (timeout or settings.LLM_TIMEOUT)
+    payload = _payload(messages, model, max_tokens, temperature)
+    attempt = 0
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise LLMError("GPT 요청 제한 시간 초과")
+        retry_after = None
+        try:
+            async with asyncio.timeout(remaining):
+                async with semaphore:
+                    async with session.post(_url(), json=payload, headers=_headers()) as response:
+                        text = await response.text()
+                        if response.status not in RETRY_STATUS:
+                            try:
+                                data = await response.json(content_type=None)
+                            except ValueError:
+                                data = None
+                            return _check_response(response.status, data, text)
+                        error = LLMError(f"HTTP {response.status}: {text[:200]}", status=response.status)
+                        retry_after = response.headers.get("Retry-After")
+        except TimeoutError:
+            raise LLMError("GPT 요청 제한 시간 초과")
+        except aiohttp.ClientError as e:
+            error = LLMError(f"연결 오류: {e}")
+        if attempt >= settings.LLM_MAX_RETRIES:
+            raise error
+        delay = _backoff(attempt, retry_after)
+        if time.monotonic() + delay >= deadline:
+            raise error
+        print(f"[LLM] 재시도 {attempt + 1}/{settings.LLM_MAX_RETRIES} ({delay:.1f}s 후): {error}")
+        await asyncio.sleep(delay)
+        attempt += 1
+
+async def _within(awaitable, deadline):
+    """deadline(time.monotonic 기준)까지만 기다린다. 넘기면 TimeoutError."""
+    return await asyncio.wait_for(awaitable, max(deadline - time.monotonic(), 0))
+
+async def achat_completion_stream(messages, model="gpt-4o", max_tokens=1024, temperature=0.0, timeout=None):
+    """
+    스트리밍 응답: 모델이 생성하는 content 조각을 도착하는 대로 yield 한다.
+    첫 조각을 받기 전까지만 재시도하고, 전체 제한 시간은 스트림이 끝날 때까지 적용된다.
+    제한 시간은 연결과 조각 읽기 하나하나에만 건다. yield 로 멈춰 있는 동안에는 호출한 쪽의
+    코드(예: SSE 응답 전송)가 실행되므로, 그 구간에 취소 범위(asyncio.timeout)를 걸어 두면
+    LLMError 대신 호출한 쪽의 await 가 취소된다.
+    """
+    import aiohttp
+    session, semaphore = _get_async_state()
+    deadline = time.monotonic() + (timeout or settings.LLM_TIMEOUT)
+    payload = dict(_payload(messages, model, max_tokens, temperature), stream=True)
+    attempt = 0
+    while True:
+        if deadline - time.monotonic() <= 0:
+            raise LLMError("GPT 요청 제한 시간 초과")
+        retry_after = None
+        started = False
+        try:
+            await _within(semaphore.acquire(), deadline)
+            try:
+                response = await _within(session.post(_url(), json=payload, headers=_headers()), deadline)
+                try:
+                    if response.status == 200:
+                        while True:
+                            line = await _within(response.content.readline(), deadline)
+                            if not line:
+                                return
+                            line = line.strip()
+                            if not line.startswith(b"data:"):
+                                continue
+                            data = line[5:].strip()
+                            if data == b"[DONE]":
+                                return
+                            delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                            if delta:
+                                started = True
+                                yield delta
+                    text = await _within(response.text(), deadline)
+                    if response.status not in RETRY_STATUS:
+                        raise LLMError(f"HTTP {response.status}: {text[:200]}", status=response.status)
+                    error = LLMError(f"HTTP {response.status}: {text[:200]}", status=response.status)
+                    retry_after = response.headers.get("Retry-After")
+                finally:
+                    response.release()
+            finally:
+                semaphore.release()
+        except TimeoutError:
+            raise LLMError("GPT 요청 제한 시간 초과")
+        except (aiohttp.ClientError, ValueError, KeyError, IndexError) as e:
+            error = LLMError(f"스트림 오류: {e}")
+            if started:
+                raise error
+        if attempt >= settings.LLM_MAX_RETRIES:
+            raise error
+        delay = _backoff(attempt, retry_after)
+        if time.monotonic() + delay >= deadline:
+            raise error
+        print(f"[LLM] 재시도 {attempt + 1}/{settings.LLM_MAX_RETRIES} ({delay:.1f}s 후): {error}")
+        await asyncio.sleep(delay)
+        attempt += 1
+
+async def aclose():
+    """현재 이벤트 루프의 aiohttp 세션을 닫는다."""
+    state = _async_state.pop(asyncio.get_running_loop(), None)
+    if state:
+        await state[0].close()
@@ -0,0 +1,32 @@
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows 개발 환경
+    fcntl = None
+
+# 같은 스레드가 이미 잡은 잠금을 다시 요청하면 (flock은 파일을 새로 열면 자기 자신과도
+# 경합하므로) 그대로 통과시킨다.
+_held = threading.local()
+
+
+@contextmanager
+def file_lock(lock_path):
+    """여러 워커 프로세스 사이에서 lock_path 파일로 배타 잠금을 건다 (스레드 내 재진입 가능)."""
+    held = _held.__dict__.setdefault('paths', set())
+    if lock_path in held:
+        yield
+        return
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    with open(lock_path, 'a') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        held.add(lock_path)
+        try:
+            yield
+        finally:
+            held.discard(lock_path)
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,122 @@
+import os
+import threading
+import time
+
+from django.conf import settings
+
+# 무거운 ML 모델(torch, 가중치)은 import 시점이 아니라 처음 사용할 때 로드하고,
+# 프로세스당 하나의 인스턴스를 공유한다. gunicorn preload로 마스터에서 로드한 모델은
+# fork 후에도 그대로 쓰고, 잠금만 자식 프로세스에서 새로 만든다.
+
+# SBERT 추론 백엔드: torch(fp32 SentenceTransformer), onnx(ONNX Runtime fp32), onnx-int8(동적 양자화).
+# onnx 계열은 `python manage.py export_sbert_onnx` 로 SBERT_ONNX_DIR 에 내보낸 모델을 사용한다.
+SBERT_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+def load_sbert(backend):
+    if backend not in SBERT_BACKENDS:
+        raise ValueError(f"알 수 없는 SBERT_BACKEND: {backend} ({', '.join(SBERT_BACKENDS)} 중 하나)")
+    if backend == "torch":
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(settings.SBERT_MODEL_NAME)
+    from .onnx_encoder import OnnxSentenceEncoder
+    return OnnxSentenceEncoder(settings.SBERT_ONNX_DIR, quantized=backend == "onnx-int8",
+                               num_threads=torch_thread_budget())
+
+def sbert_model_tag(backend=None):
+    """
+    임베딩을 만든 인코더 식별자. 임베딩 저장소와 FAISS 인덱스에 기록해 두고, 백엔드가 바뀌면
+    (fp32와 int8 임베딩이 섞이지 않도록) 다시 인코딩한다. torch 백엔드는 모델 이름 그대로.
+    """
+    backend = backend or settings.SBERT_BACKEND
+    return settings.SBERT_MODEL_NAME if backend == "torch" else f"{settings.SBERT_MODEL_NAME}:{backend}"
+
+def _load_sbert():
+    return load_sbert(settings.SBERT_BACKEND)
+
+def _load_latex_ocr():
+    from pix2tex.cli import LatexOCR
+    return LatexOCR()
+
+MODEL_LOADERS = {
+    "sbert": _load_sbert,
+    "latex_ocr": _load_latex_ocr,
+}
+
+_models = {}
+_load_times = {}
+_locks = {name: threading.Lock() for name in MODEL_LOADERS}
+_torch_configured = False
+
+def _reset_after_fork():
+    # fork 시점에 다른 스레드가 잡고 있던 잠금은 자식에서 영원히 풀리지 않으므로 새로 만든다
+    global _locks
+    _locks = {name: threading.Lock() for name in MODEL_LOADERS}
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+def torch_thread_budget():
+    """워커 프로세스 하나가 쓸 torch intra-op 스레드 수 (기본: CPU 수 / 워커 프로세스 수)."""
+    if settings.TORCH_NUM_THREADS:
+        return settings.TORCH_NUM_THREADS
+    workers = int(os.getenv('WEB_CONCURRENCY', '1') or 1)
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+def configure_torch_threads():
+    """모델 로드 전에 한 번, 프로세스의 torch 스레드 수를 정한다 (여러 요청이 동시에 추론할 때 코어 과점유 방지)."""
+    global _torch_configured
+    if _torch_configured:
+        return
+    _torch_configured = True
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(torch_thread_budget())
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # 이미 병렬 작업이 실행된 뒤에는 바꿀 수 없다
+
+
+def get_model(name):
+    model = _models.get(name)
+    if model is not None:
+        return model
+    with _locks[name]:
+        # 다른 스레드가 먼저 로드했을 수 있으므로 잠금 안에서 다시 확인
+        if name not in _models:
+            configure_torch_threads()
+            start = time.perf_counter()
+            _models[name] = MODEL_LOADERS[name]()
+            _load_times[name] = time.perf_counter() - start
+            print(f"[ModelRegistry] {name} 로드 완료 ({_load_times[name]:.2f}s)")
+        return _models[name]
+
+def get_sbert():
+    return get_model("sbert")
+
+def get_latex_ocr():
+    return get_model("latex_ocr")
+
+def is_loaded(name):
+    return name in _models
+
+def load_times():
+    return dict(_load_times)
+
+def prewarm(names=None, delay=0.0):
+    """백그라운드 스레드에서 모델을 미리 로드한다. 실패해도 첫 요청 때 다시 시도된다."""
+    names = list(names or MODEL_LOADERS)
+
+    def _run():
+        if delay:
+            time.sleep(delay)
+        for name in names:
+            try:
+                get_model(name)
+            except Exception as e:
+                print(f"[ModelRegistry] {name} 사전 로드 실패: {e}")
+
+    thread = threading.Thread(target=_run, name="model-prewarm", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,61 @@
+import json
+import os
+
+import numpy as np
+
+# export_sbert_onnx 가 내보낸 SBERT(트랜스포머 + mean pooling)를 ONNX Runtime으로 실행한다.
+# torch 없이 CPU에서 동작하며, SentenceTransformer 의 encode / get_sentence_embedding_dimension 과
+# 같은 인터페이스를 제공하므로 model_registry 의 "sbert" 자리에 그대로 쓸 수 있다.
+#
+# 디렉터리 구조 (SBERT_ONNX_DIR)
+#   model.onnx      : fp32 트랜스포머 (입력 input_ids/attention_mask[/token_type_ids], 출력 token_embeddings)
+#   model.int8.onnx : 가중치 int8 동적 양자화 버전
+#   export.json     : {"model_name", "dim", "max_seq_length", "inputs"}
+#   토크나이저 파일 (tokenizer.save_pretrained)
+
+FP32_FILENAME = 'model.onnx'
+INT8_FILENAME = 'model.int8.onnx'
+CONFIG_FILENAME = 'export.json'
+
+
+class OnnxSentenceEncoder:
+    def __init__(self, model_dir, quantized=True, num_threads=None):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        path = os.path.join(model_dir, INT8_FILENAME if quantized else FP32_FILENAME)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} 가 없습니다. `python manage.py export_sbert_onnx` 로 먼저 내보내세요.")
+        with open(os.path.join(model_dir, CONFIG_FILENAME), encoding='utf-8') as f:
+            self.config = json.load(f)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.max_seq_length = self.config['max_seq_length']
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def get_sentence_embedding_dimension(self):
+        return self.config['dim']
+
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True, **kwargs):
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+        embeddings = np.zeros((len(sentences), self.config['dim']), dtype='float32')
+        # SentenceTransformer 처럼 길이순으로 묶어 패딩을 줄인다
+        order = np.argsort([-len(s) for s in sentences], kind='stable')
+        for start in range(0, len(sentences), batch_size):
+            idx = order[start:start + batch_size]
+            tokens = self.tokenizer([sentences[i] for i in idx], padding=True, truncation=True,
+                                    max_length=self.max_seq_length, return_tensors='np')
+            feeds = {name: tokens[name].astype('int64') for name in self.input_names}
+            token_embeddings = self.session.run(None, feeds)[0]
+            # mean pooling (패딩 토큰 제외)
+            mask = tokens['attention_mask'][..., None].astype('float32')
+            embeddings[idx] = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        return embeddings[0] if single else embeddings
@@ -0,0 +1,147 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Count, F
+
+from ai.models import PooledProblem, ProblemPoolStats
+from .resources import PROBLEM_MAKERS
+from .renderer import schedule_render
+from .generator import (
+    generate_problem, publish_generated_problem, publish_generated_problems, make_problem_with_gpt_service
+)
+
+# 유형별(PROBLEM_MAKERS 키) 미리 생성한 문제 풀.
+# 워커(`python manage.py run_pool_refill`)가 각 유형을 AI_POOL_WATERMARK 개까지 채워 두고,
+# 생성 API는 풀에서 하나 꺼내 바로 응답한다. 풀이 비어 있을 때만 GPT로 즉시 생성한다.
+
+POOL_REFILL_CONCURRENCY = 4
+# 일괄 생성 API 제한 및 GPT 동시 호출 수 (프로세스 전체 상한은 LLM_MAX_CONCURRENCY)
+BATCH_GENERATION_MAX_PROBLEMS = 30
+BATCH_GENERATION_CONCURRENCY = 4
+
+def _count(problem_type, field):
+    updated = ProblemPoolStats.objects.filter(problem_type=problem_type).update(**{field: F(field) + 1})
+    if not updated:
+        ProblemPoolStats.objects.get_or_create(problem_type=problem_type)
+        ProblemPoolStats.objects.filter(problem_type=problem_type).update(**{field: F(field) + 1})
+
+def pop_pooled(problem_type):
+    """풀에서 가장 오래된 문제 하나를 꺼낸다 (다른 프로세스와 겹치지 않게 조건부 DELETE로 선점). 없으면 None."""
+    while True:
+        pooled = PooledProblem.objects.filter(problem_type=problem_type).order_by('id').first()
+        if pooled is None:
+            return None
+        if PooledProblem.objects.filter(pk=pooled.pk).delete()[0]:
+            return pooled.payload
+
+def take_pooled_problem(problem_type, user=None):
+    """풀에서 문제를 꺼내 저장해서 반환한다. 풀이 비어 있으면 (비어 있음으로 기록하고) None."""
+    payload = pop_pooled(problem_type)
+    if payload is None:
+        _count(problem_type, 'misses')
+        return None
+    _count(problem_type, 'hits')
+    return publish_generated_problem(payload, user)
+
+def get_generated_problem(problem_type, user=None):
+    """풀에서 꺼낸 문제를 저장해서 반환하고, 풀이 비어 있으면 GPT로 즉시 생성한다."""
+    return take_pooled_problem(problem_type, user) or make_problem_with_gpt_service(problem_type, top_k=3, user=user)
+
+def _generate_in_thread(problem_type):
+    try:
+        return generate_problem(problem_type)
+    finally:
+        connections.close_all()
+
+def generate_problem_batch(requests, user=None, concurrency=BATCH_GENERATION_CONCURRENCY):
+    """
+    [(problem_type, count)] 만큼 문제를 만든다. 각 문제는 풀에서 먼저 꺼내고, 모자란 만큼만
+    GPT 호출을 동시에(concurrency 제한) 보낸 뒤, 모든 문제를 bulk_create 한 번으로 저장한다.
+    반환: (저장된 문제 dict 목록(요청 순서), 실패 [{"problem_type", "error"}])
+    """
+    jobs = [problem_type for problem_type, count in requests for _ in range(count)]
+    payloads = [None] * len(jobs)
+    missing = []
+    for i, problem_type in enumerate(jobs):
+        payloads[i] = pop_pooled(problem_type)
+        _count(problem_type, 'misses' if payloads[i] is None else 'hits')
+        if payloads[i] is None:
+            missing.append(i)
+
+    failed = []
+    if missing:
+        with ThreadPoolExecutor(min(concurrency, len(missing)), thread_name_prefix="batch-generate") as executor:
+            futures = {i: executor.submit(_generate_in_thread, jobs[i]) for i in missing}
+        for i, future in futures.items():
+            try:
+                payloads[i] = future.result()
+                error = None if payloads[i] else "문제 생성 실패"
+            except Exception as e:
+                error = f"문제 생성 실패: {e}"
+            if error:
+                failed.append({"problem_type": jobs[i], "error": error})
+
+    generated = [p for p in payloads if p]
+    return (publish_generated_problems(generated, user) if generated else []), failed
+
+def pool_depths():
+    depths = dict.fromkeys(PROBLEM_MAKERS, 0)
+    for row in PooledProblem.objects.values('problem_type').annotate(n=Count('id')):
+        depths[row['problem_type']] = row['n']
+    return depths
+
+def pool_metrics():
+    """유형별 풀 깊이와 적중률."""
+    stats = {s.problem_type: s for s in ProblemPoolStats.objects.all()}
+    metrics = {}
+    for problem_type, depth in pool_depths().items():
+        s = stats.get(problem_type) or ProblemPoolStats(problem_type=problem_type)
+        requests = s.hits + s.misses
+        metrics[problem_type] = {
+            "depth": depth,
+            "hits": s.hits,
+            "misses": s.misses,
+            "hit_rate": round(s.hits / requests, 4) if requests else None,
+            "generated": s.generated,
+            "failed": s.failed,
+        }
+    return metrics
+
+def _generate_into_pool(problem_type):
+    try:
+        try:
+            p = generate_problem(problem_type)
+        except Exception as e:
+            print(f"[Problem Pool] Error: {problem_type} 생성 실패: {e}")
+            p = None
+        if p is None:
+            _count(problem_type, 'failed')
+            return False
+        PooledProblem.objects.create(problem_type=problem_type, payload=p)
+        # 꺼내 쓸 때 이미지가 이미 준비되어 있도록 미리 렌더링해 둔다
+        schedule_render(p)
+        _count(problem_type, 'generated')
+        return True
+    finally:
+        # 채우기 스레드는 작업마다 새로 뜨므로 스레드의 DB 연결을 닫는다
+        connections.close_all()
+
+def refill_once(watermark=None, concurrency=POOL_REFILL_CONCURRENCY):
+    """watermark보다 적게 남은 유형을 채운다. 새로 채운 문제 수를 반환."""
+    watermark = settings.AI_POOL_WATERMARK if watermark is None else watermark
+    jobs = [problem_type for problem_type, depth in pool_depths().items()
+            for _ in range(watermark - depth)]
+    if not jobs:
+        return 0
+    with ThreadPoolExecutor(concurrency, thread_name_prefix="pool-refill") as executor:
+        return sum(executor.map(_generate_into_pool, jobs))
+
+def refill_loop(watermark=None, poll_interval=5.0, stop_event=None):
+    while stop_event is None or not stop_event.is_set():
+        refill_once(watermark)
+        if stop_event is not None:
+            stop_event.wait(poll_interval)
+        else:
+            time.sleep(poll_interval)
@@ -0,0 +1,147 @@
+import os
+import shutil
+import hashlib
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from PIL import Image, ImageDraw, ImageFont
+
+# 생성 문제 이미지 렌더링 서비스.
+# 파일 이름이 (렌더링 버전, 문제 본문, tikz_code)의 content hash이므로 같은 문제는 같은 파일을
+# 재사용하고(파일이 있으면 캐시 적중), URL을 렌더링 전에 미리 알 수 있다. API는 URL만 정해서
+# 바로 응답하고, 실제 렌더링은 백그라운드 스레드에서 임시 파일에 쓴 뒤 os.replace로 교체한다.
+# tikz_code가 있고 pdflatex/pdftoppm이 설치되어 있으면 TikZ 그림을 PNG로 렌더링하고,
+# 없거나 실패하면 문제 본문 텍스트 이미지로 대신한다.
+
+RENDER_VERSION = 1
+RENDER_TIMEOUT = 20
+RENDER_DPI = 150
+
+TIKZ_TEMPLATE = r"""\documentclass[border=4pt]{standalone}
+\usepackage{amsmath,amssymb}
+\usepackage{tikz}
+\usepackage{pgfplots}
+\pgfplotsset{compat=newest}
+\begin{document}
+%s
+\end{document}
+"""
+
+_executor = None
+_pending = {}
+_lock = threading.Lock()
+
+def _reset_after_fork():
+    # 부모의 렌더링 스레드는 fork 후 자식에 없으므로 executor 와 진행 중 목록을 새로 만든다
+    global _executor, _pending, _lock
+    _executor, _pending, _lock = None, {}, threading.Lock()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+def image_key(p):
+    content = f"{RENDER_VERSION}\x00{p.get('question', '')}\x00{p.get('tikz_code') or ''}"
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()[:32]
+
+def image_filename(p):
+    return f"ai_{image_key(p)}.png"
+
+def image_url_for(p):
+    return f"/media/images/{image_filename(p)}"
+
+def image_path_for(p):
+    return os.path.join(settings.IMAGES_DIR, image_filename(p))
+
+def _replace_atomic(write, target):
+    """target과 같은 디렉터리의 임시 파일에 write(path)로 쓴 뒤 교체한다 (읽는 쪽은 완성된 파일만 본다)."""
+    fd, tmp_path = tempfile.mkstemp(suffix='.png', dir=os.path.dirname(target))
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, target)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def render_text(question, path):
+    img = Image.new('RGB', (700, 160), (255,255,255))
+    draw = ImageDraw.Draw(img)
+    font = ImageFont.load_default()
+    draw.text((20, 30), question, fill=(0,0,0), font=font)
+    img.save(path, format='PNG')
+
+def tikz_available():
+    return bool(shutil.which('pdflatex') and shutil.which('pdftoppm'))
+
+def render_tikz(tikz_code, path):
+    """tikz_code(tikzpicture 환경 또는 그 안의 명령)를 pdflatex → pdftoppm으로 PNG 렌더링한다."""
+    if '\\begin{tikzpicture}' not in tikz_code:
+        tikz_code = f"\\begin{{tikzpicture}}\n{tikz_code}\n\\end{{tikzpicture}}"
+    # 쉘 실행을 끄고, 작업 디렉터리 밖 파일 읽기/쓰기를 막는다
+    env = dict(os.environ, openin_any='p', openout_any='p')
+    with tempfile.TemporaryDirectory() as workdir:
+        with open(os.path.join(workdir, 'figure.tex'), 'w', encoding='utf-8') as f:
+            f.write(TIKZ_TEMPLATE % tikz_code)
+        subprocess.run(
+            ['pdflatex', '-interaction=nonstopmode', '-halt-on-error', '-no-shell-escape', 'figure.tex'],
+            cwd=workdir, env=env, check=True, timeout=RENDER_TIMEOUT,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        subprocess.run(
+            ['pdftoppm', '-png', '-r', str(RENDER_DPI), '-singlefile', 'figure.pdf', 'figure'],
+            cwd=workdir, check=True, timeout=RENDER_TIMEOUT,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        shutil.copyfile(os.path.join(workdir, 'figure.png'), path)
+
+def render_problem_image(p):
+    """문제 이미지를 (없을 때만) 렌더링해서 저장하고 파일 경로를 반환한다."""
+    target = image_path_for(p)
+    if os.path.exists(target):
+        return target
+    os.makedirs(settings.IMAGES_DIR, exist_ok=True)
+    tikz_code = p.get('tikz_code')
+    if isinstance(tikz_code, str) and tikz_code.strip() and tikz_available():
+        try:
+            _replace_atomic(lambda path: render_tikz(tikz_code, path), target)
+            return target
+        except (subprocess.SubprocessError, OSError) as e:
+            print(f"[Renderer] Error: TikZ 렌더링 실패, 텍스트 이미지로 대신합니다: {e}")
+    _replace_atomic(lambda path: render_text(p.get('question', ''), path), target)
+    return target
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(settings.AI_RENDER_WORKERS, thread_name_prefix="render")
+    return _executor
+
+def _render_job(key, p):
+    try:
+        return render_problem_image(p)
+    except Exception as e:
+        print(f"[Renderer] Error: {image_filename(p)} 렌더링 실패: {e}")
+    finally:
+        with _lock:
+            _pending.pop(key, None)
+
+def schedule_render(p):
+    """
+    문제 이미지 렌더링을 백그라운드에 맡기고 이미지 URL을 바로 반환한다.
+    이미 파일이 있거나 같은 이미지를 렌더링 중이면 새로 맡기지 않는다.
+    """
+    url = image_url_for(p)
+    key = image_key(p)
+    with _lock:
+        if key not in _pending and not os.path.exists(image_path_for(p)):
+            _pending[key] = _get_executor().submit(_render_job, key, dict(p))
+    return url
+
+def wait_for_renders(timeout=None):
+    """진행 중인 렌더링이 끝날 때까지 기다린다 (관리 명령/테스트용)."""
+    with _lock:
+        futures = list(_pending.values())
+    for future in futures:
+        future.result(timeout)
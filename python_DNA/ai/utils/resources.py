@@ -1,6 +1,7 @@
 import random
 import numpy as np
 import re
+from math import comb
 
 
 def make_sequence_problem():
@@ -86,7 +87,7 @@ def make_statistics_problem():
 def make_log_problem():
     a = random.randint(2, 5)
     b = random.randint(2, 7)
-    c = random.randint(1, 4)
+    c = random.randint(2, 4)
     value = round(np.log(a**b)/np.log(c), 4)
     latex = [f"log_{{{c}}}({a}^{b})", f"밑변환공식~활용", f"값={value}"]
     explain = "로그 밑변환, 거듭제곱"
@@ -140,20 +141,232 @@ PROBLEM_MAKERS = {
     "이차방정식": make_quadratic_equation_problem,
 }
 
+# ----------- 대량(벡터화) 문제 생성 -------------
+# 위 make_* 함수와 같은 범위/형식의 문제 n개를 NumPy 배열 추첨으로 한 번에 만든다.
+# 데이터셋 생성, 문제 풀 예열처럼 문제를 대량으로 만들 때 사용한다. seed가 같으면 같은 문제들이 나온다.
+
+COMB_TABLE = np.array([[comb(n, k) for k in range(8)] for n in range(8)])
+
+def _ints(rng, low, high, n):
+    """[low, high] 범위 정수 n개 (random.randint와 같은 양끝 포함)"""
+    return rng.integers(low, high, size=n, endpoint=True)
+
+def _labels(fmt, high):
+    """0..high 정수를 fmt로 미리 포맷한 표. 값 범위가 작은 항목은 문제마다 f-string을 만들지 않고 인덱싱한다."""
+    return [fmt.format(i) for i in range(high + 1)]
+
+SEQUENCE_LABELS = (_labels("a_1={}", 10), _labels("d={}", 5), _labels("n={}", 12))
+# 지수 문제는 (밑, 지수) 조합이 12가지뿐이라 LaTeX 전체를 표로 만든다
+EXPONENTIAL_LATEX = [[[f"{a}^{b}", "지수~계산", f"값={a**b}"] for b in range(5)] for a in range(6)]
+
+def make_sequence_problems(rng, n):
+    a1, d, r, k = _ints(rng, 2, 10, n), _ints(rng, 2, 5, n), _ints(rng, 2, 4, n), _ints(rng, 5, 12, n)
+    sn = k * (2*a1 + (k-1)*d) // 2
+    an = a1 * r**(k-1)
+    explain = "a_n은 등차, 등비 혼합수열의 일반항/합"
+    a1_labels, d_labels, n_labels = SEQUENCE_LABELS
+    return [dict(type="수열", latex=[a1_labels[a], d_labels[b], n_labels[c]], answer={"Sn": s, "an": t}, explain=explain)
+            for a, b, c, s, t in zip(a1.tolist(), d.tolist(), k.tolist(), sn.tolist(), an.tolist())]
+
+def make_integer_problems(rng, n):
+    # 서로소가 아닌 (x, y, z)는 배열 단위로 걸러내고 모자란 만큼 다시 뽑는다
+    xs, ys, zs, count = [], [], [], 0
+    while count < n:
+        size = int((n - count) * 1.3) + 16
+        x = _ints(rng, 2, 20, size)
+        y = x + _ints(rng, 1, 10, size)
+        z = y + _ints(rng, 1, 10, size)
+        keep = np.gcd(np.gcd(x, y), z) == 1
+        xs.append(x[keep]); ys.append(y[keep]); zs.append(z[keep])
+        count += int(keep.sum())
+    x, y, z = (np.concatenate(v)[:n] for v in (xs, ys, zs))
+    explain = "x, y, z는 서로소인 양의 정수"
+    return [dict(type="정수", latex=[f"x+y+z={s}", f"xyz={p}", "x<y<z"], answer=(a, b, c), explain=explain)
+            for a, b, c, s, p in zip(x.tolist(), y.tolist(), z.tolist(), (x + y + z).tolist(), (x * y * z).tolist())]
+
+def make_geometry_problems(rng, n):
+    r = _ints(rng, 5, 15, n)
+    theta = rng.choice([60, 90, 120], size=n)
+    arc = np.round(2*np.pi*r*(theta/360), 2)
+    area = np.round(np.pi*(r**2)*(theta/360), 2)
+    explain = "원의 부채꼴 넓이, 호의 길이"
+    return [dict(type="기하", latex=[f"반지름~r={a}", f"중심각~{t}^\\circ", f"호의~길이~L={l}"],
+                 answer={"arc": l, "area": s}, explain=explain)
+            for a, t, l, s in zip(r.tolist(), theta.tolist(), arc.tolist(), area.tolist())]
+
+def make_trigonometry_problems(rng, n):
+    a = rng.choice([30, 45, 60, 75, 120], size=n)
+    b = rng.choice([15, 45, 90], size=n)
+    value = np.round(np.sin(np.deg2rad(a+b)), 3)
+    explain = "삼각함수의 합 공식, 변형"
+    return [dict(type="삼각함수",
+                 latex=[f"sin({x}^\\circ)", f"sin({y}^\\circ)",
+                        f"sin({x}^\\circ)cos({y}^\\circ) + cos({x}^\\circ)sin({y}^\\circ)"],
+                 answer=v, explain=explain)
+            for x, y, v in zip(a.tolist(), b.tolist(), value.tolist())]
+
+def make_calculus_problems(rng, n):
+    a, b, c = _ints(rng, 1, 5, n), _ints(rng, -4, 4, n), _ints(rng, -6, 6, n)
+    l = _ints(rng, 1, 3, n)
+    r = l + _ints(rng, 2, 5, n)
+    integral = np.round((a/3)*(r**3-l**3)+(b/2)*(r**2-l**2)+c*(r-l), 3)
+    explain = "정적분, 2차함수 면적"
+    return [dict(type="미적분", latex=[f"f(x)={p}x^2{q:+}x{s:+}", f"구간~[{lo},{hi}]", f"\\int_{{{lo}}}^{{{hi}}} f(x) dx"],
+                 answer=v, explain=explain)
+            for p, q, s, lo, hi, v in zip(a.tolist(), b.tolist(), c.tolist(), l.tolist(), r.tolist(), integral.tolist())]
+
+def make_probability_problems(rng, n):
+    k_max = _ints(rng, 4, 7, n)
+    k = rng.integers(1, k_max, endpoint=True)
+    prob = np.round(COMB_TABLE[k_max, k] / 2.0 ** k_max, 4)
+    explain = "이항분포, 경우의 수"
+    return [dict(type="확률", latex=[f"동전~{m}번~던짐", f"앞면~{j}번~나옴", f"P={p}"], answer=p, explain=explain)
+            for m, j, p in zip(k_max.tolist(), k.tolist(), prob.tolist())]
+
+def make_statistics_problems(rng, n):
+    scores = rng.integers(40, 100, size=(n, 7), endpoint=True)
+    avg = np.round(scores.mean(axis=1), 2)
+    std = np.round(scores.std(axis=1, ddof=1), 2)
+    explain = "표본 평균, 표본 표준편차"
+    return [dict(type="통계", latex=[f"점수:~{',~'.join(map(str, s))}", f"평균~\\bar{{x}}={m}", f"표준편차~s={d}"],
+                 answer={"mean": m, "std": d}, explain=explain)
+            for s, m, d in zip(scores.tolist(), avg.tolist(), std.tolist())]
+
+def make_log_problems(rng, n):
+    a, b, c = _ints(rng, 2, 5, n), _ints(rng, 2, 7, n), _ints(rng, 2, 4, n)
+    value = np.round(np.log(a**b)/np.log(c), 4)
+    explain = "로그 밑변환, 거듭제곱"
+    return [dict(type="로그", latex=[f"log_{{{z}}}({x}^{y})", "밑변환공식~활용", f"값={v}"], answer=v, explain=explain)
+            for x, y, z, v in zip(a.tolist(), b.tolist(), c.tolist(), value.tolist())]
+
+def make_exponential_problems(rng, n):
+    a, b = _ints(rng, 2, 5, n), _ints(rng, 2, 4, n)
+    explain = "지수법칙 활용"
+    return [dict(type="지수", latex=list(EXPONENTIAL_LATEX[x][y]), answer=v, explain=explain)
+            for x, y, v in zip(a.tolist(), b.tolist(), (a**b).tolist())]
+
+def make_quadratic_function_problems(rng, n):
+    a, b, c = _ints(rng, 1, 4, n), _ints(rng, -7, 7, n), _ints(rng, -10, 10, n)
+    vx = -b/(2*a)
+    vy = np.round(a*vx**2 + b*vx + c, 2) + 0.0
+    vx = np.round(vx, 2) + 0.0
+    explain = "이차함수의 꼭짓점"
+    return [dict(type="이차함수", latex=[f"y={p}x^2{q:+}x{s:+}", "꼭짓점~좌표", f"({x},~{y})"], answer=(x, y), explain=explain)
+            for p, q, s, x, y in zip(a.tolist(), b.tolist(), c.tolist(), vx.tolist(), vy.tolist())]
+
+def make_quadratic_equation_problems(rng, n):
+    a, b, c = _ints(rng, 1, 5, n), _ints(rng, -7, 7, n), _ints(rng, -7, 7, n)
+    c = np.where(b**2 - 4*a*c < 0, b**2 // (4*a), c)
+    # np.roots 대신 근의 공식 (판별식 ≥ 0, 큰 근부터)
+    sqrt_d = np.sqrt(b**2 - 4*a*c)
+    roots = np.round(np.stack([(-b + sqrt_d)/(2*a), (-b - sqrt_d)/(2*a)], axis=1), 2) + 0.0
+    explain = "이차방정식의 근"
+    return [dict(type="이차방정식", latex=[f"{p}x^2{q:+}x{s:+}=0", "근의~공식", f"근={rs}"], answer=rs, explain=explain)
+            for p, q, s, rs in zip(a.tolist(), b.tolist(), c.tolist(), roots.tolist())]
+
+PROBLEM_BATCH_MAKERS = {
+    "수열": make_sequence_problems,
+    "정수": make_integer_problems,
+    "기하": make_geometry_problems,
+    "삼각함수": make_trigonometry_problems,
+    "미적분": make_calculus_problems,
+    "확률": make_probability_problems,
+    "통계": make_statistics_problems,
+    "로그": make_log_problems,
+    "지수": make_exponential_problems,
+    "이차함수": make_quadratic_function_problems,
+    "이차방정식": make_quadratic_equation_problems,
+}
+
+def make_problems(problem_type, n, seed=None):
+    """problem_type 유형 문제 n개를 만든다. seed(또는 np.random.Generator)가 같으면 결과도 같다."""
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+    return PROBLEM_BATCH_MAKERS[problem_type](rng, n)
+
 # ----------- 텍스트 처리/문제 유형 분류 등 유틸 -------------
+# 문제 유형 분류 규칙 (위에서부터 우선순위). 텍스트에 유형 이름(PROBLEM_MAKERS 키)이
+# 그대로 있으면 그 유형이 가장 먼저이고, 없으면 아래 키워드 규칙을 순서대로 적용한다.
+TYPE_KEYWORD_RULES = [
+    ("수열", ["수열", "합", "공차", "공비", "a_"]),
+    ("정수", ["정수", "gcd", "lcm", "소수", "합성수", "integer", "solution"]),
+    ("기하", ["원의", "넓이", "부채꼴", "삼각형", "입체", "기하"]),
+    ("삼각함수", ["sin", "cos", "tan", "삼각함수"]),
+    ("미적분", ["미분", "적분", "\\int", "정적분", "도함수", "미적분"]),
+    ("확률", ["확률", "경우의 수", "동전", "주사위"]),
+    ("통계", ["평균", "표준편차", "분산", "사분위", "통계"]),
+    ("로그", ["log_", "로그"]),
+    ("지수", ["지수", "a^", "b^", "c^"]),
+    ("이차함수", ["x^2", "이차함수", "꼭짓점"]),
+    ("이차방정식", ["x^2", "=0", "이차방정식", "근"]),
+]
+
+class TypeClassifier:
+    """
+    모든 규칙의 키워드를 우선순위 순서의 정규식 하나로 미리 컴파일한 분류기.
+    텍스트를 한 번만 훑어서 매칭된 키워드 중 가장 우선순위가 높은 규칙을 고른다
+    (기존 순차 검사와 같은 결과).
+
+    정규식 매칭은 겹치지 않으므로 매칭된 키워드 a가 더 높은 우선순위 키워드 b를 가릴 수 있다.
+    - b가 a 안에 통째로 들어 있으면: a가 b의 우선순위를 물려받는다.
+    - a의 뒷부분과 b의 앞부분이 겹치면: a가 매칭됐을 때만 b를 `in`으로 한 번 더 확인한다.
+    """
+    SEPARATOR = "\x00"
+
+    def __init__(self, rules, default=None):
+        self.default = default
+        self.types = []
+        priority = {}
+        for type_name, keywords in rules:
+            for keyword in keywords:
+                priority.setdefault(keyword, len(self.types))
+            self.types.append(type_name)
+        self.priority = {a: min(p for b, p in priority.items() if b in a) for a in priority}
+        ordered = sorted(self.priority, key=self.priority.get)
+        self.pattern = re.compile("|".join(map(re.escape, ordered)))
+        self.shadowed = {}
+        for a in ordered:
+            hidden = [b for b in ordered
+                      if self.priority[b] < self.priority[a] and b not in a
+                      and any(a[i:] == b[:len(a) - i] for i in range(1, len(a)))]
+            if hidden:
+                self.shadowed[a] = hidden
+        self._labels = self.types + [self.default]
+
+    def _best(self, text, matches, best):
+        for a in matches:
+            for b in self.shadowed.get(a, ()):
+                if self.priority[b] < best and b in text:
+                    best = self.priority[b]
+        return best
+
+    def classify(self, text):
+        matches = set(self.pattern.findall(text))
+        best = min(map(self.priority.__getitem__, matches), default=len(self.types))
+        return self._labels[self._best(text, matches, best)]
+
+    def classify_many(self, texts):
+        """여러 텍스트를 구분자로 이어 붙여 정규식 한 번으로 분류한다."""
+        texts = [t.replace(self.SEPARATOR, " ") for t in texts]
+        starts = np.cumsum([0] + [len(t) + 1 for t in texts[:-1]])
+        positions, priorities, risky = [], [], []
+        for m in self.pattern.finditer(self.SEPARATOR.join(texts)):
+            positions.append(m.start())
+            priorities.append(self.priority[m.group()])
+            if m.group() in self.shadowed:
+                risky.append((len(positions) - 1, m.group()))
+        owners = np.searchsorted(starts, positions, side='right') - 1
+        best = np.full(len(texts), len(self.types))
+        np.minimum.at(best, owners, priorities)
+        for k, keyword in risky:
+            i = owners[k]
+            best[i] = self._best(texts[i], (keyword,), best[i])
+        return [self._labels[b] for b in best]
+
+# 어떤 규칙에도 맞지 않으면 "정수"
+type_classifier = TypeClassifier([(key, [key]) for key in PROBLEM_MAKERS] + TYPE_KEYWORD_RULES, default="정수")
+
 def classify_type_by_text(text):
-    for key in PROBLEM_MAKERS.keys():
-        if key in text:
-            return key
-    if re.search(r"수열|합|공차|공비|a_", text): return "수열"
-    if re.search(r"정수|gcd|lcm|소수|합성수|integer|solution", text): return "정수"
-    if re.search(r"원의|넓이|부채꼴|삼각형|입체|기하", text): return "기하"
-    if re.search(r"sin|cos|tan|삼각함수", text): return "삼각함수"
-    if re.search(r"미분|적분|\\int|정적분|도함수|미적분", text): return "미적분"
-    if re.search(r"확률|경우의 수|동전|주사위|확률", text): return "확률"
-    if re.search(r"평균|표준편차|분산|사분위|통계", text): return "통계"
-    if re.search(r"log_|로그", text): return "로그"
-    if re.search(r"지수|a\^|b\^|c\^", text): return "지수"
-    if re.search(r"x\^2|이차함수|꼭짓점", text): return "이차함수"
-    if re.search(r"x\^2|=0|이차방정식|근", text): return "이차방정식"
-    return "정수"
\ No newline at end of file
+    return type_classifier.classify(text)
+
+def classify_many(texts):
+    return type_classifier.classify_many(texts)
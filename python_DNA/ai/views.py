@@ -3,9 +3,24 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
+import json
 import random
-from .utils.generator import make_problem_with_gpt_service
+import re
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from .utils.pool import (
+    get_generated_problem, take_pooled_problem, pool_metrics,
+    generate_problem_batch, BATCH_GENERATION_MAX_PROBLEMS
+)
+from .utils.generator import (
+    build_generation_prompt, parse_generated_problem, publish_generated_problem,
+    GENERATION_MODEL, GENERATION_MAX_TOKENS, GENERATION_TEMPERATURE
+)
+from .utils.llm_client import achat_completion_stream, LLMError
 from .utils.resources import PROBLEM_MAKERS
+from .utils.embedding_service import embedding_metrics
 
 class GenerateAiProblemAPIView(APIView):
     """
@@ -28,6 +43,7 @@ class GenerateAiProblemAPIView(APIView):
 - 확률통계
 
 각 요청마다 다른 유형의 문제가 랜덤하게 생성됩니다.
+유형별로 미리 생성해 둔 문제 풀에서 바로 응답하며, 풀이 비어 있을 때만 GPT로 즉시 생성합니다.
         """,
         tags=["AI 문제 생성"],
         manual_parameters=[
@@ -82,7 +98,8 @@ class GenerateAiProblemAPIView(APIView):
     def get(self, request):
         problem_types = list(PROBLEM_MAKERS.keys())
         problem_type = random.choice(problem_types)
-        result = make_problem_with_gpt_service(problem_type, top_k=3)
+        # 미리 생성해 둔 풀에서 꺼내고, 비어 있으면 GPT로 즉시 생성
+        result = get_generated_problem(problem_type, user=request.user)
         if result:
             return Response(result)
         else:
@@ -164,3 +181,273 @@ GET과 동일한 기능을 수행하나, POST 메소드를 선호하는 클라
     )
     def post(self, request):
         return self.get(request)
+
+
+
+class GenerateAiProblemBatchAPIView(APIView):
+    """
+    AI 수학 문제 일괄 생성 API
+
+    여러 유형의 문제를 한 번의 요청으로 생성합니다 (연습 문제 세트 구성용).
+    """
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="AI 수학 문제 일괄 생성",
+        operation_description=f"""(문제 유형, 개수) 목록만큼 문제를 한 번에 생성합니다.
+
+처리 과정:
+1. 유형별로 미리 생성해 둔 문제 풀에서 먼저 꺼냄
+2. 모자란 문제만 GPT를 동시에 호출해서 생성 (동시 호출 수 제한)
+3. 모든 문제를 하나의 트랜잭션으로 일괄 저장
+
+한 번에 최대 {BATCH_GENERATION_MAX_PROBLEMS}문제
+        """,
+        tags=["AI 문제 생성"],
+        manual_parameters=[
+            openapi.Parameter(
+                'Authorization',
+                openapi.IN_HEADER,
+                description="JWT 액세스 토큰 (예: Bearer eyJ0eXAiOiJKV1Q...)",
+                type=openapi.TYPE_STRING,
+                required=True,
+            )
+        ],
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            required=['items'],
+            properties={
+                'items': openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    description="생성할 (문제 유형, 개수) 목록",
+                    items=openapi.Schema(
+                        type=openapi.TYPE_OBJECT,
+                        properties={
+                            'problem_type': openapi.Schema(type=openapi.TYPE_STRING, example="수열"),
+                            'count': openapi.Schema(type=openapi.TYPE_INTEGER, example=5),
+                        }
+                    ),
+                    example=[{"problem_type": "수열", "count": 5}, {"problem_type": "미분", "count": 3}]
+                )
+            }
+        ),
+        responses={
+            201: openapi.Response(
+                description="일괄 생성 성공",
+                examples={
+                    "application/json": {
+                        "msg": "8개 문제가 생성되었습니다.",
+                        "count": 8,
+                        "results": [
+                            {
+                                "id": 101,
+                                "problem_type": "수열",
+                                "question": "첫째항이 3, 공차가 2인 등차수열의 제10항을 구하시오.",
+                                "latex": ["a_n = 3 + (n-1) \\cdot 2"],
+                                "explain": "등차수열의 일반항을 이용합니다.",
+                                "image_path": "/media/images/ai_problem_123456.png"
+                            }
+                        ],
+                        "failed": []
+                    }
+                }
+            ),
+            400: openapi.Response(
+                description="잘못된 요청",
+                examples={
+                    "application/json": {
+                        "error": "지원하지 않는 문제 유형입니다: 복소수"
+                    }
+                }
+            ),
+            401: openapi.Response(
+                description="인증 실패",
+                examples={
+                    "application/json": {
+                        "detail": "자격 인증데이터(authentication credentials)가 제공되지 않았습니다."
+                    }
+                }
+            )
+        }
+    )
+    def post(self, request):
+        items = request.data.get('items')
+        if not isinstance(items, list) or not items:
+            return Response({"error": "items 목록이 필요합니다."}, status=400)
+        requests = []
+        for item in items:
+            problem_type = item.get('problem_type') if isinstance(item, dict) else None
+            if problem_type not in PROBLEM_MAKERS:
+                return Response({"error": f"지원하지 않는 문제 유형입니다: {problem_type}"}, status=400)
+            count = item.get('count', 1)
+            if not isinstance(count, int) or isinstance(count, bool) or count < 1:
+                return Response({"error": "count는 1 이상의 정수여야 합니다."}, status=400)
+            requests.append((problem_type, count))
+        if sum(count for _, count in requests) > BATCH_GENERATION_MAX_PROBLEMS:
+            return Response({"error": f"한 번에 최대 {BATCH_GENERATION_MAX_PROBLEMS}문제까지 생성할 수 있습니다."}, status=400)
+
+        results, failed = generate_problem_batch(requests, user=request.user)
+        return Response({
+            "msg": f"{len(results)}개 문제가 생성되었습니다.",
+            "count": len(results),
+            "results": results,
+            "failed": failed,
+        }, status=201)
+
+
+
+class ProblemPoolStatusAPIView(APIView):
+    """
+    AI 문제 풀 상태 조회 API
+
+    유형별로 미리 생성해 둔 문제 수와 풀 적중률을 조회합니다.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="AI 문제 풀 상태 조회",
+        operation_description="유형별 풀 깊이(depth), 풀 적중/비어 있음 횟수와 적중률, 채운 문제 수, 생성 실패 수를 반환합니다.",
+        tags=["AI 문제 생성"],
+        manual_parameters=[
+            openapi.Parameter(
+                'Authorization',
+                openapi.IN_HEADER,
+                description="JWT 액세스 토큰 (예: Bearer eyJ0eXAiOiJKV1Q...)",
+                type=openapi.TYPE_STRING,
+                required=True,
+            )
+        ],
+        responses={
+            200: openapi.Response(
+                description="조회 성공",
+                examples={
+                    "application/json": {
+                        "수열": {"depth": 5, "hits": 42, "misses": 3, "hit_rate": 0.9333, "generated": 47, "failed": 1}
+                    }
+                }
+            )
+        }
+    )
+    def get(self, request):
+        return Response(pool_metrics())
+
+
+class EmbeddingMetricsAPIView(APIView):
+    """
+    SBERT 임베딩 배칭 상태 조회 API
+
+    현재 워커 프로세스의 인코딩 배치 크기/대기 시간 히스토그램을 조회합니다.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="SBERT 임베딩 배칭 지표 조회",
+        operation_description="""유사 문제 검색/업로드/인덱스 재구축의 SBERT 인코딩 요청은 짧은 시간 창 동안 모아 한 번에 인코딩됩니다.
+이 API는 (응답한 워커 프로세스 기준) 처리한 요청 수, 배치 수, 배치 크기(텍스트 수)와 요청별 대기 시간(ms) 히스토그램을 반환합니다.
+buckets 는 누적 개수입니다 (le: 해당 값 이하).""",
+        tags=["AI 문제 생성"],
+        manual_parameters=[
+            openapi.Parameter(
+                'Authorization',
+                openapi.IN_HEADER,
+                description="JWT 액세스 토큰 (예: Bearer eyJ0eXAiOiJKV1Q...)",
+                type=openapi.TYPE_STRING,
+                required=True,
+            )
+        ],
+        responses={
+            200: openapi.Response(
+                description="조회 성공",
+                examples={
+                    "application/json": {
+                        "max_batch": 64, "max_wait_ms": 5.0, "requests": 120, "direct_requests": 2, "batches": 31,
+                        "batch_size": {"buckets": {"1": 10, "2": 18, "4": 27, "8": 31, "+Inf": 31}, "count": 31, "sum": 120.0, "mean": 3.871},
+                        "wait_ms": {"buckets": {"1": 20, "2": 41, "5": 115, "10": 120, "+Inf": 120}, "count": 120, "sum": 301.2, "mean": 2.51}
+                    }
+                }
+            )
+        }
+    )
+    def get(self, request):
+        return Response(embedding_metrics())
+
+
+
+# -------------------- 스트리밍(SSE) 생성 --------------------
+# ASGI(python_DNA/asgi.py)로 서빙할 때 토큰이 생성되는 대로 전송된다.
+# 이벤트: progress(단계), question(지금까지 생성된 문제 본문), result(저장된 문제), error
+
+QUESTION_PATTERN = re.compile(r'"question"\s*:\s*"((?:[^"\\]|\\.)*)')
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def _partial_question(content):
+    """생성 중인 JSON에서 지금까지 나온 question 문자열 (끝의 잘린 escape는 버림)."""
+    m = QUESTION_PATTERN.search(content)
+    if not m:
+        return ""
+    text = m.group(1)
+    for cut in range(0, 7):
+        try:
+            return json.loads('"' + text[:len(text) - cut] + '"')
+        except ValueError:
+            continue
+    return ""
+
+def _authenticate(request):
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    return result[0] if result else None
+
+async def generate_ai_problem_stream(request):
+    """
+    AI 수학 문제 생성 (SSE 스트리밍)
+
+    GET /api/ai/generate/stream/?problem_type=수열
+    문제 풀에 준비된 문제가 있으면 바로 result를 보내고, 없으면 GPT 응답을 토큰 단위로 중계한다.
+    """
+    user = await sync_to_async(_authenticate)(request)
+    if user is None:
+        return JsonResponse({"detail": "자격 인증데이터(authentication credentials)가 제공되지 않았습니다."}, status=401)
+    problem_type = request.GET.get('problem_type')
+    if problem_type not in PROBLEM_MAKERS:
+        problem_type = random.choice(list(PROBLEM_MAKERS.keys()))
+
+    async def events():
+        yield _sse("progress", {"stage": "start", "problem_type": problem_type})
+        try:
+            result = await sync_to_async(take_pooled_problem)(problem_type, user)
+            if result:
+                yield _sse("result", result)
+                return
+            prompt, latex_conds, explain = await sync_to_async(build_generation_prompt)(problem_type)
+            yield _sse("progress", {"stage": "generating"})
+            content, question = "", ""
+            async for delta in achat_completion_stream(
+                [{"role": "user", "content": prompt}],
+                model=GENERATION_MODEL,
+                max_tokens=GENERATION_MAX_TOKENS,
+                temperature=GENERATION_TEMPERATURE,
+            ):
+                content += delta
+                partial = _partial_question(content)
+                if partial != question:
+                    question = partial
+                    yield _sse("question", {"text": question})
+            p = parse_generated_problem(content, problem_type, latex_conds, explain)
+            if p is None:
+                yield _sse("error", {"error": "문제 생성 실패"})
+                return
+            yield _sse("progress", {"stage": "saving"})
+            result = await sync_to_async(publish_generated_problem)(p, user)
+            yield _sse("result", result) if result else _sse("error", {"error": "문제 생성 실패"})
+        except LLMError as e:
+            yield _sse("error", {"error": f"문제 생성 실패: {e}"})
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
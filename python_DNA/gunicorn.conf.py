@@ -0,0 +1,94 @@
+"""
+gunicorn 운영 서빙 설정 (scripts/start.sh 가 `gunicorn` 으로 실행하면 현재 디렉터리의 이 파일을 읽는다).
+
+SERVE_PROFILE 로 프로세스 모델을 고른다.
+- all   : 모든 API를 한 서버에서 (ASGI/uvicorn 워커, 모델 미리 로드). 컨테이너 하나로 띄울 때.
+- ml    : 업로드/OCR/SBERT/AI 생성 등 ML 엔드포인트 전용 (ASGI/uvicorn 워커, 모델 미리 로드, SSE 스트리밍).
+- light : 목록/상세/프로필/로그인 등 DB만 쓰는 엔드포인트 전용 (WSGI gthread 워커, 모델 없음).
+라우팅은 deploy/nginx.conf 참고.
+
+preload_app 으로 마스터 프로세스에서 Django와 모델 가중치를 한 번만 로드한 뒤 fork 하므로
+워커들은 읽기 전용 가중치 페이지를 copy-on-write로 공유한다. 마스터에서는 추론을 실행하지 않는다
+(OpenMP 스레드 풀이 fork 전에 만들어지면 자식 프로세스에서 멈출 수 있음).
+
+환경 변수: SERVE_PROFILE, PORT, WEB_CONCURRENCY(워커 수), GUNICORN_THREADS, GUNICORN_TIMEOUT,
+SERVE_PRELOAD_MODELS(쉼표 구분 model_registry 이름, 빈 값이면 미리 로드 안 함)
+"""
+import gc
+import multiprocessing
+import os
+
+CPUS = multiprocessing.cpu_count()
+
+PROFILES = {
+    "all": {
+        "wsgi_app": "python_DNA.asgi:application",
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "workers": 2,
+        "threads": 1,
+        "timeout": 120,
+        "preload_models": "sbert",
+    },
+    "ml": {
+        "wsgi_app": "python_DNA.asgi:application",
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "workers": 2,
+        "threads": 1,
+        "timeout": 120,
+        "preload_models": "sbert,latex_ocr",
+    },
+    "light": {
+        "wsgi_app": "python_DNA.wsgi:application",
+        "worker_class": "gthread",
+        "workers": 2 * CPUS + 1,
+        "threads": 4,
+        "timeout": 30,
+        "preload_models": "",
+    },
+}
+
+profile_name = os.getenv("SERVE_PROFILE", "all")
+if profile_name not in PROFILES:
+    raise RuntimeError(f"알 수 없는 SERVE_PROFILE: {profile_name} ({', '.join(PROFILES)} 중 하나)")
+profile = PROFILES[profile_name]
+
+wsgi_app = profile["wsgi_app"]
+worker_class = profile["worker_class"]
+workers = int(os.getenv("WEB_CONCURRENCY", profile["workers"]))
+threads = int(os.getenv("GUNICORN_THREADS", profile["threads"]))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", profile["timeout"]))
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+preload_app = True
+# 메모리 누수 대비 워커 재시작 (모델은 마스터에 있으므로 재시작한 워커도 다시 로드하지 않는다)
+max_requests = 5000
+max_requests_jitter = 500
+accesslog = "-"
+proc_name = f"python_DNA-{profile_name}"
+
+PRELOAD_MODELS = [name for name in os.getenv("SERVE_PRELOAD_MODELS", profile["preload_models"]).split(",") if name]
+
+# torch 스레드 수 기본값(CPU 수 / 워커 수) 계산용 (ai.utils.model_registry.torch_thread_budget)
+os.environ.setdefault("WEB_CONCURRENCY", str(workers))
+
+# 미리 로드는 마스터에서 동기적으로 한다. 백그라운드 prewarm 스레드는 fork 와 섞이면 안 되므로 끈다.
+os.environ["MODEL_PREWARM"] = "0"
+
+
+def when_ready(server):
+    """앱 로드(preload) 후, 워커 fork 전에 마스터에서 호출된다."""
+    from ai.utils.model_registry import get_model
+    for name in PRELOAD_MODELS:
+        try:
+            get_model(name)
+        except Exception as e:
+            server.log.warning(f"[Serving] Error: {name} 미리 로드 실패, 워커에서 처음 사용할 때 로드합니다: {e}")
+    # 지금까지 만든 객체를 GC 추적에서 빼서, 자식 프로세스의 GC가 공유 페이지를 건드리지(복사하지) 않게 한다
+    gc.freeze()
+    server.log.info(f"[Serving] profile={profile_name} workers={workers} worker_class={worker_class} "
+                    f"preloaded={PRELOAD_MODELS}")
+
+
+def post_fork(server, worker):
+    # 마스터에서 열린 DB 연결을 워커가 공유하지 않도록 닫는다
+    from django.db import connections
+    connections.close_all()
@@ -1,8 +1,18 @@
 from django.contrib import admin
-from .models import Problem
+from .models import Problem, UploadJob, AnalysisCache
 
 @admin.register(Problem)
 class ProblemAdmin(admin.ModelAdmin):
     list_display = ('id', 'question', 'image_path', 'user', 'created_at')
     search_fields = ('question', 'user__username')
-    list_filter = ('created_at', 'user')
\ No newline at end of file
+    list_filter = ('created_at', 'user')
+
+@admin.register(UploadJob)
+class UploadJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'status', 'image_path', 'user', 'problem', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('status', 'created_at')
+
+@admin.register(AnalysisCache)
+class AnalysisCacheAdmin(admin.ModelAdmin):
+    list_display = ('id', 'key', 'problem', 'hits', 'created_at', 'last_used_at')
+    search_fields = ('key',)
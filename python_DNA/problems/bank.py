@@ -0,0 +1,168 @@
+import random
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Min
+
+from .models import Problem, UploadJob, AnalysisCache
+from ai.utils.embedding_store import text_key
+from ai.utils.resources import classify_type_by_text
+from ai.utils.faiss_search import (
+    add_to_index, update_index, remove_from_index, evict_embeddings, problem_to_dict, problem_text, PROBLEM_FIELDS,
+    encode_texts, search_embeddings
+)
+
+# 문제 은행의 단일 저장소는 DB(Problem)이다. 저장/수정/삭제 시 FAISS 인덱스와
+# 임베딩 저장소를 함께 갱신한다. JSON은 export_problems_json 명령으로만 만든다.
+
+STRUCTURED_FIELDS = ('question', 'latex', 'options', 'answer', 'category', 'image_path')
+IGNORED_FIELDS = ('id', 'user', 'problem_id', 'source', 'embedding_key', 'problem_type', 'created_at')
+SAMPLE_ATTEMPTS = 3
+
+def set_derived_fields(problem):
+    """문제 텍스트에서 계산되는 필드(임베딩 키, 생성 유형)를 채운다. 바뀐 필드 이름 목록을 반환."""
+    text = problem_text(problem_to_dict(problem))
+    values = {'embedding_key': text_key(text), 'problem_type': classify_type_by_text(text) or ''}
+    changed = [field for field, value in values.items() if getattr(problem, field) != value]
+    for field in changed:
+        setattr(problem, field, values[field])
+    return changed
+
+def build_problem(data, user=None, source=Problem.SOURCE_MANUAL):
+    """GPT 구조화/AI 생성 결과 dict로 (저장 전) Problem 객체를 만든다."""
+    problem = Problem(
+        question=data.get('question') or '',
+        latex=data.get('latex') or '',
+        options=data.get('options') or [],
+        answer='' if data.get('answer') is None else data['answer'],
+        category=data.get('category') or '',
+        image_path=data.get('image_path') or '',
+        extra={k: v for k, v in data.items() if k not in STRUCTURED_FIELDS + IGNORED_FIELDS},
+        user=user,
+        source=source,
+    )
+    set_derived_fields(problem)
+    return problem
+
+def save_problems(items, user=None, source=Problem.SOURCE_MANUAL):
+    """여러 문제를 bulk_create 한 번으로 저장하고, 커밋 후 새 문제만 인덱스에 추가한다."""
+    with transaction.atomic():
+        problems = Problem.objects.bulk_create([build_problem(data, user, source) for data in items])
+        transaction.on_commit(lambda: add_to_index([problem_to_dict(p) for p in problems]))
+    return problems
+
+def save_problem(data, user=None, source=Problem.SOURCE_MANUAL):
+    return save_problems([data], user, source)[0]
+
+def find_duplicates(items, threshold=None):
+    """
+    저장하려는 문제들 각각에 대해 이미 은행에 있는 같은 문제(SBERT 코사인 유사도 ≥ threshold)를 찾는다.
+    반환: items와 같은 길이의 리스트. 원소는 기존 Problem, 같은 목록 안의 앞선 문제 위치(int), 또는 None.
+    """
+    threshold = settings.DEDUP_SIMILARITY_THRESHOLD if threshold is None else threshold
+    if not items:
+        return []
+    embs = encode_texts([problem_text(data) for data in items])
+    matches = [hits[0][0] if hits and hits[0][1] >= threshold else None
+               for hits in search_embeddings(embs, top_k=1)]
+    existing = Problem.objects.in_bulk([m for m in matches if m is not None])
+    result = []
+    for i, problem_id in enumerate(matches):
+        duplicate = existing.get(problem_id)
+        if duplicate is None and i:
+            # 같은 요청 안에서 먼저 나온 문제와 같은 경우
+            scores = embs[:i] @ embs[i]
+            j = int(scores.argmax())
+            if scores[j] >= threshold:
+                duplicate = result[j] if result[j] is not None else j
+        result.append(duplicate)
+    return result
+
+def find_duplicate(data, threshold=None):
+    return find_duplicates([data], threshold)[0]
+
+def index_problem(problem):
+    """API로 직접 생성된 문제의 임베딩 키/생성 유형을 기록하고 인덱스에 추가한다."""
+    changed = set_derived_fields(problem)
+    Problem.objects.filter(pk=problem.pk).update(**{field: getattr(problem, field) for field in changed})
+    transaction.on_commit(lambda: add_to_index([problem_to_dict(problem)]))
+
+def reindex_problem(problem, old_embedding_key):
+    """수정된 문제: 텍스트가 바뀌었으면 이전 벡터를 검색에서 빼고 새 벡터를 추가한다 (인덱스 재구축 없음)."""
+    changed = set_derived_fields(problem)
+    if changed:
+        Problem.objects.filter(pk=problem.pk).update(**{field: getattr(problem, field) for field in changed})
+    if problem.embedding_key == old_embedding_key:
+        return
+    data = problem_to_dict(problem)
+    transaction.on_commit(lambda: (update_index([data], [(data['id'], old_embedding_key)]),
+                                   evict_embeddings([old_embedding_key])))
+
+def remove_problem(problem):
+    removed = (problem.pk, problem.embedding_key)
+    problem.delete()
+    transaction.on_commit(lambda: (remove_from_index([removed]), evict_embeddings([removed[1]])))
+
+def sample_problems_by_type(problem_type, k):
+    """
+    생성 유형 색인으로 해당 유형 문제 k개를 무작위로 고른다 (없으면 전체에서).
+    (problem_type, id) 색인의 최소/최대 id 사이에서 무작위 값을 뽑아 그 이상인 첫 행을
+    가져오므로 질의 하나가 색인 탐색 한 번이다 (유형의 문제 수와 무관하게 O(k)).
+    id 사이가 크게 비어 있으면 그 뒤의 문제가 조금 더 자주 뽑힌다.
+    """
+    rows = _random_rows(Problem.objects.filter(problem_type=problem_type), k)
+    return rows or _random_rows(Problem.objects.all(), k)
+
+def _random_rows(queryset, k):
+    bounds = queryset.aggregate(lo=Min('id'), hi=Max('id'))
+    if bounds['lo'] is None:
+        return []
+    rows, seen = [], set()
+    # 같은 행이 다시 뽑히거나 문제 수가 k보다 적을 수 있으므로 시도 횟수를 제한한다
+    for _ in range(k * SAMPLE_ATTEMPTS):
+        if len(rows) >= k:
+            break
+        pivot = random.randint(bounds['lo'], bounds['hi'])
+        row = queryset.filter(id__gte=pivot).order_by('id').values(*PROBLEM_FIELDS).first()
+        if row is not None and row['id'] not in seen:
+            seen.add(row['id'])
+            rows.append(row)
+    return rows
+
+
+def cluster_duplicates(pairs):
+    """(id_a, id_b, 유사도) 쌍을 union-find로 묶어 {대표 id(가장 오래된 문제): [중복 id, ...]}를 만든다."""
+    parent = {}
+
+    def find(x):
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for a, b, _ in pairs:
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+    clusters = {}
+    for x in parent:
+        if find(x) != x:
+            clusters.setdefault(find(x), []).append(x)
+    return clusters
+
+def merge_duplicates(clusters):
+    """
+    중복 문제를 참조하던 업로드 작업/캐시를 대표 문제로 옮기고 중복 문제를 삭제한다.
+    커밋 후 삭제된 문제들을 한 번에 인덱스에서 제외한다 (인덱스 재구축 없음).
+    """
+    duplicate_ids = [d for ids in clusters.values() for d in ids]
+    with transaction.atomic():
+        for canonical_id, ids in clusters.items():
+            UploadJob.objects.filter(problem_id__in=ids).update(problem_id=canonical_id)
+            AnalysisCache.objects.filter(problem_id__in=ids).update(problem_id=canonical_id)
+        removed = list(Problem.objects.filter(id__in=duplicate_ids).values_list('id', 'embedding_key'))
+        deleted = Problem.objects.filter(id__in=duplicate_ids).delete()[1].get('problems.Problem', 0)
+        transaction.on_commit(lambda: (remove_from_index(removed),
+                                       evict_embeddings([key for _, key in removed])))
+    return deleted
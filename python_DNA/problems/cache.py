@@ -0,0 +1,61 @@
+import hashlib
+from datetime import timedelta
+
+from django.db import IntegrityError
+from django.db.models import F
+from django.utils import timezone
+
+from .models import AnalysisCache
+
+# 같은 문제 사진이 다시 업로드되면 OCR/GPT를 건너뛰고 이전 구조화 결과를 돌려주는 캐시.
+#   - 이미지 키: 파일 바이트 sha256 (완전히 같은 파일만 적중)
+#   - 프롬프트 키: GPT 모델 + OCR 텍스트 + LaTeX 의 sha256 (이미지는 달라도 OCR 결과가 같으면 GPT 생략)
+# 지각 해시(dHash 등)는 키로 쓰지 않는다. 같은 양식의 학습지 페이지들은 축소하면 거의 같은 이미지가 되어
+# 서로 다른 문제가 같은 해시로 적중하기 때문이다. 재인코딩된 같은 사진은 OCR 후 프롬프트 키로 적중한다.
+# TTL이 지난 항목은 무시/삭제하고, 항목 수가 CACHE_MAX_ENTRIES를 넘으면 가장 오래 안 쓴 것부터 지운다.
+
+CACHE_TTL = timedelta(days=7)
+CACHE_MAX_ENTRIES = 10000
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def image_keys(path):
+    return [f"bytes:{file_hash(path)}"]
+
+def prompt_key(model, text, latex):
+    return "prompt:" + hashlib.sha256(f"{model}\0{text}\0{latex}".encode('utf-8')).hexdigest()
+
+def lookup(keys):
+    """keys 중 먼저 적중한 캐시 항목을 반환하고 사용 시각을 갱신한다. 없으면 None."""
+    now = timezone.now()
+    entries = {e.key: e for e in AnalysisCache.objects.filter(key__in=keys, created_at__gte=now - CACHE_TTL)}
+    for key in keys:
+        entry = entries.get(key)
+        if entry:
+            AnalysisCache.objects.filter(pk=entry.pk).update(last_used_at=now, hits=F('hits') + 1)
+            return entry
+    return None
+
+def store(keys, analysis, problem=None):
+    now = timezone.now()
+    for key in keys:
+        try:
+            AnalysisCache.objects.update_or_create(
+                key=key, defaults={"analysis": analysis, "problem": problem, "created_at": now, "last_used_at": now}
+            )
+        except IntegrityError:
+            # 다른 워커가 같은 키를 동시에 저장한 경우
+            pass
+    evict()
+
+def evict():
+    AnalysisCache.objects.filter(created_at__lt=timezone.now() - CACHE_TTL).delete()
+    overflow = AnalysisCache.objects.count() - CACHE_MAX_ENTRIES
+    if overflow > 0:
+        stale = AnalysisCache.objects.order_by('last_used_at').values_list('pk', flat=True)[:overflow]
+        AnalysisCache.objects.filter(pk__in=list(stale)).delete()
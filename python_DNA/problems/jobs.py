@@ -0,0 +1,82 @@
+import time
+import traceback
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import UploadJob
+from .pipeline import (
+    analyze_upload, find_upload_duplicates, save_uploaded_problems, build_upload_response, image_url_to_path
+)
+from .cache import store
+
+# 외부 브로커 없이 DB 테이블(UploadJob)을 작업 큐로 사용한다.
+# 워커 프로세스는 `python manage.py run_upload_workers` 로 실행.
+
+def enqueue_upload_job(image_url, user):
+    return UploadJob.objects.create(image_path=image_url, user=user)
+
+def claim_next_job():
+    """대기 중인 가장 오래된 작업 하나를 RUNNING으로 바꿔 가져온다. 없으면 None."""
+    while True:
+        job = UploadJob.objects.filter(status=UploadJob.STATUS_PENDING).order_by('id').first()
+        if job is None:
+            return None
+        # 조건부 UPDATE 로 선점: 다른 워커가 먼저 가져갔으면 0건이 갱신되므로 다음 작업 시도
+        claimed = UploadJob.objects.filter(pk=job.pk, status=UploadJob.STATUS_PENDING).update(
+            status=UploadJob.STATUS_RUNNING,
+            started_at=timezone.now(),
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+def process_job(job):
+    image_save_path = image_url_to_path(job.image_path)
+    try:
+        # OCR/GPT(수십 초)와 중복 검사(SBERT/FAISS)는 트랜잭션 밖에서 실행하고,
+        # 문제 저장과 작업 상태 갱신만 한 트랜잭션으로 묶는다
+        problem, analysis, keys = analyze_upload(image_save_path, job.image_path, job.user, wait_for_ocr=True)
+        saved_images = [(image_save_path, job.image_path)]
+        duplicates = find_upload_duplicates([analysis], saved_images) if problem is None else None
+        with transaction.atomic():
+            result = analysis
+            if problem is None:
+                problem, result = save_uploaded_problems([analysis], saved_images, job.user, duplicates)[0]
+            job.problem = problem
+            job.result = build_upload_response(problem, result, problem.image_path)
+            job.status = UploadJob.STATUS_DONE
+            job.finished_at = timezone.now()
+            job.save(update_fields=['problem', 'result', 'status', 'finished_at'])
+        if keys:
+            store(keys, analysis, problem)
+    except Exception as e:
+        traceback.print_exc()
+        job.status = UploadJob.STATUS_FAILED
+        job.error = str(e)
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'finished_at'])
+    return job
+
+def requeue_stale_jobs(timeout_seconds, max_attempts):
+    """워커가 죽어서 RUNNING 상태로 남은 작업을 다시 대기열로 돌린다."""
+    stale = UploadJob.objects.filter(
+        status=UploadJob.STATUS_RUNNING,
+        started_at__lt=timezone.now() - timedelta(seconds=timeout_seconds),
+    )
+    failed = stale.filter(attempts__gte=max_attempts).update(
+        status=UploadJob.STATUS_FAILED, error="처리 시간 초과", finished_at=timezone.now()
+    )
+    requeued = stale.update(status=UploadJob.STATUS_PENDING)
+    return requeued, failed
+
+def worker_loop(poll_interval=1.0, stop_event=None):
+    while stop_event is None or not stop_event.is_set():
+        job = claim_next_job()
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+        process_job(job)
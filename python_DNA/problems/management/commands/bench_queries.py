@@ -0,0 +1,161 @@
+import random
+import time
+import uuid
+from datetime import timedelta
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ai.utils.resources import PROBLEM_MAKERS
+from problems.models import Problem, UploadJob
+from users.models import User
+
+CATEGORIES = ["대수", "기하", "미적분", "확률", "통계", "함수", "수열", "삼각함수"]
+PAGE = 21  # page_size(20) + 다음 페이지 확인용 1
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ("합성 사용자/문제를 넣고 API가 실행하는 쿼리들의 p50/p99 지연을 인덱스 없음(before)/있음(after)으로 비교합니다. "
+            "모든 변경은 한 트랜잭션 안에서 하고 끝나면 롤백합니다 (SQLite/PostgreSQL 모두 DDL 롤백 지원).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--problems', type=int, default=100000, help="넣을 합성 문제 수")
+        parser.add_argument('--users', type=int, default=1000, help="넣을 합성 사용자 수")
+        parser.add_argument('--repeat', type=int, default=200, help="쿼리별 측정 횟수")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--database', default='default', help="측정할 DB alias (운영 DB가 아닌 곳에서 실행하세요)")
+        parser.add_argument('--explain', action='store_true', help="쿼리별 실행 계획 출력")
+
+    def handle(self, *args, **options):
+        self.db = options['database']
+        self.rng = random.Random(options['seed'])
+        connection = connections[self.db]
+        self.stdout.write(f"DB: {connection.vendor} ({self.db}), 문제 {options['problems']:,}개, 사용자 {options['users']:,}명")
+        try:
+            with transaction.atomic(using=self.db):
+                started = time.perf_counter()
+                params = self.seed(options['problems'], options['users'])
+                self.analyze(connection)
+                self.stdout.write(f"합성 데이터 생성 {time.perf_counter() - started:.1f}s")
+
+                queries = self.queries(params)
+                after = self.measure(queries, options['repeat'], options['explain'], "after")
+                self.drop_api_indexes(connection)
+                self.analyze(connection)
+                before = self.measure(queries, options['repeat'], options['explain'], "before")
+                self.report(queries, before, after)
+                raise Rollback
+        except Rollback:
+            self.stdout.write("합성 데이터와 인덱스 변경을 롤백했습니다.")
+
+    # -------------------- 합성 데이터 --------------------
+    def seed(self, problem_count, user_count):
+        tag = uuid.uuid4().hex[:8]
+        User.objects.using(self.db).bulk_create([
+            User(username=f"bench_{tag}_{i}", email=f"bench_{tag}_{i}@example.com", password="!",
+                 school=f"bench_{tag}_{i % 50}", student_number=i // 50)
+            for i in range(user_count)
+        ], batch_size=2000)
+        user_ids = list(User.objects.using(self.db).filter(username__startswith=f"bench_{tag}_").values_list('id', flat=True))
+
+        # created_at을 id 순서대로 흩뿌리고(10개 중 1개는 앞 문제와 같은 시각) auto_now_add를 잠시 끈다
+        base = timezone.now() - timedelta(seconds=problem_count)
+        types = list(PROBLEM_MAKERS)
+        created_at = Problem._meta.get_field('created_at')
+        created_at.auto_now_add = False
+        try:
+            for start in range(0, problem_count, 10000):
+                Problem.objects.using(self.db).bulk_create([
+                    Problem(question=f"합성 문제 {i}", category=self.rng.choice(CATEGORIES),
+                            problem_type=self.rng.choice(types), embedding_key=uuid.UUID(int=self.rng.getrandbits(128)).hex,
+                            user_id=self.rng.choice(user_ids), created_at=base + timedelta(seconds=i - (i % 10 == 1)))
+                    for i in range(start, min(start + 10000, problem_count))
+                ], batch_size=2000)
+        finally:
+            created_at.auto_now_add = True
+
+        UploadJob.objects.using(self.db).bulk_create([
+            UploadJob(user_id=self.rng.choice(user_ids), image_path=f"/media/images/bench_{i}.png",
+                      status=UploadJob.STATUS_PENDING if i % 100 == 0 else UploadJob.STATUS_DONE)
+            for i in range(problem_count // 20)
+        ], batch_size=2000)
+
+        problems = Problem.objects.using(self.db)
+        sample_ids = self.rng.sample(list(problems.values_list('id', flat=True)), min(500, problem_count))
+        return {
+            "user_ids": user_ids,
+            "users": list(User.objects.using(self.db).filter(id__in=user_ids[:500]).values_list('username', 'school', 'student_number')),
+            "cursors": list(problems.filter(id__in=sample_ids).values_list('created_at', 'id')),
+            "keys": list(problems.filter(id__in=sample_ids).values_list('embedding_key', flat=True)),
+            "problem_ids": sample_ids,
+            "types": types,
+        }
+
+    def analyze(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def drop_api_indexes(self, connection):
+        """API 조회용으로 추가한 인덱스(Meta.indexes)를 지운다 (트랜잭션 안이므로 롤백된다)."""
+        editor = connection.schema_editor(atomic=False)
+        with connection.cursor() as cursor:
+            for model in (Problem, UploadJob):
+                for index in model._meta.indexes:
+                    cursor.execute(editor.sql_delete_index % {"name": editor.quote_name(index.name), "table": ""})
+
+    # -------------------- 측정 --------------------
+    def queries(self, p):
+        problems = Problem.objects.using(self.db)
+        pick = self.rng.choice
+
+        def keyset(qs, cursor):
+            created_at, pk = cursor
+            return qs.filter(Q(created_at__lt=created_at) | Q(id__lt=pk), created_at__lte=created_at).order_by('-created_at', '-id')
+
+        def duplicate_check(username, school, student_number):
+            return User.objects.using(self.db).filter(school=school, student_number=student_number)[:1]
+
+        return [
+            ("GET /problems/list/ (첫 페이지)", lambda: problems.order_by('-created_at', '-id')[:PAGE]),
+            ("GET /problems/list/?cursor=", lambda: keyset(problems, pick(p['cursors']))[:PAGE]),
+            ("GET /problems/list/?user=", lambda: problems.filter(user_id=pick(p['user_ids'])).order_by('-created_at', '-id')[:PAGE]),
+            ("GET /problems/list/?category=&cursor=",
+             lambda: keyset(problems.filter(category=pick(CATEGORIES)), pick(p['cursors']))[:PAGE]),
+            ("GET /problems/<id>/", lambda: problems.filter(pk=pick(p['problem_ids']))),
+            ("임베딩 정리 (embedding_key 사용 여부)", lambda: problems.filter(embedding_key=pick(p['keys']))[:1]),
+            ("AI 생성 예시 샘플 (problem_type)", lambda: problems.filter(problem_type=pick(p['types'])).values_list('id', flat=True)),
+            ("업로드 워커 작업 선점", lambda: UploadJob.objects.using(self.db).filter(status=UploadJob.STATUS_PENDING).order_by('id')[:1]),
+            ("POST /users/login/ (username)", lambda: User.objects.using(self.db).filter(username=pick(p['users'])[0])),
+            ("POST /users/register/ (학교+학번 중복)",
+             lambda: duplicate_check(*pick(p['users']))),
+        ]
+
+    def measure(self, queries, repeat, explain, label):
+        results = {}
+        for name, make in queries:
+            for _ in range(5):
+                list(make())
+            timings = []
+            for _ in range(repeat):
+                qs = make()
+                started = time.perf_counter()
+                list(qs)
+                timings.append((time.perf_counter() - started) * 1000)
+            results[name] = (np.percentile(timings, 50), np.percentile(timings, 99))
+            if explain:
+                self.stdout.write(f"[{label}] {name}\n    " + make().explain().replace("\n", "\n    "))
+        return results
+
+    def report(self, queries, before, after):
+        self.stdout.write(f"\n{'쿼리':<40} {'before p50/p99 (ms)':>22} {'after p50/p99 (ms)':>22} {'p50 배속':>9}")
+        for name, _ in queries:
+            b50, b99 = before[name]
+            a50, a99 = after[name]
+            self.stdout.write(f"{name:<40} {b50:10.3f} / {b99:9.3f} {a50:10.3f} / {a99:9.3f} {b50 / a50:8.1f}x")
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ai.utils.faiss_search import similar_pairs
+from problems.bank import cluster_duplicates, merge_duplicates
+from problems.models import Problem
+
+
+class Command(BaseCommand):
+    help = "FAISS 인덱스로 문제 은행의 중복 문제를 묶어 보여주고, --delete 시 가장 오래된 문제만 남깁니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threshold', type=float, default=settings.DEDUP_SIMILARITY_THRESHOLD,
+                            help="같은 문제로 볼 코사인 유사도 (기본: DEDUP_SIMILARITY_THRESHOLD)")
+        parser.add_argument('--delete', action='store_true', help="중복 문제를 실제로 삭제")
+
+    def handle(self, *args, **options):
+        clusters = cluster_duplicates(similar_pairs(options['threshold']))
+        duplicate_count = sum(len(ids) for ids in clusters.values())
+        questions = Problem.objects.in_bulk(list(clusters)).values()
+        for problem in list(questions)[:20]:
+            self.stdout.write(f"  #{problem.id} {problem.question[:40]!r} ← {sorted(clusters[problem.id])}")
+        self.stdout.write(f"중복 묶음 {len(clusters)}개, 중복 문제 {duplicate_count}개 (유사도 ≥ {options['threshold']})")
+        if options['delete'] and clusters:
+            deleted = merge_duplicates(clusters)
+            self.stdout.write(self.style.SUCCESS(f"중복 문제 {deleted}개 삭제 완료"))
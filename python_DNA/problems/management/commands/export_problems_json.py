@@ -0,0 +1,49 @@
+import os
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from problems.models import Problem
+
+EXPORT_FIELDS = ('id', 'question', 'latex', 'options', 'answer', 'category', 'image_path',
+                 'extra', 'source', 'user__username')
+
+
+def iter_export_items(chunk_size=2000):
+    """DB 문제를 기존 problems.json 형식(추가 필드는 최상위로 펼침)의 dict로 스트리밍한다."""
+    rows = Problem.objects.order_by('id').values(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+    for row in rows:
+        extra = row.pop('extra') or {}
+        item = {**extra, **row}
+        item['user'] = item.pop('user__username')
+        item['problem_id'] = item['id']
+        yield item
+
+
+class Command(BaseCommand):
+    help = "DB 문제 은행을 JSON 배열 또는 JSON Lines 파일로 내보냅니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=['json', 'jsonl'], default='json')
+        parser.add_argument('--output', help="출력 경로 (기본: PROBLEM_JSON_PATH / PROBLEM_JSONL_PATH)")
+
+    def handle(self, *args, **options):
+        jsonl = options['format'] == 'jsonl'
+        path = options['output'] or (settings.PROBLEM_JSONL_PATH if jsonl else settings.PROBLEM_JSON_PATH)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        count = 0
+        # 전체를 메모리에 올리지 않고 한 항목씩 쓴다 (JSON Lines: 한 줄에 문제 하나)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            if jsonl:
+                for item in iter_export_items():
+                    f.write(json.dumps(item, ensure_ascii=False) + '\n')
+                    count += 1
+            else:
+                f.write('[')
+                for item in iter_export_items():
+                    f.write((',\n' if count else '\n') + json.dumps(item, ensure_ascii=False))
+                    count += 1
+                f.write('\n]\n')
+        os.replace(path + '.tmp', path)
+        self.stdout.write(self.style.SUCCESS(f"문제 {count}개를 {path}에 내보냈습니다."))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from problems.bank import set_derived_fields
+from problems.models import Problem
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = "기존 문제 은행 전체의 생성 유형 색인(problem_type)과 임베딩 키를 다시 계산합니다."
+
+    def handle(self, *args, **options):
+        changed, total = [], 0
+        for problem in Problem.objects.order_by('id').iterator(chunk_size=BATCH_SIZE):
+            total += 1
+            if set_derived_fields(problem):
+                changed.append(problem)
+            if len(changed) >= BATCH_SIZE:
+                Problem.objects.bulk_update(changed, ['problem_type', 'embedding_key'])
+                changed = []
+        if changed:
+            Problem.objects.bulk_update(changed, ['problem_type', 'embedding_key'])
+        self.stdout.write(self.style.SUCCESS(f"생성 유형 색인 재계산 완료: {total}개 문제"))
@@ -0,0 +1,76 @@
+import multiprocessing
+import signal
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+RESPAWN_CHECK_INTERVAL = 5.0
+
+
+def _worker_main(poll_interval):
+    # fork 이후 각 워커는 자기 DB 연결을 새로 연다
+    connections.close_all()
+    # 종료 신호는 프로세스마다 따로 받는다. 프로세스 간 공유 Event 는 워커가 잠금을 쥔 채 죽으면
+    # 나머지 워커와 부모까지 멈추게 한다
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from problems.jobs import worker_loop
+    worker_loop(poll_interval=poll_interval, stop_event=stop_event)
+
+
+class Command(BaseCommand):
+    help = "업로드 분석 작업(UploadJob)을 처리하는 로컬 워커 프로세스 풀을 실행합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help="워커 프로세스 수")
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="대기열 확인 주기(초)")
+        parser.add_argument('--stale-timeout', type=int, default=600,
+                            help="이 시간(초) 이상 처리 중인 작업은 재시도 대상으로 간주")
+        parser.add_argument('--max-attempts', type=int, default=3, help="작업당 최대 시도 횟수")
+
+    def handle(self, *args, **options):
+        from problems.jobs import requeue_stale_jobs
+
+        requeued, failed = requeue_stale_jobs(options['stale_timeout'], options['max_attempts'])
+        if requeued or failed:
+            self.stdout.write(f"중단된 작업 재등록 {requeued}건, 실패 처리 {failed}건")
+
+        connections.close_all()
+
+        def start_worker(i):
+            process = multiprocessing.Process(
+                target=_worker_main,
+                args=(options['poll_interval'],),
+                name=f"upload-worker-{i}",
+            )
+            process.start()
+            return process
+
+        processes = [start_worker(i) for i in range(options['workers'])]
+        self.stdout.write(self.style.SUCCESS(f"업로드 워커 {len(processes)}개 실행 중 (Ctrl+C로 종료)"))
+
+        # SIGTERM(docker stop, supervisor) 도 Ctrl+C 와 같이 처리한다
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        try:
+            # 비정상 종료한 워커는 다시 띄우고, 죽은 워커가 잡고 있던 작업은 stale-timeout 이 지나면 재등록한다
+            while True:
+                time.sleep(RESPAWN_CHECK_INTERVAL)
+                requeue_stale_jobs(options['stale_timeout'], options['max_attempts'])
+                # fork 전에 부모의 DB 연결을 닫는다 (자식과 소켓을 공유하지 않도록)
+                connections.close_all()
+                for i, p in enumerate(processes):
+                    if not p.is_alive():
+                        p.join()
+                        print(f"[Upload Worker] Error: {p.name} 종료 (exit {p.exitcode}), 다시 시작합니다")
+                        processes[i] = start_worker(i)
+        except KeyboardInterrupt:
+            pass
+        # 처리 중인 작업을 마칠 때까지 기다린다
+        for p in processes:
+            if p.is_alive():
+                p.terminate()
+        for p in processes:
+            p.join()
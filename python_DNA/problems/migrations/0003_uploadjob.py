@@ -0,0 +1,32 @@
+# Generated by Django 5.2.1 on 2026-10-18 20:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0002_remove_problem_answer_remove_problem_content_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('image_path', models.CharField(max_length=255, verbose_name='이미지 경로')),
+                ('status', models.CharField(choices=[('pending', '대기'), ('running', '처리 중'), ('done', '완료'), ('failed', '실패')], db_index=True, default='pending', max_length=10, verbose_name='상태')),
+                ('result', models.JSONField(blank=True, null=True, verbose_name='분석 결과')),
+                ('error', models.TextField(blank=True, default='', verbose_name='오류 내용')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='시도 횟수')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='등록일')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='시작 시각')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='완료 시각')),
+                ('problem', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='problems.problem', verbose_name='생성된 문제')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='요청자')),
+            ],
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.1 on 2026-10-18 20:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0003_uploadjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='problem',
+            name='answer',
+            field=models.JSONField(blank=True, default=str, verbose_name='정답'),
+        ),
+        migrations.AddField(
+            model_name='problem',
+            name='category',
+            field=models.CharField(blank=True, default='', max_length=50, verbose_name='유형'),
+        ),
+        migrations.AddField(
+            model_name='problem',
+            name='embedding_key',
+            field=models.CharField(blank=True, default='', max_length=64, verbose_name='임베딩 키'),
+        ),
+        migrations.AddField(
+            model_name='problem',
+            name='extra',
+            field=models.JSONField(blank=True, default=dict, verbose_name='기타 정보'),
+        ),
+        migrations.AddField(
+            model_name='problem',
+            name='latex',
+            field=models.JSONField(blank=True, default=str, verbose_name='수식(LaTeX)'),
+        ),
+        migrations.AddField(
+            model_name='problem',
+            name='options',
+            field=models.JSONField(blank=True, default=list, verbose_name='보기'),
+        ),
+        migrations.AddField(
+            model_name='problem',
+            name='source',
+            field=models.CharField(choices=[('upload', '이미지 업로드'), ('generated', 'AI 생성'), ('manual', '직접 입력'), ('import', '가져오기')], default='manual', max_length=10, verbose_name='출처'),
+        ),
+    ]
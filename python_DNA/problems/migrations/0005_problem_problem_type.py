@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 20:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0004_problem_structured_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='problem',
+            name='problem_type',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=20, verbose_name='생성 유형'),
+        ),
+    ]
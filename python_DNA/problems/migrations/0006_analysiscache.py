@@ -0,0 +1,26 @@
+# Generated by Django 5.2.1 on 2026-10-18 20:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0005_problem_problem_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalysisCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=100, unique=True, verbose_name='캐시 키')),
+                ('analysis', models.JSONField(verbose_name='GPT 구조화 결과')),
+                ('hits', models.PositiveIntegerField(default=0, verbose_name='적중 횟수')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='등록일')),
+                ('last_used_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='마지막 사용')),
+                ('problem', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='problems.problem', verbose_name='생성된 문제')),
+            ],
+        ),
+    ]
@@ -2,10 +2,95 @@ from django.db import models
 from users.models import User
 
 class Problem(models.Model):
+    SOURCE_UPLOAD = 'upload'
+    SOURCE_GENERATED = 'generated'
+    SOURCE_MANUAL = 'manual'
+    SOURCE_IMPORT = 'import'
+    SOURCE_CHOICES = [
+        (SOURCE_UPLOAD, '이미지 업로드'),
+        (SOURCE_GENERATED, 'AI 생성'),
+        (SOURCE_MANUAL, '직접 입력'),
+        (SOURCE_IMPORT, '가져오기'),
+    ]
+
     question = models.TextField("문제 내용", null=True, blank=True, default="")
     image_path = models.CharField("문제 이미지 경로", max_length=255, null=True, blank=True, default="")
+    # 구조화된 문제 정보 (GPT 구조화/AI 생성 결과에 따라 문자열 또는 리스트일 수 있음)
+    latex = models.JSONField("수식(LaTeX)", blank=True, default=str)
+    options = models.JSONField("보기", blank=True, default=list)
+    answer = models.JSONField("정답", blank=True, default=str)
+    category = models.CharField("유형", max_length=50, blank=True, default="")
+    # AI 문제 생성 유형(PROBLEM_MAKERS 키) 색인. 저장할 때 classify_type_by_text로 한 번 계산한다.
+    problem_type = models.CharField("생성 유형", max_length=20, blank=True, default="", db_index=True)
+    extra = models.JSONField("기타 정보", blank=True, default=dict)
+    source = models.CharField("출처", max_length=10, choices=SOURCE_CHOICES, default=SOURCE_MANUAL)
+    # 임베딩 저장소 키 (문제 텍스트의 content hash)
+    embedding_key = models.CharField("임베딩 키", max_length=64, blank=True, default="")
     created_at = models.DateTimeField("등록일", auto_now_add=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="작성자", null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # 목록 조회의 (created_at, id) 키셋 페이지네이션용
+            models.Index(fields=['-created_at', '-id'], name='problem_created_id_idx'),
+            # 목록 조회 ?user= / ?category= 필터 + 같은 키셋 정렬
+            models.Index(fields=['user', '-created_at', '-id'], name='problem_user_created_idx'),
+            models.Index(fields=['category', '-created_at', '-id'], name='problem_category_created_idx'),
+            # 임베딩 정리(evict_embeddings)의 "이 임베딩을 쓰는 문제가 남았나" 확인
+            models.Index(fields=['embedding_key'], name='problem_embedding_key_idx'),
+            # 생성 예시 샘플링(sample_problems_by_type)의 유형 내 id 범위 탐색
+            models.Index(fields=['problem_type', 'id'], name='problem_type_id_idx'),
+        ]
+
     def __str__(self):
         return self.question[:50]
+
+
+class UploadJob(models.Model):
+    """이미지 업로드 후 OCR → GPT 구조화 → 저장을 비동기로 처리하기 위한 작업 큐 (DB 기반)"""
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, '대기'),
+        (STATUS_RUNNING, '처리 중'),
+        (STATUS_DONE, '완료'),
+        (STATUS_FAILED, '실패'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="요청자", null=True, blank=True)
+    image_path = models.CharField("이미지 경로", max_length=255)
+    status = models.CharField("상태", max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True)
+    problem = models.ForeignKey(Problem, on_delete=models.SET_NULL, verbose_name="생성된 문제", null=True, blank=True)
+    result = models.JSONField("분석 결과", null=True, blank=True)
+    error = models.TextField("오류 내용", blank=True, default="")
+    attempts = models.PositiveSmallIntegerField("시도 횟수", default=0)
+    created_at = models.DateTimeField("등록일", auto_now_add=True)
+    started_at = models.DateTimeField("시작 시각", null=True, blank=True)
+    finished_at = models.DateTimeField("완료 시각", null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # 워커의 작업 선점: status=pending 중 id가 가장 작은 것
+            models.Index(fields=['status', 'id'], name='uploadjob_status_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"UploadJob #{self.pk} ({self.status})"
+
+
+class AnalysisCache(models.Model):
+    """
+    업로드 이미지 분석 결과 캐시 (content-addressed).
+    key: "bytes:<sha256>" (이미지) 또는 "prompt:<sha256>" (OCR 텍스트+LaTeX)
+    """
+    key = models.CharField("캐시 키", max_length=100, unique=True)
+    analysis = models.JSONField("GPT 구조화 결과")
+    problem = models.ForeignKey(Problem, on_delete=models.SET_NULL, verbose_name="생성된 문제", null=True, blank=True)
+    hits = models.PositiveIntegerField("적중 횟수", default=0)
+    created_at = models.DateTimeField("등록일", auto_now_add=True)
+    last_used_at = models.DateTimeField("마지막 사용", auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return self.key
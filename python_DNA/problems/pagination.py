@@ -0,0 +1,77 @@
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+
+class ProblemCursorPagination(CursorPagination):
+    """
+    (created_at, id) 키셋 페이지네이션.
+    커서에 마지막으로 본 행의 (created_at, id)를 담고, 다음 페이지는
+    WHERE (created_at, id) < 커서 ORDER BY created_at DESC, id DESC LIMIT n+1 로 조회한다.
+    (행 비교는 created_at <= c AND (created_at < c OR id < pk)로 풀어 써서 인덱스 범위 조회가 되게 한다)
+    OFFSET을 쓰지 않으므로 몇 번째 페이지든 (created_at, id) 복합 인덱스 범위 조회 한 번이다.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        position = self._decode(request.query_params.get(self.cursor_query_param))
+        self.reverse = bool(position and position[2])
+
+        if position is None:
+            queryset = queryset.order_by('-created_at', '-id')
+        elif self.reverse:
+            created_at, pk, _ = position
+            queryset = queryset.filter(
+                Q(created_at__gt=created_at) | Q(id__gt=pk), created_at__gte=created_at
+            ).order_by('created_at', 'id')
+        else:
+            created_at, pk, _ = position
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(id__lt=pk), created_at__lte=created_at
+            ).order_by('-created_at', '-id')
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        if self.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self._link(self.page[0], reverse=True)
+
+    def _link(self, row, reverse):
+        raw = f"{row.created_at.isoformat()}|{row.pk}|{int(reverse)}"
+        token = base64.urlsafe_b64encode(raw.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def _decode(self, token):
+        if not token:
+            return None
+        try:
+            created_at, pk, reverse = base64.urlsafe_b64decode(token.encode('ascii')).decode('ascii').split('|')
+            return datetime.fromisoformat(created_at), int(pk), reverse == '1'
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
@@ -0,0 +1,201 @@
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Problem
+from .bank import save_problems, find_duplicates
+from .serializer import ProblemSerializer
+from .utils import run_ocr, struct_problem_with_gpt, get_problem_msg, GPT_MODEL, OCRQueueFull
+from .cache import image_keys, prompt_key, lookup, store
+
+# 업로드 이미지 처리 파이프라인 (동기 API와 비동기 작업 워커가 함께 사용)
+
+# 일괄 업로드 제한 및 단계별 동시 실행 수
+BATCH_MAX_FILES = 50
+BATCH_MAX_FILE_SIZE = 10 * 1024 * 1024
+BATCH_OCR_CONCURRENCY = 2
+BATCH_GPT_CONCURRENCY = 4
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tif', '.tiff')
+
+def _write_image(name, chunks):
+    os.makedirs(os.path.join(settings.MEDIA_ROOT, 'images'), exist_ok=True)
+    ext = os.path.splitext(name)[-1]
+    filename = f"{uuid4().hex}{ext}"
+    image_save_path = os.path.join(settings.MEDIA_ROOT, 'images', filename)
+    with open(image_save_path, 'wb+') as f:
+        for chunk in chunks:
+            f.write(chunk)
+    return image_save_path, f"/media/images/{filename}"
+
+def save_uploaded_image(image):
+    """업로드 파일을 media/images/에 저장하고 (파일 경로, URL)을 반환한다."""
+    return _write_image(image.name, image.chunks())
+
+def save_images_from_zip(archive):
+    """zip 안의 이미지 파일들을 저장한다. 이미지가 아닌 항목은 건너뛴다."""
+    saved = []
+    with zipfile.ZipFile(archive) as zf:
+        members = sorted(
+            (m for m in zf.infolist()
+             if not m.is_dir() and os.path.splitext(m.filename)[-1].lower() in IMAGE_EXTENSIONS),
+            key=lambda m: m.filename,
+        )
+        if len(members) > BATCH_MAX_FILES:
+            raise ValueError(f"한 번에 최대 {BATCH_MAX_FILES}개 이미지까지 업로드할 수 있습니다.")
+        for member in members:
+            if member.file_size > BATCH_MAX_FILE_SIZE:
+                raise ValueError(f"{member.filename}: 파일 크기가 너무 큽니다.")
+            saved.append(_write_image(member.filename, [zf.read(member)]))
+    return saved
+
+def image_url_to_path(image_url):
+    return os.path.join(settings.MEDIA_ROOT, 'images', os.path.basename(image_url))
+
+def find_cached_upload(image_save_path):
+    """업로드 이미지의 캐시 키와 (있으면) 캐시 항목을 반환한다."""
+    keys = image_keys(image_save_path)
+    return keys, lookup(keys)
+
+def _remove_image(image_save_path):
+    if os.path.exists(image_save_path):
+        os.remove(image_save_path)
+
+def _upload_items(analyses, saved_images):
+    return [dict(analysis, image_path=url) for analysis, (_, url) in zip(analyses, saved_images)]
+
+def find_upload_duplicates(analyses, saved_images):
+    """
+    save_uploaded_problems 에 넘길 중복 검사 결과 (SBERT 인코딩 + FAISS 검색).
+    트랜잭션 밖에서 미리 실행해 두면 모델 추론 동안 DB 트랜잭션을 열어 두지 않는다.
+    """
+    return find_duplicates(_upload_items(analyses, saved_images))
+
+def save_uploaded_problems(analyses, saved_images, user, duplicates=None):
+    """
+    구조화 결과들을 저장한다. 이미 은행에 있는(또는 같은 요청 안에서 앞서 나온) 문제와
+    거의 같으면 새로 저장하지 않고 그 문제에 연결하며, 중복 업로드 이미지 파일은 커밋된 뒤에 지운다.
+    duplicates: find_upload_duplicates 결과 (없으면 여기서 검사한다)
+    반환: [(problem, analysis)] — 연결된 경우 analysis에 duplicate_of(문제 id)가 붙는다.
+    """
+    items = _upload_items(analyses, saved_images)
+    if duplicates is None:
+        duplicates = find_duplicates(items)
+    new_items = [item for item, duplicate in zip(items, duplicates) if duplicate is None]
+    created = iter(save_problems(new_items, user=user, source=Problem.SOURCE_UPLOAD) if new_items else [])
+    results = []
+    for analysis, (image_save_path, _), duplicate in zip(analyses, saved_images, duplicates):
+        if duplicate is None:
+            results.append((next(created), analysis))
+            continue
+        problem = results[duplicate][0] if isinstance(duplicate, int) else duplicate
+        results.append((problem, dict(analysis, image_path=problem.image_path, duplicate_of=problem.id)))
+        # 트랜잭션이 롤백되면 이 업로드를 다시 처리해야 하므로 파일은 커밋된 뒤에 지운다
+        transaction.on_commit(lambda path=image_save_path: _remove_image(path))
+    return results
+
+def analyze_upload(image_save_path, image_url, user, cached=None, wait_for_ocr=False):
+    """
+    업로드 이미지 분석 단계: 캐시 확인 → OCR → GPT 구조화. 문제를 DB에 저장하지 않으므로
+    트랜잭션 밖에서 실행한다 (OCR/GPT 를 기다리는 동안 DB 쓰기 잠금을 잡지 않도록).
+    OCR 대기열이 가득 차면 업로드 이미지를 지우고 OCRQueueFull을 던진다 (wait_for_ocr=True면 기다림).
+    반환: (problem, analysis, cache_keys)
+      - problem: 같은 이미지를 같은 사용자가 이미 올려 문제가 남아 있으면 그 문제, 새로 저장해야 하면 None
+      - cache_keys: 저장 후 cache.store 할 키 (캐시에서 분석 결과를 가져왔으면 빈 리스트)
+    """
+    keys, entry = cached or find_cached_upload(image_save_path)
+    if entry:
+        if entry.problem and entry.problem.user_id == getattr(user, 'id', None):
+            if entry.problem.image_path != image_url:
+                _remove_image(image_save_path)
+            return entry.problem, dict(entry.analysis, image_path=entry.problem.image_path), []
+        return None, dict(entry.analysis, image_path=image_url), []
+
+    # OCR/AI 분석 (텍스트/LaTeX OCR 병렬 실행, OCR 결과가 같으면 GPT 생략)
+    try:
+        ocr = run_ocr(image_save_path, wait=wait_for_ocr)
+    except OCRQueueFull:
+        _remove_image(image_save_path)
+        raise
+    if ocr['text'] or ocr['latex']:
+        keys.append(prompt_key(GPT_MODEL, ocr['text'], ocr['latex']))
+        entry = lookup(keys[-1:])
+    if entry:
+        return None, dict(entry.analysis, image_path=image_url), keys
+    return None, struct_problem_with_gpt(ocr['text'], ocr['latex'], image_url), keys
+
+def run_upload_pipeline(image_save_path, image_url, user, cached=None, wait_for_ocr=False):
+    """
+    OCR → GPT 구조화(analyze_upload) → DB 저장(+ FAISS 인덱스 증분 갱신). (problem, analysis)를 반환한다.
+    같은 이미지가 이미 분석된 적이 있으면 OCR/GPT를 건너뛰고, 같은 사용자의 기존 문제가
+    남아 있으면 새로 저장하지 않고 그 문제를 돌려준다. 은행에 거의 같은 문제가 있으면
+    (SBERT 유사도 ≥ DEDUP_SIMILARITY_THRESHOLD) 새로 저장하지 않고 그 문제에 연결한다.
+    """
+    problem, analysis, keys = analyze_upload(image_save_path, image_url, user, cached, wait_for_ocr)
+    if problem is not None:
+        return problem, analysis
+    problem, result = save_uploaded_problems([analysis], [(image_save_path, image_url)], user)[0]
+    if keys:
+        store(keys, analysis, problem)
+    return problem, result
+
+def run_batch_upload_pipeline(saved_images, user):
+    """
+    여러 이미지를 OCR → GPT 구조화 → DB 저장 파이프라인으로 처리한다.
+    각 이미지의 OCR이 끝나는 즉시 GPT 단계로 넘기고(단계별 동시 실행 수 제한),
+    모든 Problem 행은 한 트랜잭션 안에서 bulk_create 한 번으로 저장한다 (중복 문제는 기존 문제에 연결).
+    반환: (성공 [(problem, analysis, image_url)], 실패 [{"image_url", "error"}])
+    """
+    def _struct(image_url, ocr_future):
+        ocr = ocr_future.result()
+        return struct_problem_with_gpt(ocr['text'], ocr['latex'], image_url)
+
+    ocr_pool = ThreadPoolExecutor(BATCH_OCR_CONCURRENCY, thread_name_prefix="batch-ocr")
+    gpt_pool = ThreadPoolExecutor(BATCH_GPT_CONCURRENCY, thread_name_prefix="batch-gpt")
+    gpt_futures = {}
+    try:
+        for image_save_path, image_url in saved_images:
+            # 일괄 업로드는 OCR 대기열이 차 있으면 자리가 날 때까지 기다린다
+            ocr_future = ocr_pool.submit(run_ocr, image_save_path, True)
+            # OCR이 끝나는 즉시(콜백) GPT 단계에 제출 → 두 단계가 겹쳐서 진행됨
+            ocr_future.add_done_callback(
+                lambda f, url=image_url: gpt_futures.__setitem__(url, gpt_pool.submit(_struct, url, f))
+            )
+        # OCR 워커가 모두 끝나면 콜백(=GPT 제출)도 모두 끝난 상태
+        ocr_pool.shutdown(wait=True)
+        gpt_pool.shutdown(wait=True)
+    finally:
+        ocr_pool.shutdown(wait=False, cancel_futures=True)
+        gpt_pool.shutdown(wait=False, cancel_futures=True)
+    results = [(url, gpt_futures[url]) for _, url in saved_images]
+
+    analyses, succeeded, failed = [], [], []
+    for (image_save_path, image_url), (_, future) in zip(saved_images, results):
+        try:
+            analyses.append(future.result())
+            succeeded.append((image_save_path, image_url))
+        except Exception as e:
+            failed.append({"image_url": image_url, "error": str(e)})
+
+    saved = save_uploaded_problems(analyses, succeeded, user)
+    return [(problem, analysis, problem.image_path) for problem, analysis in saved], failed
+
+def build_upload_response(problem, analysis, image_url):
+    serializer = ProblemSerializer(problem)
+    return {
+        "msg": get_problem_msg(analysis),
+        "problem": serializer.data,
+        "analysis": {
+            "question": analysis['question'],
+            "latex": analysis['latex'],
+            "options": analysis.get('options', []),
+            "answer": analysis.get('answer', ''),
+            "category": analysis.get('category', '')
+        },
+        "image_url": image_url,
+        "duplicate_of": analysis.get('duplicate_of'),
+        "created_at": serializer.data['created_at']
+    }
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Problem
+from .models import Problem, UploadJob
 
 class ProblemSerializer(serializers.ModelSerializer):
     """
@@ -22,6 +22,29 @@ class ProblemSerializer(serializers.ModelSerializer):
         allow_blank=True,
         help_text="문제 이미지 파일 경로 (선택사항)"
     )
+    latex = serializers.JSONField(
+        required=False,
+        help_text="문제의 핵심 수식 (LaTeX 문자열 또는 리스트)"
+    )
+    options = serializers.ListField(
+        child=serializers.CharField(allow_blank=True),
+        required=False,
+        help_text="보기 목록 (없으면 빈 리스트)"
+    )
+    answer = serializers.JSONField(
+        required=False,
+        help_text="정답"
+    )
+    category = serializers.CharField(
+        max_length=50,
+        required=False,
+        allow_blank=True,
+        help_text="문제 유형 (함수, 기하, 미적분 등)"
+    )
+    source = serializers.CharField(
+        read_only=True,
+        help_text="문제 출처 (upload, generated, manual, import)"
+    )
     created_at = serializers.DateTimeField(
         read_only=True,
         help_text="문제 등록 일시 (자동 생성)"
@@ -33,5 +56,26 @@ class ProblemSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Problem
-        fields = ['id', 'question', 'image_path', 'created_at', 'user']
-        read_only_fields = ['id', 'created_at', 'user']
+        fields = ['id', 'question', 'latex', 'options', 'answer', 'category', 'image_path',
+                  'source', 'created_at', 'user']
+        read_only_fields = ['id', 'source', 'created_at', 'user']
+
+    def __init__(self, *args, **kwargs):
+        # fields=[...] 를 주면 그 필드만 직렬화한다 (목록 조회의 ?fields= 희소 필드)
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class UploadJobSerializer(serializers.ModelSerializer):
+    """
+    이미지 분석 작업 상태 조회를 위한 시리얼라이저
+    """
+
+    class Meta:
+        model = UploadJob
+        fields = ['id', 'status', 'image_path', 'problem', 'result', 'error',
+                  'created_at', 'started_at', 'finished_at']
+        read_only_fields = fields
@@ -1,3 +1,333 @@
+import os
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection, transaction
+from django.db.models import QuerySet
 from django.test import TestCase
+from django.utils import timezone
+from PIL import Image, ImageDraw
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from users.models import User
+from . import bank, cache, pipeline, jobs as jobs_module
+from .models import AnalysisCache, Problem, UploadJob
+from .pagination import ProblemCursorPagination
+
+
+def _worksheet_page(path, question):
+    """같은 학습지 양식(머리글, 문항 번호, 풀이 칸)에 문제 본문만 다른 페이지 이미지."""
+    img = Image.new('RGB', (1240, 1754), 'white')
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((60, 60, 1180, 180), fill=(90, 90, 90))
+    draw.text((100, 100), "Math Worksheet - Unit 3", fill='white')
+    draw.text((100, 260), "1.", fill='black')
+    draw.text((140, 260), question, fill='black')
+    for x in range(60, 1200, 280):
+        draw.rectangle((x, 400, x + 140, 1700), fill=(170, 170, 170))
+    img.save(path)
+
+
+class AnalysisCacheTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _page(self, name, question):
+        path = os.path.join(self.tmp.name, name)
+        _worksheet_page(path, question)
+        return path
+
+    def _age(self, key, **delta):
+        AnalysisCache.objects.filter(key=key).update(created_at=timezone.now() - timedelta(**delta))
+
+    def test_different_pages_of_same_worksheet_do_not_share_entries(self):
+        page1 = self._page("p1.png", "x^2 - 5x + 6 = 0 의 두 근의 합을 구하시오.")
+        page2 = self._page("p2.png", "log_2 8 + log_3 9 의 값을 구하시오.")
+        cache.store(cache.image_keys(page1), {"question": "page1"})
+        cache.store(cache.image_keys(page2), {"question": "page2"})
+
+        self.assertFalse(set(cache.image_keys(page1)) & set(cache.image_keys(page2)))
+        self.assertEqual(cache.lookup(cache.image_keys(page1)).analysis, {"question": "page1"})
+        self.assertEqual(cache.lookup(cache.image_keys(page2)).analysis, {"question": "page2"})
+
+    def test_page_misses_another_pages_entry(self):
+        page1 = self._page("p1.png", "x^2 - 5x + 6 = 0 의 두 근의 합을 구하시오.")
+        page2 = self._page("p2.png", "log_2 8 + log_3 9 의 값을 구하시오.")
+        cache.store(cache.image_keys(page1), {"question": "page1"})
+        self.assertIsNone(cache.lookup(cache.image_keys(page2)))
+
+    def test_same_file_hits(self):
+        page = self._page("p1.png", "x^2 - 5x + 6 = 0 의 두 근의 합을 구하시오.")
+        cache.store(cache.image_keys(page), {"question": "page1"})
+        entry = cache.lookup(cache.image_keys(page))
+        self.assertEqual(entry.analysis, {"question": "page1"})
+        self.assertEqual(AnalysisCache.objects.get(pk=entry.pk).hits, 1)
+
+    def test_expired_entry_is_ignored_and_evicted(self):
+        key = cache.prompt_key("gpt-4o", "text", "latex")
+        cache.store([key], {"question": "q"})
+        self._age(key, days=cache.CACHE_TTL.days, seconds=1)
+
+        self.assertIsNone(cache.lookup([key]))
+        cache.evict()
+        self.assertFalse(AnalysisCache.objects.filter(key=key).exists())
+
+    def test_entry_within_ttl_hits(self):
+        key = cache.prompt_key("gpt-4o", "text", "latex")
+        cache.store([key], {"question": "q"})
+        self._age(key, days=cache.CACHE_TTL.days - 1)
+        self.assertIsNotNone(cache.lookup([key]))
+
+    def test_overflow_evicts_least_recently_used(self):
+        now = timezone.now()
+        with mock.patch.object(cache, 'CACHE_MAX_ENTRIES', 2):
+            cache.store(["k1"], {"n": 1})
+            cache.store(["k2"], {"n": 2})
+            # k1 을 더 최근에 사용 → 넘치면 k2 가 지워져야 한다
+            AnalysisCache.objects.filter(key="k1").update(last_used_at=now - timedelta(minutes=1))
+            AnalysisCache.objects.filter(key="k2").update(last_used_at=now - timedelta(minutes=2))
+            cache.store(["k3"], {"n": 3})
+
+        self.assertEqual(set(AnalysisCache.objects.values_list('key', flat=True)), {"k1", "k3"})
+
+    def test_lookup_refreshes_last_used(self):
+        now = timezone.now()
+        with mock.patch.object(cache, 'CACHE_MAX_ENTRIES', 2):
+            cache.store(["k1"], {"n": 1})
+            cache.store(["k2"], {"n": 2})
+            AnalysisCache.objects.filter(key="k1").update(last_used_at=now - timedelta(minutes=2))
+            AnalysisCache.objects.filter(key="k2").update(last_used_at=now - timedelta(minutes=1))
+            cache.lookup(["k1"])
+            cache.store(["k3"], {"n": 3})
+
+        self.assertEqual(set(AnalysisCache.objects.values_list('key', flat=True)), {"k1", "k3"})
+
+
+class UploadJobQueueTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="student", password="pw")
+
+    def _job(self, **fields):
+        return UploadJob.objects.create(image_path="/media/images/a.png", user=self.user, **fields)
+
+    def test_claim_hands_out_each_job_once(self):
+        jobs = [self._job() for _ in range(3)]
+        claimed = [jobs_module.claim_next_job() for _ in range(4)]
+
+        self.assertEqual([job.pk for job in claimed[:3]], [job.pk for job in jobs])
+        self.assertIsNone(claimed[3])
+        for job in claimed[:3]:
+            self.assertEqual(job.status, UploadJob.STATUS_RUNNING)
+            self.assertEqual(job.attempts, 1)
+
+    def test_claim_skips_job_taken_by_another_worker(self):
+        first, second = self._job(), self._job()
+        real_first = QuerySet.first
+        raced = []
+
+        def racing_first(qs):
+            job = real_first(qs)
+            if job is not None and not raced:
+                # SELECT 와 조건부 UPDATE 사이에 다른 워커가 먼저 선점
+                raced.append(job.pk)
+                UploadJob.objects.filter(pk=job.pk).update(status=UploadJob.STATUS_RUNNING, attempts=1)
+            return job
+
+        with mock.patch.object(QuerySet, 'first', racing_first):
+            claimed = jobs_module.claim_next_job()
+
+        self.assertEqual(raced, [first.pk])
+        self.assertEqual(claimed.pk, second.pk)
+        first.refresh_from_db()
+        self.assertEqual(first.attempts, 1)
+
+    def test_requeue_stale_jobs_honours_max_attempts(self):
+        old = timezone.now() - timedelta(hours=1)
+        retry = self._job(status=UploadJob.STATUS_RUNNING, started_at=old, attempts=1)
+        exhausted = self._job(status=UploadJob.STATUS_RUNNING, started_at=old, attempts=3)
+        fresh = self._job(status=UploadJob.STATUS_RUNNING, started_at=timezone.now(), attempts=1)
+        done = self._job(status=UploadJob.STATUS_DONE, started_at=old, attempts=1)
+
+        self.assertEqual(jobs_module.requeue_stale_jobs(timeout_seconds=600, max_attempts=3), (1, 1))
+        statuses = {job.pk: UploadJob.objects.get(pk=job.pk).status for job in (retry, exhausted, fresh, done)}
+        self.assertEqual(statuses, {
+            retry.pk: UploadJob.STATUS_PENDING,
+            exhausted.pk: UploadJob.STATUS_FAILED,
+            fresh.pk: UploadJob.STATUS_RUNNING,
+            done.pk: UploadJob.STATUS_DONE,
+        })
+        self.assertEqual(jobs_module.claim_next_job().pk, retry.pk)
+
+    def test_process_job_analyzes_outside_transaction(self):
+        job = self._job(status=UploadJob.STATUS_RUNNING, attempts=1)
+        problem = Problem.objects.create(question="q", image_path=job.image_path, user=self.user)
+        depth = {}
+
+        def analyze(*args, **kwargs):
+            depth['analyze'] = len(connection.atomic_blocks)
+            return None, {"question": "q"}, ["bytes:x"]
+
+        def duplicates(*args):
+            depth['duplicates'] = len(connection.atomic_blocks)
+            return [None]
+
+        def save(*args):
+            depth['save'] = len(connection.atomic_blocks)
+            return [(problem, {"question": "q"})]
+
+        with mock.patch.object(jobs_module, 'analyze_upload', analyze), \
+                mock.patch.object(jobs_module, 'find_upload_duplicates', duplicates), \
+                mock.patch.object(jobs_module, 'save_uploaded_problems', save), \
+                mock.patch.object(jobs_module, 'build_upload_response', return_value={}), \
+                mock.patch.object(jobs_module, 'store') as store:
+            jobs_module.process_job(job)
+
+        self.assertEqual(depth['duplicates'], depth['analyze'])
+        self.assertEqual(depth['save'], depth['analyze'] + 1)
+        store.assert_called_once_with(["bytes:x"], {"question": "q"}, problem)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.problem_id), (UploadJob.STATUS_DONE, problem.pk))
+
+    def test_duplicate_upload_image_is_removed_after_commit(self):
+        existing = Problem.objects.create(question="q", image_path="/media/images/old.png", user=self.user)
+        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
+            path = f.name
+        self.addCleanup(lambda: os.path.exists(path) and os.remove(path))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                (problem, result), = pipeline.save_uploaded_problems(
+                    [{"question": "q"}], [(path, "/media/images/new.png")], self.user, duplicates=[existing])
+                self.assertTrue(os.path.exists(path))
+
+        self.assertEqual((problem, result['duplicate_of']), (existing, existing.pk))
+        self.assertFalse(os.path.exists(path))
+
+    def test_process_job_records_failure(self):
+        job = self._job(status=UploadJob.STATUS_RUNNING, attempts=1)
+        with mock.patch.object(jobs_module, 'analyze_upload', side_effect=RuntimeError("OCR 실패")), \
+                mock.patch('traceback.print_exc'):
+            jobs_module.process_job(job)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), (UploadJob.STATUS_FAILED, "OCR 실패"))
+
+
+class SampleProblemsByTypeTests(TestCase):
+    def setUp(self):
+        self.sequences = [Problem.objects.create(question=f"수열 {i}", problem_type="수열") for i in range(5)]
+        self.others = [Problem.objects.create(question=f"로그 {i}", problem_type="로그") for i in range(5)]
+
+    def _ids(self, rows):
+        return [row['id'] for row in rows]
+
+    def test_samples_distinct_problems_of_type(self):
+        ids = self._ids(bank.sample_problems_by_type("수열", 3))
+        self.assertEqual(len(ids), 3)
+        self.assertEqual(len(set(ids)), 3)
+        self.assertTrue(set(ids) <= {p.pk for p in self.sequences})
+
+    def test_returns_fewer_when_type_is_small(self):
+        Problem.objects.filter(pk__in=[p.pk for p in self.sequences[1:]]).delete()
+        self.assertEqual(self._ids(bank.sample_problems_by_type("수열", 3)), [self.sequences[0].pk])
+
+    def test_falls_back_to_whole_bank(self):
+        ids = self._ids(bank.sample_problems_by_type("지수", 2))
+        self.assertEqual(len(set(ids)), 2)
+
+    def test_does_not_load_all_ids(self):
+        # 질의 수는 유형의 문제 수가 아니라 k에 비례한다 (최소/최대 id 한 번 + 행당 한 번)
+        with mock.patch.object(bank.random, 'randint', side_effect=lambda lo, hi: lo), \
+                self.assertNumQueries(1 + 3 * bank.SAMPLE_ATTEMPTS):
+            rows = bank.sample_problems_by_type("수열", 3)
+        self.assertEqual(self._ids(rows), [self.sequences[0].pk])
+
+
+class DuplicateClusterTests(TestCase):
+    def _clusters(self, pairs):
+        return {canonical: sorted(ids) for canonical, ids in bank.cluster_duplicates(pairs).items()}
+
+    def test_pairs_are_grouped_under_oldest_problem(self):
+        pairs = [(3, 5, 0.99), (5, 9, 0.98), (2, 4, 0.97)]
+        self.assertEqual(self._clusters(pairs), {3: [5, 9], 2: [4]})
+
+    def test_clusters_joined_by_later_pair_are_merged(self):
+        pairs = [(5, 9, 0.99), (7, 8, 0.99), (8, 9, 0.99), (3, 7, 0.99)]
+        self.assertEqual(self._clusters(pairs), {3: [5, 7, 8, 9]})
+
+    def test_result_does_not_depend_on_pair_order(self):
+        pairs = [(1, 6, 0.99), (6, 4, 0.99), (10, 11, 0.99), (4, 10, 0.99), (20, 21, 0.99)]
+        self.assertEqual(self._clusters(pairs), self._clusters(list(reversed(pairs))))
+        self.assertEqual(self._clusters(pairs), {1: [4, 6, 10, 11], 20: [21]})
+
+    def test_no_pairs(self):
+        self.assertEqual(bank.cluster_duplicates([]), {})
+
+    def test_merge_removes_duplicates_from_index_in_one_call(self):
+        user = User.objects.create_user(username="teacher", password="pw")
+        keep, dup1, dup2 = (Problem.objects.create(question=f"q{i}", embedding_key=f"k{i}", user=user) for i in range(3))
+        job = UploadJob.objects.create(image_path="/media/images/a.png", user=user, problem=dup1)
+
+        with mock.patch.object(bank, 'remove_from_index') as remove, \
+                mock.patch.object(bank, 'evict_embeddings') as evict, \
+                self.captureOnCommitCallbacks(execute=True):
+            deleted = bank.merge_duplicates({keep.id: [dup1.id, dup2.id]})
+
+        self.assertEqual(deleted, 2)
+        remove.assert_called_once()
+        self.assertEqual(sorted(remove.call_args.args[0]), [(dup1.id, "k1"), (dup2.id, "k2")])
+        self.assertEqual(sorted(evict.call_args.args[0]), ["k1", "k2"])
+        job.refresh_from_db()
+        self.assertEqual(job.problem_id, keep.id)
+        self.assertEqual(list(Problem.objects.values_list('id', flat=True)), [keep.id])
+
+
+class ProblemCursorPaginationTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username="student", password="pw")
+        now = timezone.now()
+        # tie1..tie3 은 created_at 이 같아서 id 역순으로 정렬되어야 한다
+        self.older, self.tie1, self.tie2, self.tie3, self.newest = (
+            Problem.objects.create(question=f"q{i}", user=user) for i in range(5)
+        )
+        Problem.objects.filter(pk__in=[self.tie1.pk, self.tie2.pk, self.tie3.pk]).update(created_at=now)
+        Problem.objects.filter(pk=self.older.pk).update(created_at=now - timedelta(hours=1))
+        Problem.objects.filter(pk=self.newest.pk).update(created_at=now + timedelta(hours=1))
+        self.factory = APIRequestFactory()
+
+    def _page(self, url):
+        paginator = ProblemCursorPagination()
+        page = paginator.paginate_queryset(Problem.objects.all(), Request(self.factory.get(url)))
+        return [p.pk for p in page], paginator.get_next_link(), paginator.get_previous_link()
+
+    def test_ties_on_created_at_are_ordered_by_id(self):
+        expected = [self.newest.pk, self.tie3.pk, self.tie2.pk, self.tie1.pk, self.older.pk]
+        seen, url = [], "/problems/?page_size=2"
+        while url:
+            ids, url, _ = self._page(url)
+            seen.extend(ids)
+        self.assertEqual(seen, expected)
+
+    def test_previous_cursor_walks_back_over_ties(self):
+        first, next_url, previous_url = self._page("/problems/?page_size=2")
+        self.assertIsNone(previous_url)
+        second, next_url, previous_url = self._page(next_url)
+        third, next_url, back_url = self._page(next_url)
+        self.assertEqual(second, [self.tie2.pk, self.tie1.pk])
+        self.assertEqual(third, [self.older.pk])
+        self.assertIsNone(next_url)
+
+        ids, forward_url, back_url = self._page(back_url)
+        self.assertEqual(ids, second)
+        self.assertEqual(self._page(forward_url)[0], third)
+        ids, forward_url, back_url = self._page(back_url)
+        self.assertEqual(ids, first)
+        self.assertIsNone(back_url)
+        self.assertEqual(self._page(forward_url)[0], second)
 
-# Create your tests here.
+    def test_invalid_cursor(self):
+        with self.assertRaises(NotFound):
+            self._page("/problems/?cursor=not-a-cursor")
@@ -1,12 +1,16 @@
 from django.urls import path
 from .views import (
     ProblemImageUploadAPIView,
+    ProblemBatchUploadAPIView,
     ProblemListCreateAPIView,
-    ProblemRetrieveUpdateDestroyAPIView
+    ProblemRetrieveUpdateDestroyAPIView,
+    UploadJobStatusAPIView
 )
 
 urlpatterns = [
     path('upload/', ProblemImageUploadAPIView.as_view(), name='problem-image-upload'),
+    path('upload/batch/', ProblemBatchUploadAPIView.as_view(), name='problem-image-batch-upload'),
     path('list/', ProblemListCreateAPIView.as_view(), name='problem-list-create'),
     path('<int:pk>/', ProblemRetrieveUpdateDestroyAPIView.as_view(), name='problem-detail'),
+    path('jobs/<int:pk>/', UploadJobStatusAPIView.as_view(), name='problem-upload-job'),
 ]
\ No newline at end of file
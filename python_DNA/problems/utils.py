@@ -1,44 +1,139 @@
-import pytesseract
 from PIL import Image
 
-from pix2tex.cli import LatexOCR
-
-import openai
 import re
 import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import os
 
+from django.conf import settings
+
+from ai.utils.model_registry import get_latex_ocr
+from ai.utils.llm_client import chat_completion
+
 load_dotenv()
 
+# pytesseract / pix2tex(torch) 는 manage.py 명령마다 로드되지 않도록
+# 실제로 사용하는 함수 안에서 import 한다.
+
 # -------------------- OCR --------------------
 
-ocr_model = None
 def init_ocr():
-    global ocr_model
-    if ocr_model is None:
-        ocr_model = LatexOCR()
-    return ocr_model
+    return get_latex_ocr()
+
+def _as_image(image):
+    """파일 경로 또는 이미 디코딩된 PIL 이미지를 받아 PIL 이미지로 돌려준다."""
+    if isinstance(image, Image.Image):
+        return image
+    img = Image.open(image)
+    img.load()
+    return img
 
-def img2latex(image_path):
+def img2latex(image):
     model = init_ocr()
     try:
-        return model(image_path)
+        return model(_as_image(image))
     except Exception as e:
         print(f"[LaTeX-OCR] Error: {e}")
         return ""
 
-def img2text(image_path):
+def img2text(image):
+    import pytesseract
     try:
-        return pytesseract.image_to_string(Image.open(image_path), lang="kor+eng")
+        return pytesseract.image_to_string(_as_image(image), lang="kor+eng")
     except Exception as e:
         print(f"[Text OCR] Error: {e}")
         return ""
 
+# tesseract는 외부 프로세스를 띄우므로 스레드 풀로 충분하고,
+# pix2tex(torch) 모델은 전용 단일 스레드 executor에서만 추론한다.
+# 동시에 처리(대기 포함)하는 OCR 요청은 프로세스당 OCR_QUEUE_MAX 개로 제한한다.
+OCR_TEXT_WORKERS = 4
+_executors = {}
+_executors_lock = threading.Lock()
+_ocr_slots = None
+
+
+class OCRQueueFull(Exception):
+    """OCR 대기열이 가득 참. retry_after 초 뒤에 다시 시도하면 된다."""
+    def __init__(self, retry_after):
+        super().__init__("OCR 대기열이 가득 찼습니다.")
+        self.retry_after = retry_after
+
+
+def _reset_after_fork():
+    # 부모 프로세스의 executor 스레드는 fork 후 자식에 없으므로 새로 만든다
+    global _executors, _executors_lock, _ocr_slots
+    _executors, _executors_lock, _ocr_slots = {}, threading.Lock(), None
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+def _get_ocr_slots():
+    global _ocr_slots
+    with _executors_lock:
+        if _ocr_slots is None:
+            _ocr_slots = threading.BoundedSemaphore(settings.OCR_QUEUE_MAX)
+        return _ocr_slots
+
+def _get_executor(name, max_workers):
+    with _executors_lock:
+        if name not in _executors:
+            _executors[name] = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"ocr-{name}")
+        return _executors[name]
+
+def _timed(func, image):
+    start = time.perf_counter()
+    result = func(image)
+    return result, time.perf_counter() - start
+
+def ocr_queue_full():
+    slots = _get_ocr_slots()
+    if not slots.acquire(blocking=False):
+        return True
+    slots.release()
+    return False
+
+def run_ocr(image_path, wait=False):
+    """
+    이미지를 한 번만 디코딩해서 텍스트 OCR과 LaTeX OCR을 병렬로 실행한다.
+    OCR 대기열이 가득 차면 wait=False(API 요청)는 OCRQueueFull을 던지고, wait=True(백그라운드 작업)는 기다린다.
+    반환: {"text": ..., "latex": ..., "timings": {"decode", "tesseract", "latex_ocr", "total"}}
+    """
+    slots = _get_ocr_slots()
+    if not slots.acquire(blocking=wait):
+        raise OCRQueueFull(settings.OCR_RETRY_AFTER)
+    try:
+        return _run_ocr(image_path)
+    finally:
+        slots.release()
+
+def _run_ocr(image_path):
+    start = time.perf_counter()
+    try:
+        image = _as_image(image_path)
+    except Exception as e:
+        print(f"[OCR] 이미지 디코딩 실패: {e}")
+        return {"text": "", "latex": "", "timings": {}}
+    decoded = time.perf_counter()
+
+    text_future = _get_executor("text", OCR_TEXT_WORKERS).submit(_timed, img2text, image)
+    latex_future = _get_executor("latex", 1).submit(_timed, img2latex, image)
+    text, text_time = text_future.result()
+    latex, latex_time = latex_future.result()
+
+    timings = {
+        "decode": round(decoded - start, 4),
+        "tesseract": round(text_time, 4),
+        "latex_ocr": round(latex_time, 4),
+        "total": round(time.perf_counter() - start, 4),
+    }
+    print(f"[OCR] {timings}")
+    return {"text": text, "latex": latex, "timings": timings}
+
 # -------------------- GPT 구조화 --------------------
 
-  # ← 본인 키로 교체
-openai.api_key = os.getenv("OPENAI_API_KEY")
 GPT_MODEL = "gpt-4o"
 
 def struct_problem_with_gpt(text, latex, image_path):
@@ -79,13 +174,12 @@ def struct_problem_with_gpt(text, latex, image_path):
 JSON 이외의 불필요한 설명, 해설, 코멘트는 절대 붙이지 마.
 항상 문제 정보를 완전히 JSON만으로, 한 번에 올바르게 반환해.
 """
-    response = openai.ChatCompletion.create(
+    content = chat_completion(
+        [{"role": "user", "content": prompt}],
         model=GPT_MODEL,
-        messages=[{"role": "user", "content": prompt}],
         max_tokens=1024,
         temperature=0.0
     )
-    content = response["choices"][0]["message"]["content"]
     try:
         json_data = re.search(r'\{[\s\S]+\}', content).group()
         data = json.loads(json_data)
@@ -1,22 +1,33 @@
-import os
-import json
-from uuid import uuid4
+import zipfile
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework import generics, permissions
+from rest_framework.exceptions import ValidationError
 
 from django.conf import settings
+from django.urls import reverse
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
-from .models import Problem
-from .serializer import ProblemSerializer
+from .models import Problem, UploadJob
+from .serializer import ProblemSerializer, UploadJobSerializer
+from .pagination import ProblemCursorPagination
 
-# --- 분석 함수 utils에서 가져오기
-from .utils import img2text, img2latex, struct_problem_with_gpt, get_problem_msg
+# --- 분석 파이프라인
+from .pipeline import (
+    save_uploaded_image, save_images_from_zip, find_cached_upload, run_upload_pipeline, run_batch_upload_pipeline,
+    build_upload_response, BATCH_MAX_FILES, BATCH_MAX_FILE_SIZE
+)
+from .jobs import enqueue_upload_job
+from .utils import OCRQueueFull, ocr_queue_full
+from .bank import index_problem, reindex_problem, remove_problem
+
+def ocr_busy_response(retry_after):
+    return Response({"error": "이미지 분석 요청이 많습니다. 잠시 후 다시 시도해주세요."},
+                    status=503, headers={"Retry-After": str(retry_after)})
 
 class ProblemImageUploadAPIView(APIView):
     """
@@ -37,7 +48,8 @@ class ProblemImageUploadAPIView(APIView):
 3. LaTeX 수식 변환
 4. GPT를 통한 문제 구조화 분석
 5. 데이터베이스 저장
-6. JSON 파일 백업 저장
+
+같은 이미지(또는 OCR 결과가 같은 이미지)를 다시 올리면 OCR/GPT 분석을 건너뛰고 이전 분석 결과를 돌려줍니다.
 
 지원 이미지 형식: JPG, PNG, GIF, BMP, TIFF
 최대 파일 크기: 10MB
@@ -57,6 +69,13 @@ class ProblemImageUploadAPIView(APIView):
                 description="분석할 수학 문제 이미지 파일",
                 type=openapi.TYPE_FILE,
                 required=True,
+            ),
+            openapi.Parameter(
+                'async',
+                openapi.IN_FORM,
+                description="true면 분석 작업만 등록하고 즉시 job_id 반환 (202). 결과는 jobs/{id}/ 에서 조회",
+                type=openapi.TYPE_BOOLEAN,
+                required=False,
             )
         ],
         consumes=['multipart/form-data'],
@@ -85,6 +104,17 @@ class ProblemImageUploadAPIView(APIView):
                     }
                 }
             ),
+            202: openapi.Response(
+                description="비동기 분석 작업 등록 (async=true)",
+                examples={
+                    "application/json": {
+                        "job_id": 12,
+                        "status": "pending",
+                        "status_url": "/api/problems/jobs/12/",
+                        "image_url": "/media/images/abc123def456.jpg"
+                    }
+                }
+            ),
             400: openapi.Response(
                 description="잘못된 요청",
                 examples={
@@ -116,6 +146,14 @@ class ProblemImageUploadAPIView(APIView):
                         "error": "이미지 분석 중 오류가 발생했습니다."
                     }
                 }
+            ),
+            503: openapi.Response(
+                description="OCR 대기열이 가득 참 (Retry-After 헤더의 초만큼 기다린 뒤 다시 시도)",
+                examples={
+                    "application/json": {
+                        "error": "이미지 분석 요청이 많습니다. 잠시 후 다시 시도해주세요."
+                    }
+                }
             )
         }
     )
@@ -125,72 +163,285 @@ class ProblemImageUploadAPIView(APIView):
             return Response({"error": "이미지 파일이 필요합니다."}, status=400)
 
         # 1. 이미지 저장
-        os.makedirs(os.path.join(settings.MEDIA_ROOT, 'images'), exist_ok=True)
-        ext = os.path.splitext(image.name)[-1]
-        filename = f"{uuid4().hex}{ext}"
-        image_save_path = os.path.join(settings.MEDIA_ROOT, 'images', filename)
-        with open(image_save_path, 'wb+') as f:
-            for chunk in image.chunks():
-                f.write(chunk)
-        image_url = f"/media/images/{filename}"
-
-        # 2. OCR/AI 분석
-        text = img2text(image_save_path)
-        latex = img2latex(image_save_path)
-        analysis = struct_problem_with_gpt(text, latex, image_url)
-
-        # 3. DB 저장
-        problem = Problem.objects.create(
-            question=analysis['question'],
-            image_path=image_url,
-            user=request.user
-        )
-
-        # 4. JSON 파일 저장
-        problem_json_dir = os.path.join(settings.BASE_DIR, 'problem_json')
-        os.makedirs(problem_json_dir, exist_ok=True)
-        problems_json_path = os.path.join(problem_json_dir, 'problems.json')
-        if os.path.exists(problems_json_path):
-            with open(problems_json_path, 'r', encoding='utf-8') as f:
-                problems = json.load(f)
-        else:
-            problems = []
-        info = analysis.copy()
-        info['user'] = request.user.username
-        problems.append(info)
-        with open(problems_json_path, 'w', encoding='utf-8') as f:
-            json.dump(problems, f, ensure_ascii=False, indent=2)
-
-        serializer = ProblemSerializer(problem)
-        msg = get_problem_msg(analysis)
+        image_save_path, image_url = save_uploaded_image(image)
+
+        # 비동기 모드: 작업만 등록하고 바로 job id 반환 (워커가 분석/저장 처리)
+        # 이미 분석된 적 있는 이미지면 캐시 결과로 바로 응답한다.
+        cached = None
+        if str(request.data.get('async', '')).lower() in ('1', 'true'):
+            cached = find_cached_upload(image_save_path)
+        if cached and cached[1] is None:
+            job = enqueue_upload_job(image_url, request.user)
+            return Response({
+                "job_id": job.id,
+                "status": job.status,
+                "status_url": reverse('problem-upload-job', args=[job.id]),
+                "image_url": image_url,
+            }, status=202)
+
+        # 2. OCR/AI 분석 → 3. DB 저장 (같은 이미지면 캐시된 분석 결과 사용)
+        try:
+            problem, analysis = run_upload_pipeline(image_save_path, image_url, request.user, cached)
+        except OCRQueueFull as e:
+            return ocr_busy_response(e.retry_after)
+
+        return Response(build_upload_response(problem, analysis, problem.image_path), status=201)
+
+
+class ProblemBatchUploadAPIView(APIView):
+    """
+    수학 문제 이미지 일괄 업로드 및 분석 API
+    
+    여러 장의 문제 이미지(또는 zip 파일)를 한 번에 업로드하여 분석합니다.
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+
+    @swagger_auto_schema(
+        operation_summary="수학 문제 이미지 일괄 업로드 및 분석",
+        operation_description=f"""여러 이미지 파일(images) 또는 이미지들을 묶은 zip 파일(archive)을 업로드하여 한 번에 분석합니다.
+        
+처리 과정:
+1. 모든 이미지 파일 저장
+2. OCR(텍스트/LaTeX) → GPT 구조화를 이미지별로 파이프라인 처리 (단계별 동시 처리 수 제한)
+3. 모든 문제를 하나의 트랜잭션으로 일괄 저장
+
+한 번에 최대 {BATCH_MAX_FILES}개, 파일당 최대 10MB
+        """,
+        tags=["수학 문제 관리"],
+        manual_parameters=[
+            openapi.Parameter(
+                'Authorization',
+                openapi.IN_HEADER,
+                description="JWT 액세스 토큰 (예: Bearer eyJ0eXAiOiJKV1Q...)",
+                type=openapi.TYPE_STRING,
+                required=True,
+            ),
+            openapi.Parameter(
+                'images',
+                openapi.IN_FORM,
+                description="분석할 수학 문제 이미지 파일들 (여러 개 첨부 가능)",
+                type=openapi.TYPE_FILE,
+                required=False,
+            ),
+            openapi.Parameter(
+                'archive',
+                openapi.IN_FORM,
+                description="이미지 파일들을 묶은 zip 파일",
+                type=openapi.TYPE_FILE,
+                required=False,
+            )
+        ],
+        consumes=['multipart/form-data'],
+        responses={
+            201: openapi.Response(
+                description="일괄 업로드 및 분석 성공",
+                examples={
+                    "application/json": {
+                        "msg": "2개 문제가 성공적으로 분석되었습니다.",
+                        "count": 2,
+                        "results": [
+                            {
+                                "msg": "[이차방정식] 다음 방정식을 풀어보세요: x² + 5x + 6 = 0",
+                                "problem": {
+                                    "id": 1,
+                                    "question": "다음 방정식을 풀어보세요: x² + 5x + 6 = 0",
+                                    "image_path": "/media/images/abc123def456.jpg",
+                                    "created_at": "2024-01-01T12:00:00Z",
+                                    "user": 1
+                                },
+                                "image_url": "/media/images/abc123def456.jpg"
+                            }
+                        ],
+                        "failed": []
+                    }
+                }
+            ),
+            400: openapi.Response(
+                description="잘못된 요청",
+                examples={
+                    "application/json": {
+                        "error": "이미지 파일 또는 zip 파일이 필요합니다."
+                    }
+                }
+            ),
+            401: openapi.Response(
+                description="인증 실패",
+                examples={
+                    "application/json": {
+                        "detail": "자격 인증데이터(authentication credentials)가 제공되지 않았습니다."
+                    }
+                }
+            ),
+            503: openapi.Response(
+                description="OCR 대기열이 가득 참 (Retry-After 헤더의 초만큼 기다린 뒤 다시 시도)",
+                examples={
+                    "application/json": {
+                        "error": "이미지 분석 요청이 많습니다. 잠시 후 다시 시도해주세요."
+                    }
+                }
+            )
+        }
+    )
+    def post(self, request, *args, **kwargs):
+        images = request.FILES.getlist('images')
+        archive = request.FILES.get('archive')
+        if not images and not archive:
+            return Response({"error": "이미지 파일 또는 zip 파일이 필요합니다."}, status=400)
+        if len(images) > BATCH_MAX_FILES:
+            return Response({"error": f"한 번에 최대 {BATCH_MAX_FILES}개 이미지까지 업로드할 수 있습니다."}, status=400)
+        if any(image.size > BATCH_MAX_FILE_SIZE for image in images):
+            return Response({"error": "파일 크기가 너무 큽니다. 최대 10MB까지 업로드 가능합니다."}, status=413)
+        if ocr_queue_full():
+            return ocr_busy_response(settings.OCR_RETRY_AFTER)
+
+        # 1. 이미지 저장
+        saved_images = [save_uploaded_image(image) for image in images]
+        if archive:
+            try:
+                saved_images += save_images_from_zip(archive)
+            except (ValueError, zipfile.BadZipFile) as e:
+                return Response({"error": str(e)}, status=400)
+            if len(saved_images) > BATCH_MAX_FILES:
+                return Response({"error": f"한 번에 최대 {BATCH_MAX_FILES}개 이미지까지 업로드할 수 있습니다."}, status=400)
+
+        # 2. OCR → GPT 구조화 → 일괄 저장
+        results, failed = run_batch_upload_pipeline(saved_images, request.user)
 
         return Response({
-            "msg": msg,
-            "problem": serializer.data,
-            "analysis": {
-                "question": analysis['question'],
-                "latex": analysis['latex'],
-                "options": analysis.get('options', []),
-                "answer": analysis.get('answer', ''),
-                "category": analysis.get('category', '')
-            },
-            "image_url": image_url,
-            "created_at": problem.created_at
+            "msg": f"{len(results)}개 문제가 성공적으로 분석되었습니다.",
+            "count": len(results),
+            "results": [build_upload_response(problem, analysis, image_url)
+                        for problem, analysis, image_url in results],
+            "failed": failed,
         }, status=201)
 
+
+class UploadJobStatusAPIView(generics.RetrieveAPIView):
+    """
+    이미지 분석 작업 상태 조회 API
+    
+    비동기 업로드로 등록된 분석 작업의 진행 상태와 결과를 조회합니다.
+    """
+    serializer_class = UploadJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return UploadJob.objects.filter(user=self.request.user)
+
+    @swagger_auto_schema(
+        operation_summary="이미지 분석 작업 상태 조회",
+        operation_description="""비동기 업로드(async=true)로 등록된 작업의 상태를 조회합니다.
+        
+상태 값:
+- pending: 대기 중
+- running: 분석 중
+- done: 완료 (result에 업로드 API와 동일한 분석 결과 포함)
+- failed: 실패 (error에 오류 내용 포함)
+        """,
+        tags=["수학 문제 관리"],
+        manual_parameters=[
+            openapi.Parameter(
+                'Authorization',
+                openapi.IN_HEADER,
+                description="JWT 액세스 토큰 (예: Bearer eyJ0eXAiOiJKV1Q...)",
+                type=openapi.TYPE_STRING,
+                required=True,
+            ),
+            openapi.Parameter(
+                'pk',
+                openapi.IN_PATH,
+                description="조회할 작업 ID",
+                type=openapi.TYPE_INTEGER,
+                required=True,
+            )
+        ],
+        responses={
+            200: openapi.Response(
+                description="작업 상태 조회 성공",
+                examples={
+                    "application/json": {
+                        "id": 12,
+                        "status": "done",
+                        "image_path": "/media/images/abc123def456.jpg",
+                        "problem": 1,
+                        "result": {
+                            "msg": "[이차방정식] 다음 방정식을 풀어보세요: x² + 5x + 6 = 0",
+                            "problem": {"id": 1, "question": "다음 방정식을 풀어보세요: x² + 5x + 6 = 0"},
+                        },
+                        "error": "",
+                        "created_at": "2024-01-01T12:00:00Z",
+                        "started_at": "2024-01-01T12:00:01Z",
+                        "finished_at": "2024-01-01T12:00:12Z"
+                    }
+                }
+            ),
+            404: openapi.Response(
+                description="작업을 찾을 수 없음",
+                examples={
+                    "application/json": {
+                        "detail": "찾을 수 없습니다."
+                    }
+                }
+            )
+        }
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
 class ProblemListCreateAPIView(generics.ListCreateAPIView):
     """
     수학 문제 목록 조회 및 생성 API
     
     모든 수학 문제 목록을 최신순으로 조회하거나 새로운 문제를 직접 생성할 수 있습니다.
     """
-    queryset = Problem.objects.all().order_by('-created_at')
+    queryset = Problem.objects.all()
     serializer_class = ProblemSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # (created_at, id) 키셋 커서 페이지네이션 — 정렬은 페이지네이터가 적용한다
+    pagination_class = ProblemCursorPagination
+
+    def _requested_fields(self):
+        """?fields=id,question 형식의 희소 필드 목록 (없으면 None)."""
+        raw = self.request.query_params.get('fields')
+        if not raw:
+            return None
+        fields = [f.strip() for f in raw.split(',') if f.strip()]
+        unknown = [f for f in fields if f not in ProblemSerializer.Meta.fields]
+        if unknown:
+            raise ValidationError({"fields": [f"알 수 없는 필드: {', '.join(unknown)}"]})
+        return fields
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method != 'GET':
+            return queryset
+        params = self.request.query_params
+        if params.get('user'):
+            if not params['user'].isdigit():
+                raise ValidationError({"user": ["user는 사용자 ID(정수)여야 합니다."]})
+            queryset = queryset.filter(user_id=int(params['user']))
+        if params.get('category'):
+            queryset = queryset.filter(category=params['category'])
+        fields = self._requested_fields()
+        if fields:
+            # 요청한 컬럼(+ 커서용 id, created_at)만 읽는다
+            queryset = queryset.only(*{f for f in fields if f != 'id'} | {'created_at'})
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        if self.request.method == 'GET':
+            kwargs.setdefault('fields', self._requested_fields())
+        return super().get_serializer(*args, **kwargs)
 
     @swagger_auto_schema(
         operation_summary="수학 문제 목록 조회",
-        operation_description="등록된 모든 수학 문제 목록을 최신순으로 조회합니다.",
+        operation_description="""등록된 수학 문제 목록을 최신순으로 조회합니다.
+
+- 커서 페이지네이션: 응답의 next/previous URL로 이동합니다 (page_size 기본 20, 최대 100).
+- fields: 필요한 필드만 받기 (예: ?fields=id,question,created_at)
+- user, category: 작성자 ID / 유형으로 필터링
+        """,
         tags=["수학 문제 관리"],
         manual_parameters=[
             openapi.Parameter(
@@ -199,28 +450,61 @@ class ProblemListCreateAPIView(generics.ListCreateAPIView):
                 description="JWT 액세스 토큰 (예: Bearer eyJ0eXAiOiJKV1Q...)",
                 type=openapi.TYPE_STRING,
                 required=True,
+            ),
+            openapi.Parameter(
+                'fields',
+                openapi.IN_QUERY,
+                description="응답에 포함할 필드 (쉼표로 구분)",
+                type=openapi.TYPE_STRING,
+                required=False,
+            ),
+            openapi.Parameter(
+                'user',
+                openapi.IN_QUERY,
+                description="작성자 ID로 필터링",
+                type=openapi.TYPE_INTEGER,
+                required=False,
+            ),
+            openapi.Parameter(
+                'category',
+                openapi.IN_QUERY,
+                description="문제 유형으로 필터링",
+                type=openapi.TYPE_STRING,
+                required=False,
             )
         ],
         responses={
             200: openapi.Response(
                 description="문제 목록 조회 성공",
                 examples={
-                    "application/json": [
-                        {
-                            "id": 2,
-                            "question": "다음 적분을 계산하세요: ∫(x² + 2x + 1)dx",
-                            "image_path": "/media/images/def456ghi789.jpg",
-                            "created_at": "2024-01-02T14:30:00Z",
-                            "user": 1
-                        },
-                        {
-                            "id": 1,
-                            "question": "다음 방정식을 풀어보세요: x² + 5x + 6 = 0",
-                            "image_path": "/media/images/abc123def456.jpg",
-                            "created_at": "2024-01-01T12:00:00Z",
-                            "user": 1
-                        }
-                    ]
+                    "application/json": {
+                        "next": "https://mola-api.tyeongk.im/api/problems/list/?cursor=MjAyNC0wMS0wMVQxMjowMDowMCswMDowMHwxfDA%3D",
+                        "previous": None,
+                        "results": [
+                            {
+                                "id": 2,
+                                "question": "다음 적분을 계산하세요: ∫(x² + 2x + 1)dx",
+                                "image_path": "/media/images/def456ghi789.jpg",
+                                "created_at": "2024-01-02T14:30:00Z",
+                                "user": 1
+                            },
+                            {
+                                "id": 1,
+                                "question": "다음 방정식을 풀어보세요: x² + 5x + 6 = 0",
+                                "image_path": "/media/images/abc123def456.jpg",
+                                "created_at": "2024-01-01T12:00:00Z",
+                                "user": 1
+                            }
+                        ]
+                    }
+                }
+            ),
+            400: openapi.Response(
+                description="잘못된 요청",
+                examples={
+                    "application/json": {
+                        "fields": ["알 수 없는 필드: foo"]
+                    }
                 }
             ),
             401: openapi.Response(
@@ -304,7 +588,7 @@ class ProblemListCreateAPIView(generics.ListCreateAPIView):
         return super().post(request, *args, **kwargs)
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        index_problem(serializer.save(user=self.request.user))
 
 
 class ProblemRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
@@ -572,4 +856,9 @@ class ProblemRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView)
         return super().delete(request, *args, **kwargs)
 
     def perform_update(self, serializer):
-        serializer.save(user=self.request.user)
+        old_embedding_key = serializer.instance.embedding_key
+        reindex_problem(serializer.save(user=self.request.user), old_embedding_key)
+
+    def perform_destroy(self, instance):
+        # DB에서 삭제하고 임베딩/FAISS 인덱스에서도 제거
+        remove_problem(instance)
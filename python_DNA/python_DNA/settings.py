@@ -25,7 +25,49 @@ MEDIA_URL = '/media/'
 IMAGES_SUBDIR = 'images'
 IMAGES_DIR = os.path.join(MEDIA_ROOT, IMAGES_SUBDIR)
 PROBLEM_JSON_DIR = os.path.join(BASE_DIR, 'problems_json')
+# 문제 은행의 단일 저장소는 DB. 아래 JSON/JSONL 파일은 export_problems_json 으로 만드는 내보내기 결과.
 PROBLEM_JSON_PATH = os.path.join(PROBLEM_JSON_DIR, 'problems.json')
+PROBLEM_JSONL_PATH = os.path.join(PROBLEM_JSON_DIR, 'problems.jsonl')
+FAISS_INDEX_DIR = os.path.join(BASE_DIR, 'faiss_index')
+EMBEDDING_STORE_DIR = os.path.join(BASE_DIR, 'embedding_store')
+# 유사 문제 검색 인덱스: auto(코퍼스 크기로 선택) | flat | hnsw | ivf | ivfpq. 바꾸면 manage.py rebuild_faiss_index 로 재구축.
+# 검색 파라미터: ivf/ivfpq 는 질의마다 검색할 셀 수(NPROBE), hnsw 는 후보 리스트 크기(EF_SEARCH). 클수록 정확하고 느리다.
+FAISS_INDEX_TYPE = os.getenv('FAISS_INDEX_TYPE', 'auto')
+FAISS_NPROBE = int(os.getenv('FAISS_NPROBE', '16'))
+FAISS_EF_SEARCH = int(os.getenv('FAISS_EF_SEARCH', '64'))
+# 구축 파라미터: hnsw 노드당 이웃 수, ivf 셀 수(0이면 4·√N), ivfpq 벡터당 바이트 수(0이면 차원/8)
+FAISS_HNSW_M = int(os.getenv('FAISS_HNSW_M', '32'))
+FAISS_IVF_NLIST = int(os.getenv('FAISS_IVF_NLIST', '0'))
+FAISS_PQ_M = int(os.getenv('FAISS_PQ_M', '0'))
+
+# ML 모델은 처음 사용할 때 로드한다. MODEL_PREWARM=1 이면 서버 기동 후 백그라운드에서 미리 로드.
+SBERT_MODEL_NAME = 'paraphrase-multilingual-MiniLM-L12-v2'
+# SBERT 추론 백엔드: torch | onnx | onnx-int8 (onnx 계열은 manage.py export_sbert_onnx 로 먼저 내보낸다)
+SBERT_BACKEND = os.getenv('SBERT_BACKEND', 'torch')
+SBERT_ONNX_DIR = os.getenv('SBERT_ONNX_DIR', os.path.join(BASE_DIR, 'models', 'sbert-onnx'))
+MODEL_PREWARM = os.getenv('MODEL_PREWARM', '0') == '1'
+# 프로세스당 torch intra-op 스레드 수 (0이면 CPU 수 / WEB_CONCURRENCY)
+TORCH_NUM_THREADS = int(os.getenv('TORCH_NUM_THREADS', '0'))
+# 프로세스당 동시에 처리(대기 포함)할 수 있는 OCR 요청 수. 넘치면 업로드 API가 503 + Retry-After로 응답한다.
+OCR_QUEUE_MAX = int(os.getenv('OCR_QUEUE_MAX', '4'))
+OCR_RETRY_AFTER = 5
+# SBERT 인코딩 마이크로 배칭: 첫 요청 후 최대 EMBED_BATCH_WAIT_MS 동안 EMBED_BATCH_MAX 개까지 모아 한 번에 인코딩
+EMBED_BATCH_MAX = int(os.getenv('EMBED_BATCH_MAX', '64'))
+EMBED_BATCH_WAIT_MS = float(os.getenv('EMBED_BATCH_WAIT_MS', '5'))
+# 업로드 문제와 기존 문제의 SBERT 코사인 유사도가 이 값 이상이면 같은 문제로 보고 새로 저장하지 않는다.
+DEDUP_SIMILARITY_THRESHOLD = float(os.getenv('DEDUP_SIMILARITY_THRESHOLD', '0.95'))
+
+# AI 문제 생성 풀: 유형별로 미리 생성해 둘 문제 수 (run_pool_refill 워커가 유지)
+AI_POOL_WATERMARK = int(os.getenv('AI_POOL_WATERMARK', '5'))
+# 생성 문제 이미지(텍스트/TikZ) 백그라운드 렌더링 스레드 수
+AI_RENDER_WORKERS = int(os.getenv('AI_RENDER_WORKERS', '2'))
+
+# GPT(OpenAI 호환) API 클라이언트. OPENAI_API_BASE 를 로컬 스텁 서버로 바꾸면 실제 API 없이 부하 테스트 가능.
+OPENAI_API_BASE = os.getenv('OPENAI_API_BASE', 'https://api.openai.com/v1')
+LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', '60'))          # 요청 1건의 전체 제한 시간 (재시도 포함, 초)
+LLM_CONNECT_TIMEOUT = 5.0
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', '3'))
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '8'))  # 프로세스당 동시 요청 수
 
 
 # Quick-start development settings - unsuitable for production
@@ -99,6 +141,20 @@ DATABASES = {
     }
 }
 
+# 분리 배포(docker-compose.yml: ml/web/업로드 워커/풀 워커가 각자 컨테이너)는 PostgreSQL 을 쓴다.
+# SQLite 파일 하나를 여러 컨테이너에 마운트하면 쓰기 잠금이 컨테이너 사이에서 경합하므로
+# SQLite 는 개발 환경과 단일 컨테이너(SERVE_PROFILE=all)에서만 쓴다.
+if os.getenv('POSTGRES_DB'):
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.getenv('POSTGRES_DB'),
+        'USER': os.getenv('POSTGRES_USER', 'postgres'),
+        'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+        'HOST': os.getenv('POSTGRES_HOST', 'localhost'),
+        'PORT': os.getenv('POSTGRES_PORT', '5432'),
+        'CONN_MAX_AGE': int(os.getenv('POSTGRES_CONN_MAX_AGE', '60')),
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -0,0 +1,61 @@
+"""
+문제 유형 분류기 마이크로 벤치마크.
+
+extracted_questions_cleaned.txt의 문제 텍스트로 기존 순차 검사 방식(키워드 in 검사 +
+re.search 최대 11회)과 미리 컴파일한 단일 패턴 분류기(classify / classify_many)의
+처리량을 비교한다. 세 방식의 분류 결과가 모두 같은지도 확인한다.
+
+    python scripts/bench_classifier.py [반복횟수]
+"""
+import os
+import re
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from ai.utils.resources import PROBLEM_MAKERS, classify_type_by_text, classify_many
+
+DATA_PATH = os.path.join(os.path.dirname(BASE_DIR), 'extracted_questions_cleaned.txt')
+
+def legacy_classify_type_by_text(text):
+    """기존 구현 (비교 기준)"""
+    for key in PROBLEM_MAKERS.keys():
+        if key in text:
+            return key
+    if re.search(r"수열|합|공차|공비|a_", text): return "수열"
+    if re.search(r"정수|gcd|lcm|소수|합성수|integer|solution", text): return "정수"
+    if re.search(r"원의|넓이|부채꼴|삼각형|입체|기하", text): return "기하"
+    if re.search(r"sin|cos|tan|삼각함수", text): return "삼각함수"
+    if re.search(r"미분|적분|\\int|정적분|도함수|미적분", text): return "미적분"
+    if re.search(r"확률|경우의 수|동전|주사위|확률", text): return "확률"
+    if re.search(r"평균|표준편차|분산|사분위|통계", text): return "통계"
+    if re.search(r"log_|로그", text): return "로그"
+    if re.search(r"지수|a\^|b\^|c\^", text): return "지수"
+    if re.search(r"x\^2|이차함수|꼭짓점", text): return "이차함수"
+    if re.search(r"x\^2|=0|이차방정식|근", text): return "이차방정식"
+    return "정수"
+
+def bench(name, func, texts, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(texts)
+        best = min(best, time.perf_counter() - start)
+    print(f"{name:<28} {best * 1000:8.2f}ms  {len(texts) / best:12,.0f} texts/s")
+    return result
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    with open(DATA_PATH, encoding='utf-8') as f:
+        texts = [line.strip() for line in f if line.strip()]
+    print(f"{len(texts)}개 문제, {repeat}회 중 최소 시간")
+    legacy = bench("기존 (순차 검사)", lambda ts: [legacy_classify_type_by_text(t) for t in ts], texts, repeat)
+    single = bench("컴파일 패턴 classify", lambda ts: [classify_type_by_text(t) for t in ts], texts, repeat)
+    batch = bench("컴파일 패턴 classify_many", classify_many, texts, repeat)
+    assert legacy == single == batch, "분류 결과가 기존 구현과 다릅니다"
+    print("분류 결과 일치")
+
+if __name__ == "__main__":
+    main()
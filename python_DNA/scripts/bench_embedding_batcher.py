@@ -0,0 +1,106 @@
+"""
+SBERT 질의 임베딩 마이크로 배칭 벤치마크.
+
+동시 클라이언트(스레드)마다 질의 하나씩을 계속 인코딩할 때, 기존 방식(요청마다
+model.encode([query]))과 EmbeddingBatcher(짧은 시간 창 동안 모아 한 번에 인코딩)의
+처리량과 지연 시간을 비교하고 배치 크기/대기 시간 히스토그램을 출력한다.
+두 방식의 임베딩이 같은지도 확인한다.
+
+    python scripts/bench_embedding_batcher.py --concurrency 16 --requests 2000 --wait-ms 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+DATA_PATH = os.path.join(os.path.dirname(BASE_DIR), 'extracted_questions_cleaned.txt')
+
+def load_queries(n):
+    try:
+        with open(DATA_PATH, encoding='utf-8') as f:
+            lines = [line.strip() for line in f if line.strip()]
+    except OSError:
+        lines = []
+    lines = lines or [f"x^2 - {i}x + {i * 2} = 0 의 두 근의 합을 구하시오." for i in range(100)]
+    # 캐시 효과를 없애려고 질의마다 번호를 붙여 모두 다른 텍스트로 만든다
+    return [f"{lines[i % len(lines)]} ({i})" for i in range(n)]
+
+def run(encode, queries, concurrency):
+    latencies, results = [], {}
+    cursor = iter(range(len(queries)))
+    cursor_lock = threading.Lock()
+
+    def client():
+        while True:
+            with cursor_lock:
+                i = next(cursor, None)
+            if i is None:
+                return
+            start = time.perf_counter()
+            results[i] = encode([queries[i]])[0]
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return latencies, elapsed, np.stack([results[i] for i in range(len(queries))])
+
+def report(name, latencies, elapsed):
+    ms = sorted(l * 1000 for l in latencies)
+    p99 = ms[min(len(ms) - 1, int(len(ms) * 0.99))]
+    print(f"{name:<10} {len(ms) / elapsed:9.1f} 질의/s  p50 {statistics.median(ms):7.2f}ms  p99 {p99:7.2f}ms")
+    return len(ms) / elapsed
+
+def print_histogram(name, snapshot):
+    prev = 0
+    print(f"  {name} (평균 {snapshot['mean']})")
+    for bound, cumulative in snapshot['buckets'].items():
+        if cumulative - prev:
+            print(f"    <= {bound:<6} {cumulative - prev}")
+        prev = cumulative
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--wait-ms', type=float, default=5.0)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "python_DNA.settings")
+    import django
+    django.setup()
+    from ai.utils.model_registry import get_sbert
+    from ai.utils.embedding_service import EmbeddingBatcher
+
+    model = get_sbert()
+    model.encode(["warmup"], convert_to_numpy=True)
+    queries = load_queries(args.requests)
+    print(f"질의 {args.requests}개, 동시 클라이언트 {args.concurrency}, "
+          f"배치 최대 {args.max_batch}개 / {args.wait_ms}ms")
+
+    direct = run(lambda texts: model.encode(texts, convert_to_numpy=True), queries, args.concurrency)
+    direct_rate = report("직접", direct[0], direct[1])
+
+    batcher = EmbeddingBatcher(args.max_batch, args.wait_ms)
+    batched = run(batcher.encode, queries, args.concurrency)
+    batched_rate = report("배칭", batched[0], batched[1])
+    print(f"처리량 {batched_rate / direct_rate:.2f}배, 임베딩 최대 차이 {np.abs(direct[2] - batched[2]).max():.2e}")
+
+    metrics = batcher.metrics()
+    print(f"배치 {metrics['batches']}회 (요청 {metrics['requests']}건)")
+    print_histogram("배치 크기", metrics['batch_size'])
+    print_histogram("대기 시간(ms)", metrics['wait_ms'])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+문제 생성기 처리량 벤치마크.
+
+유형별로 기존 make_* 함수를 n번 호출하는 방식과 NumPy 벡터화 make_problems(type, n, seed)의
+처리량을 비교한다. 같은 seed로 두 번 만든 결과가 같은지(재현성)도 확인한다.
+
+    python scripts/bench_problem_makers.py [문제 수 (기본 100000)]
+"""
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from ai.utils.resources import PROBLEM_MAKERS, make_problems
+
+SEED = 42
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"유형별 {n:,}문제 생성")
+    print(f"{'유형':<8} {'기존 (problems/s)':>20} {'벡터화 (problems/s)':>22} {'배속':>8}")
+    total_loop = total_vec = 0.0
+    for problem_type, maker in PROBLEM_MAKERS.items():
+        # 워밍업 (첫 유형에 NumPy 초기화/메모리 할당 비용이 몰리지 않게)
+        [maker() for _ in range(1000)]
+        make_problems(problem_type, 1000, seed=SEED)
+        _, loop_time = timed(lambda: [maker() for _ in range(n)])
+        problems, vec_time = timed(lambda: make_problems(problem_type, n, seed=SEED))
+        assert len(problems) == n
+        assert make_problems(problem_type, n, seed=SEED) == problems, f"{problem_type}: 같은 seed인데 결과가 다릅니다"
+        total_loop += loop_time
+        total_vec += vec_time
+        print(f"{problem_type:<8} {n / loop_time:20,.0f} {n / vec_time:22,.0f} {loop_time / vec_time:7.1f}x")
+    count = n * len(PROBLEM_MAKERS)
+    print(f"{'전체':<8} {count / total_loop:20,.0f} {count / total_vec:22,.0f} {total_loop / total_vec:7.1f}x")
+
+if __name__ == "__main__":
+    main()
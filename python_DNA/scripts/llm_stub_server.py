@@ -0,0 +1,103 @@
+"""
+OpenAI chat/completions 호환 로컬 스텁 서버 (부하 테스트/개발용).
+
+지연 시간과 오류(429/500) 비율을 지정할 수 있고, keep-alive(HTTP/1.1)와
+"stream": true 요청(SSE 조각 전송)을 지원한다.
+클라이언트는 OPENAI_API_BASE=http://127.0.0.1:8799/v1 로 설정해서 사용한다.
+
+    python scripts/llm_stub_server.py [--port 8799] [--latency 0.5] [--error-rate 0.1]
+"""
+import argparse
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STUB_PROBLEM = {
+    "question": "실수 전체의 집합에서 연속인 함수 f(x)의 상수 a 값을 구하시오.",
+    "latex": "f(x) = 5x + a (x < -2), f(x) = x^2 - a (x ≥ -2)",
+    "options": ["1. 6", "2. 7", "3. 8", "4. 9", "5. 10"],
+    "answer": "7",
+    "category": "함수",
+    "image_path": "",
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+    error_rate = 0.0
+    chunk_size = 8       # 스트리밍 시 한 조각의 글자 수
+    chunk_delay = 0.02   # 스트리밍 조각 사이 지연 (초)
+
+    def _send(self, status, body, headers=None):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b'{}')
+        if self.latency:
+            time.sleep(random.uniform(0.5, 1.5) * self.latency)
+        if random.random() < self.error_rate:
+            if random.random() < 0.5:
+                return self._send(429, {"error": {"message": "rate limited"}}, {"Retry-After": "0.2"})
+            return self._send(500, {"error": {"message": "stub server error"}})
+        if request.get("stream"):
+            return self._stream(request)
+        self._send(200, {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "model": request.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": json.dumps(STUB_PROBLEM, ensure_ascii=False)},
+                "finish_reason": "stop",
+            }],
+        })
+
+    def _stream(self, request):
+        content = json.dumps(STUB_PROBLEM, ensure_ascii=False)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def send_event(data):
+            payload = f"data: {data}\n\n".encode('utf-8')
+            self.wfile.write(f"{len(payload):x}\r\n".encode() + payload + b"\r\n")
+            self.wfile.flush()
+
+        for i in range(0, len(content), self.chunk_size):
+            chunk = {"choices": [{"index": 0, "delta": {"content": content[i:i + self.chunk_size]}}]}
+            send_event(json.dumps(chunk, ensure_ascii=False))
+            time.sleep(self.chunk_delay)
+        send_event("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8799)
+    parser.add_argument('--latency', type=float, default=0.5, help="평균 응답 지연 (초)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="429/500 응답 비율 (0~1)")
+    args = parser.parse_args()
+    StubHandler.latency = args.latency
+    StubHandler.error_rate = args.error_rate
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    server.daemon_threads = True
+    print(f"LLM 스텁 서버: http://{args.host}:{args.port}/v1 (latency {args.latency}s, error-rate {args.error_rate})")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+API 서버 HTTP 부하 테스트.
+
+동시 연결 수(concurrency)만큼 요청을 계속 보내는 closed-loop 방식으로 경로별 초당 요청 수(RPS),
+지연 시간 분포(p50/p99), 오류 수를 출력한다. 로그인 API로 JWT를 받아 Authorization 헤더에 넣는다.
+
+    # 기존 (runserver)
+    python manage.py runserver 0.0.0.0:8000 &
+    python scripts/load_test_http.py --base http://127.0.0.1:8000 --username bench --password ...
+
+    # 운영 프로필 (gunicorn, gunicorn.conf.py)
+    SERVE_PROFILE=light gunicorn &
+    python scripts/load_test_http.py --base http://127.0.0.1:8000 --username bench --password ...
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import aiohttp
+
+DEFAULT_PATHS = ["/api/problems/list/", "/api/users/api/profile/"]
+
+async def login(session, base, username, password):
+    async with session.post(f"{base}/api/users/api/login/", json={"username": username, "password": password}) as r:
+        r.raise_for_status()
+        return (await r.json())["access"]
+
+async def run_path(session, url, headers, concurrency, duration):
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+
+    async def client():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                async with session.get(url, headers=headers) as r:
+                    await r.read()
+                    if r.status >= 400:
+                        errors += 1
+            except aiohttp.ClientError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+def report(path, latencies, errors, elapsed):
+    ms = sorted(l * 1000 for l in latencies)
+    p99 = ms[min(len(ms) - 1, int(len(ms) * 0.99))] if ms else 0.0
+    print(f"{path:<28} {len(ms) / elapsed:9.1f} req/s  p50 {statistics.median(ms) if ms else 0:8.1f}ms  "
+          f"p99 {p99:8.1f}ms  요청 {len(ms)}  오류 {errors}")
+
+async def main_async(args):
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        token = args.token or await login(session, args.base, args.username, args.password)
+        headers = {"Authorization": f"Bearer {token}"}
+        print(f"{args.base}  동시 연결 {args.concurrency}, 경로별 {args.duration}s (워밍업 {args.warmup}s)")
+        for path in args.paths:
+            url = args.base + path
+            if args.warmup:
+                await run_path(session, url, headers, args.concurrency, args.warmup)
+            report(path, *(await run_path(session, url, headers, args.concurrency, args.duration)))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base", default="http://127.0.0.1:8000")
+    parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS)
+    parser.add_argument("--username")
+    parser.add_argument("--password")
+    parser.add_argument("--token", help="로그인 대신 사용할 JWT 액세스 토큰")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    args = parser.parse_args()
+    if not args.token and not (args.username and args.password):
+        parser.error("--token 또는 --username/--password 가 필요합니다.")
+    asyncio.run(main_async(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+GPT 클라이언트(ai.utils.llm_client) 부하 테스트.
+
+로컬 스텁 서버(scripts/llm_stub_server.py)에 동기(스레드) 또는 비동기 방식으로 요청을
+보내고 처리량, 지연 시간 분포, 오류 수를 출력한다.
+
+    python scripts/llm_stub_server.py --latency 0.3 --error-rate 0.05 &
+    python scripts/load_test_llm.py --base http://127.0.0.1:8799/v1 --requests 200 --concurrency 32 --mode async
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+MESSAGES = [{"role": "user", "content": "부하 테스트"}]
+
+def run_sync(n, concurrency, chat_completion):
+    def one(_):
+        start = time.perf_counter()
+        try:
+            chat_completion(MESSAGES)
+            return time.perf_counter() - start, None
+        except Exception as e:
+            return time.perf_counter() - start, e
+    with ThreadPoolExecutor(concurrency) as pool:
+        return list(pool.map(one, range(n)))
+
+async def run_async(n, concurrency, achat_completion, aclose):
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with limit:
+            start = time.perf_counter()
+            try:
+                await achat_completion(MESSAGES)
+                return time.perf_counter() - start, None
+            except Exception as e:
+                return time.perf_counter() - start, e
+    try:
+        return await asyncio.gather(*(one() for _ in range(n)))
+    finally:
+        await aclose()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--base', default='http://127.0.0.1:8799/v1', help="OPENAI_API_BASE")
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--mode', choices=['sync', 'async'], default='async')
+    args = parser.parse_args()
+
+    os.environ['OPENAI_API_BASE'] = args.base
+    os.environ.setdefault('LLM_MAX_CONCURRENCY', str(args.concurrency))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "python_DNA.settings")
+    import django
+    django.setup()
+    from ai.utils.llm_client import chat_completion, achat_completion, aclose
+
+    start = time.perf_counter()
+    if args.mode == 'sync':
+        results = run_sync(args.requests, args.concurrency, chat_completion)
+    else:
+        results = asyncio.run(run_async(args.requests, args.concurrency, achat_completion, aclose))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(t for t, e in results if e is None)
+    errors = [e for _, e in results if e is not None]
+    print(f"{args.mode}: {args.requests}건, 동시 {args.concurrency}, {elapsed:.2f}s ({args.requests / elapsed:.1f} req/s)")
+    if latencies:
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"  지연 p50 {statistics.median(latencies) * 1000:.0f}ms  p95 {p95 * 1000:.0f}ms  max {latencies[-1] * 1000:.0f}ms")
+    print(f"  성공 {len(latencies)}  실패 {len(errors)}")
+    for e in errors[:5]:
+        print(f"    {e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Django 기동 시간 측정 스크립트.
+
+manage.py 명령(check)과 URLconf 전체 import(워커 부팅과 동일)를 새 프로세스에서
+여러 번 실행해 중앙값을 출력한다. 모델 지연 로딩 전/후 비교용.
+
+    python scripts/measure_startup.py [반복횟수]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COMMANDS = {
+    "manage.py check": [sys.executable, "manage.py", "check"],
+    "import urlconf": [
+        sys.executable, "-c",
+        "import os, django; os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'python_DNA.settings'); "
+        "django.setup(); import python_DNA.urls",
+    ],
+}
+
+def measure(cmd, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=BASE_DIR, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), min(times)
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for name, cmd in COMMANDS.items():
+        median, best = measure(cmd, repeat)
+        print(f"{name:<20} median {median:.3f}s  min {best:.3f}s  ({repeat}회)")
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,44 @@
-import os, django, json
+import os, sys, django, json
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "python_DNA.settings")
 django.setup()
 
+from django.conf import settings
 from problems.models import Problem
+from problems.bank import save_problems
+
+# problems.json(배열) 또는 problems.jsonl 파일의 문제를 DB 문제 은행으로 가져온다.
+# 사용법: python scripts/problems_from_json.py [경로]  (기본: PROBLEM_JSON_PATH)
+
+BATCH_SIZE = 500
+
+def read_items(path):
+    with open(path, encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from json.load(f)
 
 def main():
-    with open('ocr_gpt_pipeline/results/problems.json', encoding='utf-8') as f:
-        problems = json.load(f)
-    for item in problems:
-        # 예시: item = {"title": "...", "content": "...", "latex": "...", "answer": "...", "image": "...", ...}
-        obj, created = Problem.objects.get_or_create(
-            title=item["title"],
-            defaults={
-                "content": item.get("content") or item.get("latex", ""),
-                "subject": item.get("subject", ""),
-                "level": item.get("level", 1),
-                "latex": item.get("latex", ""),
-                "answer": item.get("answer", ""),
-                "tags": ",".join(item.get("tags", [])),
-                # image 경로는 필요에 따라 media/problems/로 복사
-            }
-        )
-        print(f"등록: {obj} ({'신규' if created else '중복'})")
+    path = sys.argv[1] if len(sys.argv) > 1 else settings.PROBLEM_JSON_PATH
+    # 이미 DB에 있는 문제(같은 문제 텍스트 + 이미지)는 건너뛴다
+    existing = set(Problem.objects.values_list('question', 'image_path'))
+    batch, created, skipped = [], 0, 0
+    for item in read_items(path):
+        key = (item.get('question') or '', item.get('image_path') or '')
+        if key in existing:
+            skipped += 1
+            continue
+        existing.add(key)
+        batch.append(item)
+        if len(batch) >= BATCH_SIZE:
+            created += len(save_problems(batch, source=Problem.SOURCE_IMPORT))
+            batch = []
+    if batch:
+        created += len(save_problems(batch, source=Problem.SOURCE_IMPORT))
+    print(f"등록: {created}개 (중복 {skipped}개 건너뜀)")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
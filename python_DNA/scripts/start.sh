@@ -0,0 +1,62 @@
+#!/bin/bash
+# 컨테이너 시작 스크립트. SERVE_PROFILE: all(기본) | ml | light | dev(runserver)
+# 프로세스 모델/워커 수는 gunicorn.conf.py 참고.
+#
+# all/dev(컨테이너 하나로 실행)는 업로드 분석 워커와 AI 문제 풀 워커도 이 스크립트가 함께 띄우고,
+# 죽으면 다시 시작하며, SIGTERM/SIGINT 를 받으면 모두에게 전달하고 끝날 때까지 기다린다.
+# ml/light 는 서버만 실행한다. 분리 배포에서는 워커가 각자 compose 서비스로 돈다 (docker-compose.yml).
+set -e
+cd "$(dirname "$0")/.."
+PROFILE="${SERVE_PROFILE:-all}"
+echo "Starting Django application (profile: $PROFILE)..."
+
+if [ "${RUN_MIGRATIONS:-1}" = "1" ]; then
+    python manage.py migrate
+fi
+
+if [ "$PROFILE" = "ml" ] || [ "$PROFILE" = "light" ]; then
+    exec env SERVE_PROFILE="$PROFILE" gunicorn
+fi
+
+CHILDREN=()
+
+# 명령을 백그라운드에서 실행하고, 종료되면 잠시 후 다시 시작한다.
+# 감시 서브셸이 TERM 을 받으면 실행 중인 명령에 전달하고 끝날 때까지 기다린 뒤 종료한다.
+supervise() {
+    (
+        child=
+        trap 'kill -TERM "$child" 2>/dev/null || true; wait "$child" 2>/dev/null || true; exit 0' TERM INT
+        while true; do
+            "$@" &
+            child=$!
+            status=0
+            wait "$child" || status=$?
+            echo "[start.sh] Error: '$*' 종료 (exit $status), 5초 후 다시 시작합니다"
+            sleep 5 &
+            wait $!
+        done
+    ) &
+    CHILDREN+=($!)
+}
+
+supervise python manage.py run_upload_workers --workers 2
+supervise python manage.py run_pool_refill
+
+if [ "$PROFILE" = "dev" ]; then
+    python manage.py runserver 0.0.0.0:8000 &
+else
+    env SERVE_PROFILE="$PROFILE" gunicorn &
+fi
+SERVER=$!
+
+stop() {
+    kill -TERM "$SERVER" "${CHILDREN[@]}" 2>/dev/null || true
+}
+trap stop TERM INT
+
+# 서버가 끝나거나(비정상 종료 포함) 종료 신호를 받으면 워커까지 모두 정리하고 서버의 종료 코드로 끝낸다
+status=0
+wait "$SERVER" || status=$?
+stop
+wait || true
+exit $status